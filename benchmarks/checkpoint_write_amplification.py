@@ -0,0 +1,75 @@
+"""Measure checkpoint bytes written per step for a thread with large documents.
+
+Compares LangGraph's `InMemorySaver` (which stores the full `messages` list for
+every new channel version) against `SqliteCheckpointSaver` (deduplicated and
+compressed message storage).
+
+Run with: python benchmarks/checkpoint_write_amplification.py [steps]
+"""
+
+import os
+import sys
+import tempfile
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import StateGraph
+
+from react_agent.checkpoint import SqliteCheckpointSaver
+from react_agent.state import State
+
+DOCUMENT = "Раздел 4. Требования к участникам закупки, цена лота 1 500 000 руб. " * 1500
+
+
+def _answer(state: State) -> dict:
+    return {"messages": [AIMessage(content="Краткое резюме документа. " * 20)]}
+
+
+def _memory_bytes(saver: InMemorySaver) -> int:
+    total = sum(len(blob) for _, blob in saver.blobs.values())
+    for namespaces in saver.storage.values():
+        for checkpoints in namespaces.values():
+            for checkpoint, metadata, _ in checkpoints.values():
+                total += len(checkpoint[1]) + len(metadata[1])
+    for writes in saver.writes.values():
+        total += sum(len(w[2][1]) for w in writes.values())
+    return total
+
+
+def run(steps: int) -> None:
+    builder = StateGraph(State)
+    builder.add_node("answer", _answer)
+    builder.add_edge("__start__", "answer")
+
+    memory = InMemorySaver()
+    path = os.path.join(tempfile.mkdtemp(), "checkpoints.sqlite")
+    sqlite_saver = SqliteCheckpointSaver(path)
+    savers = {
+        "in-memory (full snapshots)": (memory, lambda: _memory_bytes(memory)),
+        "sqlite (dedup + zlib)": (sqlite_saver, lambda: sqlite_saver.bytes_written),
+    }
+
+    payload = len(DOCUMENT.encode("utf-8"))
+    print(f"document payload per step: {payload:,} bytes, steps: {steps}")
+    for name, (saver, written) in savers.items():
+        graph = builder.compile(checkpointer=saver)
+        config = {"configurable": {"thread_id": "bench"}}
+        per_step = []
+        for i in range(steps):
+            before = written()
+            graph.invoke(
+                {"messages": [HumanMessage(content=f"{i} {DOCUMENT}")]}, config
+            )
+            per_step.append(written() - before)
+        total = sum(per_step)
+        print(
+            f"{name:28} total {total:>12,} B | last step {per_step[-1]:>10,} B | "
+            f"amplification {total / (payload * steps):6.2f}x"
+        )
+
+    removed = sqlite_saver.compact(keep_last=1, vacuum=True)
+    print(f"compaction removed: {removed}, db size {os.path.getsize(path):,} B")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,109 @@
+"""Compare the streaming DOCX extractor with python-docx on a large document.
+
+Generates a synthetic tender document with paragraphs and a long price table,
+then reports wall time and peak traced memory for both extractors. python-docx
+only exposes tables separately from paragraphs, so its rows are appended at
+the end. It is optional and skipped when not installed.
+
+Run with: python benchmarks/docx_extraction.py [paragraphs] [table_rows]
+"""
+
+import io
+import sys
+import time
+import tracemalloc
+import zipfile
+
+from react_agent.docx_stream import docx_to_text
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    "</Types>"
+)
+RELS = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>'
+    "</Relationships>"
+)
+
+
+def _paragraph(text: str) -> str:
+    return f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>"
+
+
+def build_docx(paragraphs: int, rows: int) -> bytes:
+    parts = [f'<w:document xmlns:w="{W_NS}"><w:body>']
+    parts += [
+        _paragraph(
+            f"{i}. Участник закупки должен соответствовать требованиям раздела {i}."
+        )
+        for i in range(paragraphs)
+    ]
+    parts.append("<w:tbl>")
+    for i in range(rows):
+        cells = (
+            f"{i}",
+            f"Трансформатор ТМГ-{i}",
+            "шт",
+            f"{i % 50 + 1}",
+            f"{(i * 137) % 900000:,},00",
+        )
+        parts.append(
+            "<w:tr>"
+            + "".join(f"<w:tc>{_paragraph(c)}</w:tc>" for c in cells)
+            + "</w:tr>"
+        )
+    parts.append("</w:tbl></w:body></w:document>")
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", CONTENT_TYPES)
+        archive.writestr("_rels/.rels", RELS)
+        archive.writestr("word/document.xml", "".join(parts))
+    return buf.getvalue()
+
+
+def _python_docx(data: bytes) -> str:
+    import docx  # type: ignore[import-not-found]
+
+    document = docx.Document(io.BytesIO(data))
+    text = "".join(p.text + "\n" for p in document.paragraphs)
+    for table in document.tables:
+        for row in table.rows:
+            text += " | ".join(cell.text for cell in row.cells) + "\n"
+    return text
+
+
+def measure(name: str, extract, data: bytes) -> None:
+    # Time and memory are measured in separate runs: tracing slows Python code.
+    started = time.perf_counter()
+    text = extract(data)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    extract(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{name:14} {elapsed:8.3f} s | peak {peak / 2**20:8.1f} MiB | {len(text):>12,} chars"
+    )
+
+
+def run(paragraphs: int, rows: int) -> None:
+    data = build_docx(paragraphs, rows)
+    print(f"docx size {len(data):,} B ({paragraphs:,} paragraphs, {rows:,} table rows)")
+    measure("streaming", lambda d: docx_to_text(io.BytesIO(d)), data)
+    try:
+        measure("python-docx", _python_docx, data)
+    except ImportError:
+        print("python-docx    not installed, skipped")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    run(*(args + [20000, 50000][len(args) :]))
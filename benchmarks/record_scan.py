@@ -0,0 +1,82 @@
+"""Measure writing and scanning the columnar tender record file.
+
+Writes synthetic records, then runs a full scan of one column and two
+selective scans: a deadline range, which the min/max statistics can prune
+because records are appended roughly in date order, and an amount range,
+which has to look at every row group.
+
+Run with: python benchmarks/record_scan.py [records]
+"""
+
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+from react_agent.records import RecordWriter, TenderRecord, count_records, scan
+
+KEYWORDS = ["трансформатор", "кабель", "подстанция", "реле", "опора", "провод"]
+
+
+def _records(count: int):
+    rng = random.Random(42)
+    start = datetime.date(2024, 1, 1)
+    for i in range(count):
+        deadline = (start + datetime.timedelta(days=i * 730 // count)).isoformat()
+        price = round(rng.uniform(1e5, 5e7), 2)
+        yield TenderRecord(
+            source=f"/data/tenders/{i}.pdf",
+            sha256=f"{i:064x}",
+            kind="pdf",
+            tender_id=f"03732000012240{i:05d}",
+            chars=rng.randint(5_000, 500_000),
+            nmck=price,
+            max_amount=price,
+            amounts=[price, round(price * 0.01, 2)],
+            currencies=["RUB", "RUB"],
+            deadline=deadline,
+            dates=[deadline],
+            keywords=rng.sample(KEYWORDS, 2),
+            requirements=["Опыт поставок не менее 3 лет."],
+        )
+
+
+def _timed(label: str, run) -> None:
+    started = time.perf_counter()
+    rows = run()
+    print(f"{label:<32} {time.perf_counter() - started:7.3f} s, {rows:>9,} rows")
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "records.trec")
+
+        def write() -> int:
+            with RecordWriter(path) as writer:
+                for record in _records(count):
+                    writer.append(record)
+            return count_records(path)
+
+        _timed("write", write)
+        print(f"file size: {os.path.getsize(path) / 1e6:.1f} MB")
+        _timed("full scan (nmck)", lambda: sum(1 for _ in scan(path, ["nmck"])))
+        _timed(
+            "deadline in one month",
+            lambda: sum(
+                1
+                for _ in scan(
+                    path, ["source"], {"deadline": ("2025-03-01", "2025-03-31")}
+                )
+            ),
+        )
+        _timed(
+            "nmck above 45 mln",
+            lambda: sum(1 for _ in scan(path, ["source"], {"nmck": (45e6, None)})),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compare the linear clause segmenter with the old requirement regexes.
+
+Runs both on pathological inputs of growing size: table-like text without
+any sentence punctuation, long runs of punctuation and whitespace, and text
+where nearly every word is a requirement keyword. For a linear algorithm the
+time roughly doubles with the input size. The longest extracted requirement
+shows what the old patterns return when there is no punctuation to stop at.
+
+Run with: python benchmarks/requirement_segmentation.py [base_chars]
+"""
+
+import re
+import sys
+import time
+
+from react_agent.segmentation import segment
+
+OLD_PATTERNS = [
+    r"требовани[ея].*?(?:[\.!?]|$)",
+    r"услови[ея].*?(?:[\.!?]|$)",
+    r"критери[ий].*?(?:[\.!?]|$)",
+]
+
+
+def old_requirements(text: str) -> list:
+    requirements = []
+    for pattern in OLD_PATTERNS:
+        matches = re.findall(pattern, text, re.IGNORECASE | re.DOTALL)
+        requirements.extend(matches[:2])
+    return requirements
+
+
+def new_requirements(text: str) -> list:
+    return [c.text for c in segment(text) if c.tags]
+
+
+def _repeat(unit: str, size: int) -> str:
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+INPUTS = {
+    "table without punctuation": lambda n: _repeat(
+        "Трансформатор ТМГ-630 шт 2 требования по ГОСТ 11677 условия поставки склад ", n
+    ),
+    "punctuation runs": lambda n: _repeat("условие" + "." * 50 + " " * 50, n),
+    "blank-line runs": lambda n: _repeat("\n" + " \t" * 40, n),
+    "keyword on every word": lambda n: _repeat("требование условие критерий ", n),
+}
+
+
+def measure(extract, text: str) -> tuple:
+    started = time.perf_counter()
+    result = extract(text)
+    return time.perf_counter() - started, max((len(r) for r in result), default=0)
+
+
+def main() -> None:
+    base = int(sys.argv[1]) if len(sys.argv) > 1 else 250_000
+    for name, build in INPUTS.items():
+        print(f"== {name}")
+        for size in (base, base * 2, base * 4):
+            text = build(size)
+            old_time, old_longest = measure(old_requirements, text)
+            new_time, new_longest = measure(new_requirements, text)
+            print(
+                f"{size:>10,} chars | old {old_time:7.3f} s, longest {old_longest:>9,}"
+                f" | new {new_time:7.3f} s, longest {new_longest:>6,}"
+            )
+
+
+if __name__ == "__main__":
+    main()
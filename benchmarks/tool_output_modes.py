@@ -0,0 +1,75 @@
+"""Compare the token cost of verbose and compact tool outputs.
+
+Runs several tools on the same synthetic tender documents once with
+output_mode="verbose" and once with output_mode="compact" and prints the
+estimated tokens of each result. Every tool result is sent back to the model
+on the next step, so the difference is paid on each tool round-trip.
+
+Run with: python benchmarks/tool_output_modes.py [repeats]
+"""
+
+import asyncio
+import base64
+import sys
+
+from react_agent import tools
+from react_agent.budget import estimate_tokens
+from react_agent.context import Context
+
+SECTION = (
+    "Извещение о проведении закупки № 0373200001224000{n:03d}. "
+    "Предмет: поставка трансформаторов ТМГ-630 и кабеля ВВГнг 3x95. "
+    "НМЦК составляет {price} руб. Обеспечение заявки 1% от НМЦК. "
+    "Окончание подачи заявок 15.03.2025, вскрытие конвертов 17.03.2025. "
+    "Требования к участникам: опыт поставок не менее 3 лет, наличие лицензии. "
+    "Условия оплаты: в течение 30 дней после поставки.\n"
+)
+
+
+def _document(repeats: int) -> str:
+    return "".join(
+        SECTION.format(n=i, price=f"{1_000_000 + i * 25_000:,}".replace(",", " "))
+        for i in range(repeats)
+    )
+
+
+def _calls(text: str):
+    upload = "data:text/plain;base64," + base64.b64encode(text.encode()).decode()
+    return {
+        "calculate": lambda: tools.calculate("1250000 * 1.2 + 35000"),
+        "check_tender_deadline": lambda: tools.check_tender_deadline("15.03.2025"),
+        "extract_tender_info": lambda: tools.extract_tender_info(text),
+        "format_tender_report": lambda: tools.format_tender_report(
+            "Поставка трансформаторов", "1 250 000 руб.", "15.03.2025", "АО Энергосбыт"
+        ),
+        "process_uploaded_file": lambda: tools.process_uploaded_file(
+            upload, "tender.txt", "text/plain"
+        ),
+    }
+
+
+async def _measure(mode: str, text: str) -> dict:
+    tools._context = lambda: Context(output_mode=mode)
+    return {name: estimate_tokens(await call()) for name, call in _calls(text).items()}
+
+
+def main() -> None:
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    text = _document(repeats)
+    print(f"document: {len(text):,} chars, ~{estimate_tokens(text):,} tokens")
+    verbose = asyncio.run(_measure("verbose", text))
+    compact = asyncio.run(_measure("compact", text))
+    for name in verbose:
+        print(
+            f"{name:<24} verbose {verbose[name]:>7,} | compact {compact[name]:>7,}"
+            f" | saved {1 - compact[name] / verbose[name]:6.1%}"
+        )
+    total_verbose, total_compact = sum(verbose.values()), sum(compact.values())
+    print(
+        f"{'total':<24} verbose {total_verbose:>7,} | compact {total_compact:>7,}"
+        f" | saved {1 - total_compact / total_verbose:6.1%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Token budgets for tool results.
+
+Tool output competes with the conversation for the model's context window. The
+model node records how many tokens the last prompt took and how many tool calls
+the model requested; each tool result then gets a share of what is left,
+split between the pending calls. Long results are cut to that budget keeping
+the head, the tail and the middle sections with the most tender signal
+(domain keywords and money amounts) instead of an arbitrary character prefix.
+
+Tokens are estimated locally from character classes, which is fast, needs no
+tokenizer files and errs on the high side for Cyrillic text.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from react_agent.keywords import KeywordMatcher, get_keyword_matcher
+from react_agent.money import find_amounts
+from react_agent.retrieval import chunk_document
+
+DEFAULT_CONTEXT_WINDOW = 32_000
+# Matched as substrings of the model name, first match wins.
+CONTEXT_WINDOWS: Tuple[Tuple[str, int], ...] = (
+    ("gpt-4.1", 1_000_000),
+    ("gpt-4o", 128_000),
+    ("gpt-4-turbo", 128_000),
+    ("gpt-3.5", 16_385),
+    ("gpt-5", 400_000),
+    ("o1", 200_000),
+    ("o3", 200_000),
+    ("o4", 200_000),
+    ("claude", 200_000),
+    ("llama", 128_000),
+    ("qwen", 32_000),
+)
+RESPONSE_RESERVE_TOKENS = 4_096
+MIN_RESULT_TOKENS = 1_000
+HEAD_SHARE = 0.25
+TAIL_SHARE = 0.15
+
+_CYRILLIC = re.compile(r"[а-яё]+", re.IGNORECASE)
+_LATIN = re.compile(r"[a-z]+", re.IGNORECASE)
+_DIGITS = re.compile(r"\d+")
+_SYMBOLS = re.compile(r"[^\w\s]")
+_CHARS_PER_TOKEN = ((_CYRILLIC, 3), (_LATIN, 4), (_DIGITS, 3))
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in `text`.
+
+    Words are billed per character class (about 3 characters per token for
+    Cyrillic and digits, 4 for Latin), rounded up per word; every symbol
+    counts as one token.
+    """
+    total = 0
+    for pattern, chars_per_token in _CHARS_PER_TOKEN:
+        runs = pattern.findall(text)
+        total += (
+            sum(map(len, runs)) + (chars_per_token - 1) * len(runs)
+        ) // chars_per_token
+    return total + len(_SYMBOLS.findall(text))
+
+
+def context_window(model: str, override: int = 0) -> int:
+    """Return the context window of `model` in tokens."""
+    if override > 0:
+        return override
+    name = model.lower()
+    for fragment, window in CONTEXT_WINDOWS:
+        if fragment in name:
+            return window
+    return DEFAULT_CONTEXT_WINDOW
+
+
+_usage: OrderedDict[str, Tuple[int, int]] = OrderedDict()
+_usage_lock = threading.Lock()
+MAX_TRACKED_THREADS = 1024
+
+
+def record_usage(thread_id: str, prompt_tokens: int, tool_calls: int) -> None:
+    """Remember the prompt size and the number of requested tool calls."""
+    with _usage_lock:
+        _usage[thread_id] = (prompt_tokens, tool_calls)
+        _usage.move_to_end(thread_id)
+        while len(_usage) > MAX_TRACKED_THREADS:
+            _usage.popitem(last=False)
+
+
+def result_budget(
+    thread_id: str, model: str, window_override: int = 0, share: float = 0.5
+) -> int:
+    """Return the token budget of one tool result in the given thread.
+
+    Args:
+        thread_id: Thread whose last prompt size is used.
+        model: Fully specified model name, used to look up the context window.
+        window_override: Context window to use instead of the lookup, if > 0.
+        share: Part of the remaining context that tool results may take.
+    """
+    with _usage_lock:
+        prompt_tokens, tool_calls = _usage.get(thread_id, (0, 1))
+    remaining = (
+        context_window(model, window_override) - prompt_tokens - RESPONSE_RESERVE_TOKENS
+    )
+    return max(MIN_RESULT_TOKENS, int(remaining * share) // max(1, tool_calls))
+
+
+def _marker(tokens: int) -> str:
+    return f"\n[... пропущено ~{tokens} токенов ...]\n"
+
+
+def _cut(text: str, budget: int) -> str:
+    # Cyrillic is the densest class at ~3 characters per token.
+    return text[: budget * 3]
+
+
+def fit_to_budget(
+    text: str, budget: int, matcher: Optional[KeywordMatcher] = None
+) -> str:
+    """Shorten `text` to about `budget` tokens.
+
+    Keeps the head and the tail of the document and fills the rest of the
+    budget with the middle sections that have the most keyword and money
+    amount hits per token, in document order. Omitted parts are replaced by a
+    marker with their estimated size.
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+    chunks = chunk_document(text, max_chars=800)
+    if not chunks:
+        return _cut(text, budget)
+    costs = [estimate_tokens(c.text) for c in chunks]
+
+    head: List[int] = []
+    spent = 0
+    for i, cost in enumerate(costs):
+        if spent + cost > budget * HEAD_SHARE:
+            break
+        head.append(i)
+        spent += cost
+    tail: List[int] = []
+    spent = 0
+    for i in range(len(chunks) - 1, len(head) - 1, -1):
+        if spent + costs[i] > budget * TAIL_SHARE:
+            break
+        tail.append(i)
+        spent += costs[i]
+
+    middle = range(len(head), len(chunks) - len(tail))
+    scores = _signal(text, [(chunks[i].start, chunks[i].end) for i in middle], matcher)
+    ranked = sorted(
+        middle, key=lambda i: scores[i - len(head)] / max(1, costs[i]), reverse=True
+    )
+    available = budget - sum(costs[i] for i in head) - sum(costs[i] for i in tail)
+    chosen = set(head) | set(tail)
+    for i in ranked:
+        if scores[i - len(head)] and costs[i] <= available:
+            chosen.add(i)
+            available -= costs[i]
+
+    if not chosen:
+        return _cut(text, budget) + _marker(estimate_tokens(text) - budget)
+    parts: List[str] = []
+    skipped = 0
+    for i, chunk in enumerate(chunks):
+        if i in chosen:
+            if skipped:
+                parts.append(_marker(skipped))
+                skipped = 0
+            parts.append(chunk.text)
+        else:
+            skipped += costs[i]
+    if skipped:
+        parts.append(_marker(skipped))
+    return "\n".join(parts)
+
+
+def _signal(
+    text: str, spans: List[Tuple[int, int]], matcher: Optional[KeywordMatcher]
+) -> List[int]:
+    """Count keyword and money amount hits inside each (start, end) span."""
+    scores = [0] * len(spans)
+    if not spans:
+        return scores
+    matcher = matcher or get_keyword_matcher()
+    starts = [start for start, _ in spans]
+    offsets = [hit.start for hit in matcher.find_all(text)]
+    offsets += [amount.start for amount in find_amounts(text)]
+    for offset in offsets:
+        i = bisect_right(starts, offset) - 1
+        if i >= 0 and offset < spans[i][1]:
+            scores[i] += 1
+    return scores
@@ -0,0 +1,558 @@
+"""Persistent SQLite checkpointer for long tender threads.
+
+LangGraph already stores channel values per version, so only channels that
+changed in a step are written. The `messages` channel, however, changes on
+every step and holds the whole conversation, which means each step would
+rewrite every uploaded document again. This saver stores list-valued channels
+as lists of references into a content-addressed `chunks` table: a message is
+serialized and written once, and later versions of the channel only add the
+references to it. Large payloads are zlib-compressed.
+
+Superseded checkpoints can be pruned with `SqliteCheckpointSaver.compact`,
+which also garbage-collects blobs and chunks that are no longer referenced.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import zlib
+from collections.abc import AsyncIterator, Iterator, Sequence
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+from react_agent import metrics
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    hash TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    blob BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB NOT NULL,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+_ZLIB_SUFFIX = "+zlib"
+_REFS_TYPE = "refs"
+_EMPTY_TYPE = "empty"
+_SQL_BATCH = 500
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver[str]):
+    """A checkpoint saver that persists to a local SQLite file.
+
+    Args:
+        path: Path of the SQLite database file.
+        serde: Serializer for checkpoints and channel values.
+        compress_threshold: Payloads at least this many bytes long are
+            zlib-compressed before they are written.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        serde: Optional[SerializerProtocol] = None,
+        compress_threshold: int = 1024,
+    ) -> None:
+        """Open (and create if needed) the database at `path`."""
+        super().__init__(serde=serde)
+        self.path = path
+        self.compress_threshold = compress_threshold
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        self.conn.close()
+
+    # Encoding helpers
+
+    def _pack(self, typed: Tuple[str, bytes]) -> Tuple[str, bytes]:
+        type_, data = typed
+        if len(data) >= self.compress_threshold:
+            return type_ + _ZLIB_SUFFIX, zlib.compress(data)
+        return type_, data
+
+    @staticmethod
+    def _unpack(type_: str, data: bytes) -> Tuple[str, bytes]:
+        if type_.endswith(_ZLIB_SUFFIX):
+            return type_[: -len(_ZLIB_SUFFIX)], zlib.decompress(data)
+        return type_, data
+
+    def _count(self, size: int) -> None:
+        self.bytes_written += size
+        metrics.increment("checkpoint.bytes_written", size)
+
+    def _dump_value(self, value: Any) -> Tuple[str, bytes]:
+        """Serialize a channel value, moving list items into `chunks`."""
+        if not isinstance(value, list) or not value:
+            type_, data = self._pack(self.serde.dumps_typed(value))
+            self._count(len(data))
+            return type_, data
+
+        hashes: List[str] = []
+        for item in value:
+            item_type, item_data = self.serde.dumps_typed(item)
+            digest = hashlib.sha256(item_type.encode() + b"\0" + item_data).hexdigest()
+            packed_type, packed = self._pack((item_type, item_data))
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO chunks (hash, type, blob) VALUES (?, ?, ?)",
+                (digest, packed_type, packed),
+            )
+            if cursor.rowcount:
+                self._count(len(packed))
+            hashes.append(digest)
+        type_, data = self._pack((_REFS_TYPE, json.dumps(hashes).encode()))
+        self._count(len(data))
+        return type_, data
+
+    def _load_value(self, type_: str, data: bytes) -> Any:
+        type_, data = self._unpack(type_, data)
+        if type_ != _REFS_TYPE:
+            return self.serde.loads_typed((type_, data))
+
+        hashes: List[str] = json.loads(data)
+        found: Dict[str, Any] = {}
+        unique = list(dict.fromkeys(hashes))
+        for start in range(0, len(unique), _SQL_BATCH):
+            batch = unique[start : start + _SQL_BATCH]
+            rows = self.conn.execute(
+                f"SELECT hash, type, blob FROM chunks WHERE hash IN ({','.join('?' * len(batch))})",
+                batch,
+            ).fetchall()
+            for digest, chunk_type, chunk in rows:
+                found[digest] = self.serde.loads_typed(self._unpack(chunk_type, chunk))
+        return [found[h] for h in hashes]
+
+    def _load_blobs(
+        self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions
+    ) -> Dict[str, Any]:
+        channel_values: Dict[str, Any] = {}
+        for channel, version in versions.items():
+            row = self.conn.execute(
+                "SELECT type, blob FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? "
+                "AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if row is not None and row[0] != _EMPTY_TYPE:
+                channel_values[channel] = self._load_value(row[0], row[1])
+        return channel_values
+
+    def _make_tuple(
+        self,
+        thread_id: str,
+        checkpoint_ns: str,
+        row: Tuple[str, Optional[str], str, bytes, str, bytes],
+        metadata: Optional[CheckpointMetadata] = None,
+    ) -> CheckpointTuple:
+        checkpoint_id, parent_id, type_, data, metadata_type, metadata_blob = row
+        checkpoint: Checkpoint = self.serde.loads_typed(self._unpack(type_, data))
+        if metadata is None:
+            metadata = self.serde.loads_typed(
+                self._unpack(metadata_type, metadata_blob)
+            )
+        writes = self.conn.execute(
+            "SELECT task_id, channel, type, blob FROM writes WHERE thread_id = ? "
+            "AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={
+                **checkpoint,
+                "channel_values": self._load_blobs(
+                    thread_id, checkpoint_ns, checkpoint["channel_versions"]
+                ),
+            },
+            metadata=metadata,
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+            pending_writes=[
+                (task_id, channel, self._load_value(w_type, w_blob))
+                for task_id, channel, w_type, w_blob in writes
+            ],
+        )
+
+    # BaseCheckpointSaver interface
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Get the requested checkpoint, or the latest one for the thread."""
+        thread_id: str = config["configurable"]["thread_id"]
+        checkpoint_ns: str = config["configurable"].get("checkpoint_ns", "")
+        query = (
+            "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+            "metadata_type, metadata FROM checkpoints "
+            "WHERE thread_id = ? AND checkpoint_ns = ?"
+        )
+        params: List[Any] = [thread_id, checkpoint_ns]
+        if checkpoint_id := get_checkpoint_id(config):
+            query += " AND checkpoint_id = ?"
+            params.append(checkpoint_id)
+        else:
+            query += " ORDER BY checkpoint_id DESC LIMIT 1"
+        with self._lock:
+            row = self.conn.execute(query, params).fetchone()
+            if row is None:
+                return None
+            return self._make_tuple(thread_id, checkpoint_ns, row)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """List checkpoints, newest first."""
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+            "type, checkpoint, metadata_type, metadata FROM checkpoints"
+        )
+        clauses: List[str] = []
+        params: List[Any] = []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (
+                checkpoint_ns := config["configurable"].get("checkpoint_ns")
+            ) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY thread_id, checkpoint_ns, checkpoint_id DESC"
+
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+            results: List[CheckpointTuple] = []
+            for thread_id, checkpoint_ns, *row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                metadata = self.serde.loads_typed(self._unpack(row[4], row[5]))
+                if filter and not all(
+                    metadata.get(key) == value for key, value in filter.items()
+                ):
+                    continue
+                results.append(
+                    self._make_tuple(thread_id, checkpoint_ns, tuple(row), metadata)  # type: ignore[arg-type]
+                )
+        yield from results
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Save a checkpoint and the channel values that changed with it."""
+        c = checkpoint.copy()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        values: Dict[str, Any] = c.pop("channel_values")  # type: ignore[misc]
+        with self._lock, self.conn:
+            for channel, version in new_versions.items():
+                if channel in values:
+                    type_, blob = self._dump_value(values[channel])
+                else:
+                    type_, blob = _EMPTY_TYPE, b""
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO blobs "
+                    "(thread_id, checkpoint_ns, channel, version, type, blob) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (thread_id, checkpoint_ns, channel, str(version), type_, blob),
+                )
+            type_, data = self._pack(self.serde.dumps_typed(c))
+            metadata_type, metadata_blob = self._pack(
+                self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+            )
+            self._count(len(data) + len(metadata_blob))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, "
+                "checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+                "metadata_type, metadata) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    config["configurable"].get("checkpoint_id"),
+                    type_,
+                    data,
+                    metadata_type,
+                    metadata_blob,
+                ),
+            )
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Save intermediate writes of a task for the given checkpoint."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        with self._lock, self.conn:
+            for idx, (channel, value) in enumerate(writes):
+                write_idx = WRITES_IDX_MAP.get(channel, idx)
+                type_, blob = self._pack(self.serde.dumps_typed(value))
+                verb = "INSERT OR IGNORE" if write_idx >= 0 else "INSERT OR REPLACE"
+                cursor = self.conn.execute(
+                    f"{verb} INTO writes (thread_id, checkpoint_ns, checkpoint_id, "
+                    "task_id, idx, channel, type, blob, task_path) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        thread_id,
+                        checkpoint_ns,
+                        checkpoint_id,
+                        task_id,
+                        write_idx,
+                        channel,
+                        type_,
+                        blob,
+                        task_path,
+                    ),
+                )
+                if cursor.rowcount:
+                    self._count(len(blob))
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete all checkpoints, blobs and writes of a thread."""
+        with self._lock, self.conn:
+            for table in ("checkpoints", "blobs", "writes"):
+                self.conn.execute(
+                    f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,)
+                )
+            self._collect_chunks()
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        """Generate a monotonically increasing, sortable version string."""
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Async version of `get_tuple`, run in a worker thread."""
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        """Async version of `list`, run in a worker thread."""
+        items = await asyncio.to_thread(
+            lambda: [*self.list(config, filter=filter, before=before, limit=limit)]
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Async version of `put`, run in a worker thread."""
+        return await asyncio.to_thread(
+            self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Async version of `put_writes`, run in a worker thread."""
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        """Async version of `delete_thread`, run in a worker thread."""
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    # Compaction
+
+    def compact(
+        self, thread_id: Optional[str] = None, keep_last: int = 1, vacuum: bool = False
+    ) -> Dict[str, int]:
+        """Prune superseded checkpoints and unreferenced payloads.
+
+        Args:
+            thread_id: Only compact this thread. Compacts all threads if None.
+            keep_last: Number of most recent checkpoints to keep per thread
+                and namespace.
+            vacuum: Run `VACUUM` afterwards to return free pages to the OS.
+
+        Returns:
+            dict: Number of removed checkpoints, writes, blobs and chunks.
+        """
+        removed = {"checkpoints": 0, "writes": 0, "blobs": 0, "chunks": 0}
+        with self._lock, self.conn:
+            thread_filter = "WHERE thread_id = ?" if thread_id else ""
+            thread_params = (thread_id,) if thread_id else ()
+            namespaces = self.conn.execute(
+                f"SELECT DISTINCT thread_id, checkpoint_ns FROM checkpoints {thread_filter}",
+                thread_params,
+            ).fetchall()
+            for t_id, ns in namespaces:
+                stale = [
+                    row[0]
+                    for row in self.conn.execute(
+                        "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? "
+                        "AND checkpoint_ns = ? ORDER BY checkpoint_id DESC "
+                        "LIMIT -1 OFFSET ?",
+                        (t_id, ns, keep_last),
+                    )
+                ]
+                for checkpoint_id in stale:
+                    key = (t_id, ns, checkpoint_id)
+                    removed["writes"] += self.conn.execute(
+                        "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? "
+                        "AND checkpoint_id = ?",
+                        key,
+                    ).rowcount
+                    removed["checkpoints"] += self.conn.execute(
+                        "DELETE FROM checkpoints WHERE thread_id = ? "
+                        "AND checkpoint_ns = ? AND checkpoint_id = ?",
+                        key,
+                    ).rowcount
+
+                live = set()
+                for type_, data in self.conn.execute(
+                    "SELECT type, checkpoint FROM checkpoints WHERE thread_id = ? "
+                    "AND checkpoint_ns = ?",
+                    (t_id, ns),
+                ):
+                    checkpoint = self.serde.loads_typed(self._unpack(type_, data))
+                    live.update(
+                        (channel, str(version))
+                        for channel, version in checkpoint["channel_versions"].items()
+                    )
+                for channel, version in self.conn.execute(
+                    "SELECT channel, version FROM blobs WHERE thread_id = ? "
+                    "AND checkpoint_ns = ?",
+                    (t_id, ns),
+                ).fetchall():
+                    if (channel, version) not in live:
+                        removed["blobs"] += self.conn.execute(
+                            "DELETE FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? "
+                            "AND channel = ? AND version = ?",
+                            (t_id, ns, channel, version),
+                        ).rowcount
+            removed["chunks"] = self._collect_chunks()
+        if vacuum:
+            with self._lock:
+                self.conn.execute("VACUUM")
+                self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return removed
+
+    def _collect_chunks(self) -> int:
+        """Delete chunks that no blob references any more."""
+        self.conn.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS live_chunks (hash TEXT PRIMARY KEY)"
+        )
+        self.conn.execute("DELETE FROM live_chunks")
+        for type_, blob in self.conn.execute(
+            "SELECT type, blob FROM blobs WHERE type LIKE ?", (_REFS_TYPE + "%",)
+        ).fetchall():
+            _, data = self._unpack(type_, blob)
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO live_chunks (hash) VALUES (?)",
+                ((h,) for h in json.loads(data)),
+            )
+        return self.conn.execute(
+            "DELETE FROM chunks WHERE hash NOT IN (SELECT hash FROM live_chunks)"
+        ).rowcount
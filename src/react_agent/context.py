@@ -36,6 +36,300 @@ class Context:
         },
     )
 
+    llm_cache_path: str = field(
+        default="",
+        metadata={
+            "description": "Path to a local SQLite file used as an exact-match cache "
+            "for model responses. Leave empty to disable the cache."
+        },
+    )
+
+    llm_cache_ttl_seconds: int = field(
+        default=86400,
+        metadata={
+            "description": "How long a cached model response stays valid, in seconds."
+        },
+    )
+
+    llm_cache_max_entries: int = field(
+        default=1000,
+        metadata={
+            "description": "Maximum number of cached responses. The least recently "
+            "used entries are evicted first."
+        },
+    )
+
+    llm_cache_bypass: bool = field(
+        default=False,
+        metadata={
+            "description": "Skip the response cache for this request: always call "
+            "the model and do not store the answer."
+        },
+    )
+
+    dedup_db_path: str = field(
+        default="",
+        metadata={
+            "description": "Path to a local SQLite file with MinHash signatures of "
+            "analyzed documents, used to detect near-duplicate tenders. "
+            "Leave empty to disable duplicate detection."
+        },
+    )
+
+    dedup_threshold: float = field(
+        default=0.9,
+        metadata={
+            "description": "Estimated Jaccard similarity above which a document is "
+            "treated as a repeat of an already analyzed one."
+        },
+    )
+
+    dedup_mode: str = field(
+        default="flag",
+        metadata={
+            "description": "What to do with near-duplicates: 'flag' analyzes the "
+            "document and notes the match, 'skip' reuses the previous analysis."
+        },
+    )
+
+    keyword_dictionary_path: str = field(
+        default="",
+        metadata={
+            "description": "Path to a JSON keyword dictionary ({category: [terms]}) "
+            "used to tag tender documents. Leave empty to use the built-in "
+            "energy-sector vocabulary."
+        },
+    )
+
+    deadline_db_path: str = field(
+        default="",
+        metadata={
+            "description": "Path to a local SQLite file where deadlines found in "
+            "analyzed documents are indexed by date for the upcoming deadlines "
+            "tool. Leave empty to disable the index."
+        },
+    )
+
+    records_path: str = field(
+        default="",
+        metadata={
+            "description": "Default output file of the batch export tool: an "
+            "append-only columnar file with one structured record per document."
+        },
+    )
+
+    context_window_tokens: int = field(
+        default=0,
+        metadata={
+            "description": "Context window of the model in tokens, used to budget "
+            "tool results. 0 looks it up from the model name."
+        },
+    )
+
+    tool_result_share: float = field(
+        default=0.5,
+        metadata={
+            "description": "Share of the remaining context window that tool results "
+            "of one step may take; it is split between parallel tool calls."
+        },
+    )
+
+    stall_threshold_ms: int = field(
+        default=0,
+        metadata={
+            "description": "Record event-loop stalls longer than this many "
+            "milliseconds, attributed to the running tool or node. 0 disables "
+            "the watchdog."
+        },
+    )
+
+    stall_log_path: str = field(
+        default="",
+        metadata={
+            "description": "JSON-lines file for stall records with stack samples. "
+            "Stalls are always counted in metrics; leave empty to skip the log."
+        },
+    )
+
+    metrics_path: str = field(
+        default="",
+        metadata={
+            "description": "JSON file the in-process metrics snapshot is written to "
+            "for scraping, replaced atomically. Leave empty to keep metrics in memory."
+        },
+    )
+
+    metrics_interval_ms: int = field(
+        default=15000,
+        metadata={
+            "description": "How often the metrics snapshot is rewritten to metrics_path."
+        },
+    )
+
+    max_model_concurrency: int = field(
+        default=32,
+        metadata={
+            "description": "Upper bound for concurrent calls to one provider/model "
+            "in this process. The actual limit adapts to 429 responses and "
+            "latency. 0 disables client-side rate limiting."
+        },
+    )
+
+    hedge_requests: bool = field(
+        default=False,
+        metadata={
+            "description": "Send a duplicate model request when the first one is "
+            "slower than the hedge quantile of recent latencies; the first "
+            "successful response wins."
+        },
+    )
+
+    hedge_model: str = field(
+        default="",
+        metadata={
+            "description": "Model for the hedged request, in provider/model-name "
+            "form. Empty uses the same model."
+        },
+    )
+
+    hedge_quantile: float = field(
+        default=0.95,
+        metadata={
+            "description": "Latency quantile of recent calls after which the "
+            "hedged request is sent."
+        },
+    )
+
+    hedge_min_delay_ms: int = field(
+        default=2000,
+        metadata={
+            "description": "Lower bound for the hedge delay, also used until "
+            "enough latencies have been observed."
+        },
+    )
+
+    routing_table: str = field(
+        default="",
+        metadata={
+            "description": "JSON object mapping step classes (simple, tool_results, "
+            "reasoning) to models in provider/model-name form, e.g. "
+            '{"simple": "openai/gpt-4o-mini"}. Unlisted classes use `model`; '
+            "empty disables routing."
+        },
+    )
+
+    routing_simple_max_tokens: int = field(
+        default=800,
+        metadata={
+            "description": "Largest total size of pending tool results, in tokens, "
+            "for a step to count as simple."
+        },
+    )
+
+    tool_payload_limit_bytes: int = field(
+        default=64 * 1024 * 1024,
+        metadata={
+            "description": "Largest in-memory size of the arguments of one tool call. "
+            "Larger calls are rejected (or spilled, see `tool_spill_dir`) before "
+            "the tool runs. 0 disables the check."
+        },
+    )
+
+    tool_payload_limits: str = field(
+        default="",
+        metadata={
+            "description": "JSON object with per-tool argument size limits in bytes "
+            'that override `tool_payload_limit_bytes`, e.g. {"cloud_file_processor": 20000000}.'
+        },
+    )
+
+    tool_spill_dir: str = field(
+        default="",
+        metadata={
+            "description": "Directory where oversized file payloads are saved instead "
+            "of being rejected; the model gets the path to analyze the file from "
+            "disk. Empty rejects oversized calls."
+        },
+    )
+
+    tool_memoization: bool = field(
+        default=True,
+        metadata={
+            "description": "Answer repeated calls of idempotent tools in a thread from "
+            "a cache keyed on the arguments and the modification time of the files "
+            "they name."
+        },
+    )
+
+    tool_memory_tracking: bool = field(
+        default=False,
+        metadata={
+            "description": "Trace Python allocations during tool calls and export "
+            "the peak of each call as the `tool.memory_peak_bytes` metric."
+        },
+    )
+
+    shared_cache_dir: str = field(
+        default="",
+        metadata={
+            "description": "Local directory for the extraction cache shared by all "
+            "worker processes on the host: extracted text and analysis results are "
+            "stored there by content hash. Leave empty to disable the cache."
+        },
+    )
+
+    shared_cache_max_mb: int = field(
+        default=512,
+        metadata={
+            "description": "Size limit of the shared extraction cache in megabytes. "
+            "The least recently used entries are removed first."
+        },
+    )
+
+    prefetch_attachments: bool = field(
+        default=False,
+        metadata={
+            "description": "Start extracting files attached to a user message in the "
+            "background before the first model call, so the upload tools can reuse "
+            "the result."
+        },
+    )
+
+    progress_interval_ms: int = field(
+        default=500,
+        metadata={
+            "description": "Minimum time between progress events of one tool call "
+            "within a stage, sent to clients streaming in custom mode. 0 disables "
+            "progress events."
+        },
+    )
+
+    loop_max_repeats: int = field(
+        default=2,
+        metadata={
+            "description": "How many times the same tool arguments may return the "
+            "same result within one turn before further repeats are treated as a "
+            "loop. 0 disables loop detection."
+        },
+    )
+
+    loop_max_hints: int = field(
+        default=1,
+        metadata={
+            "description": "How many times a detected loop is answered with a "
+            "corrective hint to the model before the run is stopped."
+        },
+    )
+
+    output_mode: str = field(
+        default="verbose",
+        metadata={
+            "description": "How tools format their results: 'verbose' returns "
+            "human-readable reports, 'compact' returns only the extracted fields "
+            "as minimal JSON, which costs far fewer tokens per tool round-trip."
+        },
+    )
+
     def __post_init__(self) -> None:
         """Fetch env vars for attributes that were not passed as args."""
         for f in fields(self):
@@ -43,4 +337,17 @@ class Context:
                 continue
 
             if getattr(self, f.name) == f.default:
-                setattr(self, f.name, os.environ.get(f.name.upper(), f.default))
+                value = os.environ.get(f.name.upper())
+                if value is not None:
+                    setattr(self, f.name, _coerce(value, f.default))
+
+
+def _coerce(value: str, default: object) -> object:
+    """Convert an env var string to the type of the field's default."""
+    if isinstance(default, bool):
+        return value.strip().lower() in {"1", "true", "yes", "on"}
+    if isinstance(default, int):
+        return int(value)
+    if isinstance(default, float):
+        return float(value)
+    return value
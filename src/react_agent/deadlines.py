@@ -0,0 +1,255 @@
+"""Sorted on-disk index of tender deadlines.
+
+Dates that read as deadlines ("окончание подачи заявок 15.03.2025",
+"не позднее 1 апреля 2025 г.") are extracted from every analyzed document
+and stored in SQLite in a table clustered by date (a `WITHOUT ROWID` B-tree
+keyed on the date). Range and "next N" queries are a single index seek plus a
+scan of the returned rows, so they stay logarithmic in the number of indexed
+deadlines. Re-analyzing a document replaces its rows, and a document with a
+known tender number replaces that tender's earlier deadlines of the same kind
+(a republished notice moves the date), so the index is updated incrementally
+as documents come in.
+"""
+
+from __future__ import annotations
+
+import datetime
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import List, Optional
+
+_MONTHS = {
+    "января": 1,
+    "февраля": 2,
+    "марта": 3,
+    "апреля": 4,
+    "мая": 5,
+    "июня": 6,
+    "июля": 7,
+    "августа": 8,
+    "сентября": 9,
+    "октября": 10,
+    "ноября": 11,
+    "декабря": 12,
+}
+DATE_PATTERN = re.compile(
+    r"(?<!\d)(?:"
+    r"(?P<d>\d{1,2})[./-](?P<m>\d{1,2})[./-](?P<y>\d{4}|\d{2})"
+    r"|(?P<iy>\d{4})-(?P<im>\d{1,2})-(?P<id>\d{1,2})"
+    rf"|(?P<wd>\d{{1,2}})\s+(?P<wm>{'|'.join(_MONTHS)})\s+(?P<wy>\d{{4}})"
+    r")(?!\d)",
+    re.IGNORECASE,
+)
+# Phrases in front of a date that make it a deadline, mapped to its kind.
+DEADLINE_CUES = (
+    (
+        re.compile(r"оконча\w*|подач\w*|при[её]м\w* заяв\w*|вскрыт\w*", re.IGNORECASE),
+        "подача заявок",
+    ),
+    (re.compile(r"срок\w*|не позднее|\bдо$", re.IGNORECASE), "срок"),
+)
+TENDER_NUMBER = re.compile(
+    r"(?:закупк|извещени|тендер|процедур|аукцион|конкурс)\w*\s+№\s*(?P<number>[\w./-]*\w)",
+    re.IGNORECASE,
+)
+# How far in front of a date a cue is looked for, in characters. The search
+# also stops at the start of the sentence or line.
+CUE_WINDOW = 80
+_SENTENCE_BREAK = re.compile(r"[.;!?]\s+(?=[А-ЯЁA-Z])|\n")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS deadlines (
+    due TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL,
+    tender_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    context TEXT NOT NULL,
+    PRIMARY KEY (due, doc_id, start)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS deadlines_by_doc ON deadlines (doc_id);
+CREATE INDEX IF NOT EXISTS deadlines_by_tender ON deadlines (tender_id, kind);
+"""
+
+
+@dataclass(frozen=True)
+class Deadline:
+    """A deadline found in a document, with its text offsets."""
+
+    due: datetime.date
+    start: int
+    end: int
+    kind: str
+    context: str
+
+
+@dataclass(frozen=True)
+class IndexedDeadline:
+    """A deadline stored in the index."""
+
+    due: datetime.date
+    tender_id: str
+    source: str
+    start: int
+    end: int
+    kind: str
+    context: str
+
+
+def _to_date(match: re.Match[str]) -> Optional[datetime.date]:
+    if match.group("d"):
+        day, month, year = (
+            int(match.group("d")),
+            int(match.group("m")),
+            int(match.group("y")),
+        )
+        if year < 100:
+            year += 2000
+    elif match.group("iy"):
+        day, month, year = (
+            int(match.group("id")),
+            int(match.group("im")),
+            int(match.group("iy")),
+        )
+    else:
+        day, month, year = (
+            int(match.group("wd")),
+            _MONTHS[match.group("wm").lower()],
+            int(match.group("wy")),
+        )
+    try:
+        return datetime.date(year, month, day)
+    except ValueError:
+        return None
+
+
+def find_deadlines(text: str) -> List[Deadline]:
+    """Find dates that are preceded by a deadline phrase."""
+    deadlines = []
+    for match in DATE_PATTERN.finditer(text):
+        before = text[max(0, match.start() - CUE_WINDOW) : match.start()]
+        breaks = [m.end() for m in _SENTENCE_BREAK.finditer(before)]
+        if breaks:
+            before = before[breaks[-1] :]
+        kind = next(
+            (kind for cue, kind in DEADLINE_CUES if cue.search(before.rstrip())), None
+        )
+        due = _to_date(match)
+        if kind is None or due is None:
+            continue
+        context = " ".join((before + match.group()).split())
+        deadlines.append(Deadline(due, match.start(), match.end(), kind, context))
+    return deadlines
+
+
+def tender_number(text: str) -> Optional[str]:
+    """Return the procurement number mentioned in the text, if any."""
+    match = TENDER_NUMBER.search(text)
+    return match.group("number") if match else None
+
+
+class DeadlineIndex:
+    """Persistent index of deadlines ordered by date."""
+
+    def __init__(self, path: str):
+        """Open (and create if needed) the index database at `path`."""
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+    def add_document(
+        self, doc_id: str, tender_id: str, source: str, deadlines: List[Deadline]
+    ) -> None:
+        """Replace the deadlines of one document.
+
+        Rows of the same tender and kind left by other documents (an earlier
+        publication of the notice) are replaced as well.
+        """
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM deadlines WHERE doc_id = ?", (doc_id,))
+            self.conn.executemany(
+                "DELETE FROM deadlines WHERE tender_id = ? AND kind = ?",
+                ((tender_id, kind) for kind in {d.kind for d in deadlines}),
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO deadlines "
+                "(due, doc_id, start, end, tender_id, source, kind, context) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        d.due.isoformat(),
+                        doc_id,
+                        d.start,
+                        d.end,
+                        tender_id,
+                        source,
+                        d.kind,
+                        d.context,
+                    )
+                    for d in deadlines
+                ),
+            )
+
+    def between(
+        self,
+        first: datetime.date,
+        last: Optional[datetime.date] = None,
+        limit: int = 100,
+    ) -> List[IndexedDeadline]:
+        """Return deadlines from `first` to `last` inclusive (open-ended without `last`)."""
+        query = (
+            "SELECT due, tender_id, source, start, end, kind, context FROM deadlines "
+            "WHERE due >= ?"
+        )
+        params: list = [first.isoformat()]
+        if last is not None:
+            query += " AND due <= ?"
+            params.append(last.isoformat())
+        query += " ORDER BY due, doc_id, start LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [
+            IndexedDeadline(datetime.date.fromisoformat(row[0]), *row[1:])
+            for row in rows
+        ]
+
+    def upcoming(
+        self, limit: int = 10, today: Optional[datetime.date] = None
+    ) -> List[IndexedDeadline]:
+        """Return the next `limit` deadlines from `today` on."""
+        return self.between(today or datetime.date.today(), None, limit)
+
+    def __len__(self) -> int:
+        """Return the number of indexed deadlines."""
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM deadlines").fetchone()[0]
+
+
+_indexes: dict[str, DeadlineIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_deadline_index(path: str) -> DeadlineIndex:
+    """Return the process-wide index for `path`, opening it on first use."""
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = DeadlineIndex(path)
+        return _indexes[path]
+
+
+def index_document(path: str, doc_id: str, source: str, text: str) -> None:
+    """Extract the deadlines of a document and store them in the index at `path`.
+
+    Documents without a tender number are keyed by the start of `doc_id`.
+    """
+    get_deadline_index(path).add_document(
+        doc_id, tender_number(text) or doc_id[:12], source, find_deadlines(text)
+    )
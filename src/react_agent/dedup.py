@@ -0,0 +1,203 @@
+"""Near-duplicate detection for tender documents.
+
+Documents are reduced to MinHash signatures over word shingles and stored in a
+SQLite-backed LSH index (banding), so a lookup only compares the signature
+against the few documents that share at least one band bucket. The index lives
+on disk, which keeps it usable with hundreds of thousands of documents.
+
+Signatures use one-permutation hashing: every shingle is hashed once and lands
+in one of `NUM_PERM` bins, keeping the minimum per bin. Empty bins are filled
+from the next non-empty bin (rotation densification), so signatures of short
+documents stay comparable.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_MAX_HASH = (1 << 64) - 1
+_SIGNATURE = struct.Struct(f"<{NUM_PERM}Q")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    analysis TEXT,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bands (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    doc_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bands_lookup ON bands (band, bucket);
+"""
+
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Iterable[str]:
+    """Yield word n-grams of the normalized text."""
+    tokens = _TOKEN.findall(text.lower())
+    if len(tokens) < size:
+        if tokens:
+            yield " ".join(tokens)
+        return
+    for i in range(len(tokens) - size + 1):
+        yield " ".join(tokens[i : i + size])
+
+
+def minhash_signature(text: str) -> List[int]:
+    """Compute a `NUM_PERM`-long MinHash signature for `text`."""
+    bins = [_MAX_HASH] * NUM_PERM
+    for shingle in set(shingles(text)):
+        h = _hash64(shingle.encode("utf-8"))
+        i = h % NUM_PERM
+        value = h // NUM_PERM
+        if value < bins[i]:
+            bins[i] = value
+    if all(v == _MAX_HASH for v in bins):
+        return bins
+    # Rotation densification: borrow from the next non-empty bin.
+    for i in range(NUM_PERM):
+        offset = 1
+        while bins[i] == _MAX_HASH:
+            source = bins[(i + offset) % NUM_PERM]
+            if source != _MAX_HASH:
+                bins[i] = source + offset
+                break
+            offset += 1
+    return bins
+
+
+def similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    """Estimate the Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def _band_buckets(signature: Sequence[int]) -> List[int]:
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS : (band + 1) * ROWS]
+        digest = _hash64(struct.pack(f"<{ROWS}Q", *rows))
+        # SQLite integers are signed 64-bit.
+        buckets.append(digest - (1 << 63))
+    return buckets
+
+
+@dataclass(frozen=True)
+class DuplicateMatch:
+    """A previously indexed document similar to the one being checked."""
+
+    doc_id: str
+    source: str
+    similarity: float
+    analysis: Optional[str]
+
+
+class DedupIndex:
+    """Persistent LSH index of document signatures."""
+
+    def __init__(self, path: str):
+        """Open (and create if needed) the index database at `path`."""
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+    def find_similar(
+        self, signature: Sequence[int], threshold: float, exclude: str = ""
+    ) -> Optional[DuplicateMatch]:
+        """Return the most similar indexed document above `threshold`."""
+        buckets = _band_buckets(signature)
+        with self._lock:
+            candidates = {
+                row[0]
+                for band, bucket in enumerate(buckets)
+                for row in self.conn.execute(
+                    "SELECT doc_id FROM bands WHERE band = ? AND bucket = ?",
+                    (band, bucket),
+                )
+                if row[0] != exclude
+            }
+            best: Optional[DuplicateMatch] = None
+            for doc_id in candidates:
+                source, blob, analysis = self.conn.execute(
+                    "SELECT source, signature, analysis FROM documents WHERE doc_id = ?",
+                    (doc_id,),
+                ).fetchone()
+                score = similarity(signature, _SIGNATURE.unpack(blob))
+                if score >= threshold and (best is None or score > best.similarity):
+                    best = DuplicateMatch(doc_id, source, score, analysis)
+        return best
+
+    def get(self, doc_id: str) -> Optional[DuplicateMatch]:
+        """Return an exactly matching document (same content hash)."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT source, analysis FROM documents WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+        return DuplicateMatch(doc_id, row[0], 1.0, row[1]) if row else None
+
+    def add(
+        self,
+        doc_id: str,
+        source: str,
+        signature: Sequence[int],
+        analysis: Optional[str] = None,
+    ) -> None:
+        """Index a document; re-adding the same id only updates its analysis."""
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO documents (doc_id, source, signature, analysis, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (doc_id, source, _SIGNATURE.pack(*signature), analysis, time.time()),
+            )
+            if cursor.rowcount:
+                self.conn.executemany(
+                    "INSERT INTO bands (band, bucket, doc_id) VALUES (?, ?, ?)",
+                    (
+                        (band, bucket, doc_id)
+                        for band, bucket in enumerate(_band_buckets(signature))
+                    ),
+                )
+            elif analysis is not None:
+                self.conn.execute(
+                    "UPDATE documents SET analysis = ? WHERE doc_id = ?",
+                    (analysis, doc_id),
+                )
+
+    def __len__(self) -> int:
+        """Return the number of indexed documents."""
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+
+_indexes: dict[str, DedupIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_dedup_index(path: str) -> DedupIndex:
+    """Return the process-wide index for `path`, opening it on first use."""
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = DedupIndex(path)
+        return _indexes[path]
@@ -0,0 +1,107 @@
+"""Streaming text extraction for DOCX files.
+
+Reads `word/document.xml` straight from the zip archive with an incremental
+XML parser and yields paragraphs and table rows in document order. Parsed
+elements are released as soon as a top-level block is finished, so memory
+stays bounded by the largest single paragraph or table row instead of the
+whole document object model.
+"""
+
+from __future__ import annotations
+
+import zipfile
+from dataclasses import dataclass
+from typing import IO, Iterator, List, Tuple, Union
+from xml.etree import ElementTree
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_P = _W + "p"
+_T = _W + "t"
+_TAB = _W + "tab"
+_BREAKS = {_W + "br", _W + "cr"}
+_TBL = _W + "tbl"
+_TR = _W + "tr"
+_TC = _W + "tc"
+
+# document > body > top-level block
+_TOP_LEVEL_DEPTH = 3
+
+
+@dataclass(frozen=True)
+class DocxBlock:
+    """A paragraph or a table row, in document order."""
+
+    kind: str
+    text: str = ""
+    cells: Tuple[str, ...] = ()
+
+    def as_text(self) -> str:
+        """Render the block as one line of plain text."""
+        if self.kind == "row":
+            return " | ".join(self.cells)
+        return self.text
+
+
+def iter_docx_blocks(source: Union[str, IO[bytes]]) -> Iterator[DocxBlock]:
+    """Yield the paragraphs and table rows of a DOCX file.
+
+    Args:
+        source: Path to the file or a binary file object.
+
+    Raises:
+        KeyError: If the archive has no `word/document.xml`.
+        zipfile.BadZipFile: If `source` is not a zip archive.
+    """
+    with zipfile.ZipFile(source) as archive, archive.open("word/document.xml") as xml:
+        # Open elements; finished blocks are detached from their parent.
+        stack: List[ElementTree.Element] = []
+        table_depth = 0
+        # Paragraphs can nest (text boxes), so keep a stack of open ones.
+        paragraphs: List[List[str]] = []
+        row: List[str] = []
+        cell: List[str] = []
+
+        for event, elem in ElementTree.iterparse(xml, events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                stack.append(elem)
+                if tag == _P:
+                    paragraphs.append([])
+                elif tag == _TBL:
+                    table_depth += 1
+                elif tag == _TR and table_depth == 1:
+                    row = []
+                elif tag == _TC and table_depth == 1:
+                    cell = []
+                continue
+
+            if paragraphs:
+                if tag == _T:
+                    paragraphs[-1].append(elem.text or "")
+                elif tag == _TAB:
+                    paragraphs[-1].append("\t")
+                elif tag in _BREAKS:
+                    paragraphs[-1].append("\n")
+            if tag == _P and paragraphs:
+                text = "".join(paragraphs.pop())
+                if table_depth:
+                    if text.strip():
+                        cell.append(text.strip())
+                else:
+                    yield DocxBlock("paragraph", text=text)
+            elif tag == _TC and table_depth == 1:
+                row.append(" ".join(cell))
+            elif tag == _TR and table_depth == 1:
+                yield DocxBlock("row", cells=tuple(row))
+                stack[-2].remove(elem)
+            elif tag == _TBL:
+                table_depth -= 1
+
+            stack.pop()
+            if len(stack) == _TOP_LEVEL_DEPTH - 1:
+                stack[-1].remove(elem)
+
+
+def docx_to_text(source: Union[str, IO[bytes]]) -> str:
+    """Extract the text of a DOCX file, one paragraph or table row per line."""
+    return "".join(block.as_text() + "\n" for block in iter_docx_blocks(source))
@@ -3,18 +3,48 @@
 Works with a chat model with tool calling support.
 """
 
+import asyncio
+import os
+import time
 from datetime import UTC, datetime
-from typing import Dict, List, Literal, cast
+from typing import Any, Awaitable, Callable, Dict, List, Literal, cast
 
-from langchain_core.messages import AIMessage
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
 from langgraph.graph import StateGraph
-from langgraph.prebuilt import ToolNode
 from langgraph.runtime import Runtime
+from langgraph.types import Command
 
+from react_agent import metrics
+from react_agent.budget import estimate_tokens, record_usage
+from react_agent.checkpoint import SqliteCheckpointSaver
 from react_agent.context import Context
+from react_agent.hedging import hedged_call
+from react_agent.llm_cache import get_response_cache, make_cache_key
+from react_agent.loops import find_repeated_calls, hints_given, loop_hint
+from react_agent.prefetch import start_prefetch
+from react_agent.rate_limit import call_with_limit
+from react_agent.routing import log_decision, route_step
 from react_agent.state import InputState, State
+from react_agent.tool_node import GuardedToolNode, largest_payload_limit
 from react_agent.tools import TOOLS
-from react_agent.utils import load_chat_model
+from react_agent.utils import get_message_text, get_thread_id, load_chat_model
+from react_agent.watchdog import ensure_watchdog, register_sources
+
+
+async def prefetch_attachments(
+    state: State, runtime: Runtime[Context]
+) -> Dict[str, Any]:
+    """Start decoding and extracting files attached to the new user message.
+
+    The extraction runs in the background during the first model call; the
+    upload tools pick up its result. Does nothing unless
+    `Context.prefetch_attachments` is enabled.
+    """
+    last_message = state.messages[-1] if state.messages else None
+    if runtime.context.prefetch_attachments and isinstance(last_message, HumanMessage):
+        start_prefetch(last_message, largest_payload_limit(runtime.context))
+    return {}
+
 
 # Define the function that calls the model
 
@@ -33,21 +63,91 @@ async def call_model(
     Returns:
         dict: A dictionary containing the model's response message.
     """
+    ensure_watchdog(runtime.context.stall_threshold_ms, runtime.context.stall_log_path)
+    metrics.ensure_snapshot_writer(
+        runtime.context.metrics_path, runtime.context.metrics_interval_ms / 1000
+    )
+
+    # Pick the model for this step from the routing table (Context.model by default)
+    route = route_step(
+        state.messages,
+        runtime.context.model,
+        runtime.context.routing_table,
+        runtime.context.routing_simple_max_tokens,
+    )
+    model_name = route.model
+
     # Initialize the model with tool binding. Change the model or add more tools here.
-    model = load_chat_model(runtime.context.model).bind_tools(TOOLS)
+    model = load_chat_model(model_name).bind_tools(TOOLS)
 
     # Format the system prompt. Customize this to change the agent's behavior.
     system_message = runtime.context.system_prompt.format(
         system_time=datetime.now(tz=UTC).isoformat()
     )
 
-    # Get the model's response
-    response = cast(
-        AIMessage,
-        await model.ainvoke(
-            [{"role": "system", "content": system_message}, *state.messages]
-        ),
+    # Look up the response cache. The key uses the prompt template, not the
+    # formatted prompt, so the embedded system time does not defeat it.
+    cache = None
+    cache_key = ""
+    response = None
+    if runtime.context.llm_cache_path and not runtime.context.llm_cache_bypass:
+        cache = get_response_cache(
+            runtime.context.llm_cache_path,
+            runtime.context.llm_cache_ttl_seconds,
+            runtime.context.llm_cache_max_entries,
+        )
+        cache_key = make_cache_key(
+            model_name,
+            runtime.context.system_prompt,
+            getattr(model, "kwargs", {}).get("tools"),
+            state.messages,
+        )
+        response = await asyncio.to_thread(cache.get, cache_key)
+
+    if response is None:
+        # Get the model's response
+        messages = [{"role": "system", "content": system_message}, *state.messages]
+
+        def request(name: str, bound_model: Any) -> Callable[[], Awaitable[Any]]:
+            # Calls to the same provider/model share one adaptive limiter
+            return lambda: call_with_limit(
+                name,
+                get_thread_id(),
+                lambda: bound_model.ainvoke(messages),
+                runtime.context.max_model_concurrency,
+            )
+
+        backup = None
+        if runtime.context.hedge_requests:
+            hedge_model = runtime.context.hedge_model or model_name
+            backup = request(
+                hedge_model,
+                model
+                if hedge_model == model_name
+                else load_chat_model(hedge_model).bind_tools(TOOLS),
+            )
+        started = time.monotonic()
+        response = cast(
+            AIMessage,
+            await hedged_call(
+                model_name,
+                request(model_name, model),
+                backup,
+                runtime.context.hedge_quantile,
+                runtime.context.hedge_min_delay_ms / 1000,
+            ),
+        )
+        log_decision(route, time.monotonic() - started)
+        if cache is not None:
+            await asyncio.to_thread(cache.put, cache_key, response)
+
+    # Remember how much of the context window the prompt used, so tool results
+    # of this step are budgeted against what is left.
+    usage = response.usage_metadata or {}
+    prompt_tokens = usage.get("total_tokens") or estimate_tokens(
+        system_message + "".join(get_message_text(m) for m in state.messages)
     )
+    record_usage(get_thread_id(), prompt_tokens, len(response.tool_calls))
 
     # Handle the case when it's the last step and the model still wants to use a tool
     if state.is_last_step and response.tool_calls:
@@ -64,29 +164,68 @@ async def call_model(
     return {"messages": [response]}
 
 
+def break_loop(
+    state: State, runtime: Runtime[Context]
+) -> Command[Literal["call_model", "__end__"]]:
+    """Answer repeated tool calls with a corrective hint instead of running them.
+
+    Once the model has ignored `loop_max_hints` hints in the current turn, the
+    run is stopped instead of burning the remaining steps.
+    """
+    repeated = find_repeated_calls(state.messages, runtime.context.loop_max_repeats)
+    for call in repeated:
+        metrics.increment("tool_loop.detected", labels={"tool": call.name})
+    messages: List[Any] = [
+        ToolMessage(content=loop_hint(call), name=call.name, tool_call_id=call.call_id)
+        for call in repeated
+    ]
+    if hints_given(state.messages) < runtime.context.loop_max_hints:
+        return Command(update={"messages": messages}, goto="call_model")
+
+    metrics.increment("tool_loop.stopped")
+    messages.append(
+        AIMessage(
+            content="Sorry, I stopped because the same tool calls kept returning the same results. "
+            "Please rephrase the request or provide the file in another format."
+        )
+    )
+    return Command(update={"messages": messages}, goto="__end__")
+
+
 # Define a new graph
 
+# Stalls of the event loop are attributed to these functions
+register_sources(prefetch_attachments, call_model, break_loop, *TOOLS)
+
 builder = StateGraph(State, input_schema=InputState, context_schema=Context)
 
+builder.add_node(prefetch_attachments)
+
 # Define the two nodes we will cycle between
 builder.add_node(call_model)
-builder.add_node("tools", ToolNode(TOOLS))
+builder.add_node("tools", GuardedToolNode(TOOLS))
+builder.add_node(break_loop)
 
-# Set the entrypoint as `call_model`
-# This means that this node is the first one called
-builder.add_edge("__start__", "call_model")
+# Set the entrypoint as `prefetch_attachments`, which hands over to `call_model`
+# right away. This means that the model is the first real work done.
+builder.add_edge("__start__", "prefetch_attachments")
+builder.add_edge("prefetch_attachments", "call_model")
 
 
-def route_model_output(state: State) -> Literal["__end__", "tools"]:
+def route_model_output(
+    state: State, runtime: Runtime[Context]
+) -> Literal["__end__", "tools", "break_loop"]:
     """Determine the next node based on the model's output.
 
-    This function checks if the model's last message contains tool calls.
+    This function checks if the model's last message contains tool calls and
+    whether they only repeat earlier calls that kept returning the same result.
 
     Args:
         state (State): The current state of the conversation.
+        runtime (Runtime[Context]): Runtime with the loop detection settings.
 
     Returns:
-        str: The name of the next node to call ("__end__" or "tools").
+        str: The name of the next node to call ("__end__", "tools" or "break_loop").
     """
     last_message = state.messages[-1]
     if not isinstance(last_message, AIMessage):
@@ -96,6 +235,9 @@ def route_model_output(state: State) -> Literal["__end__", "tools"]:
     # If there is no tool call, then we finish
     if not last_message.tool_calls:
         return "__end__"
+    # Repeating calls that cannot bring anything new are not executed
+    if find_repeated_calls(state.messages, runtime.context.loop_max_repeats):
+        return "break_loop"
     # Otherwise we execute the requested actions
     return "tools"
 
@@ -112,5 +254,12 @@ builder.add_conditional_edges(
 # This creates a cycle: after using tools, we always return to the model
 builder.add_edge("tools", "call_model")
 
+# Use a local persistent checkpointer when CHECKPOINT_DB_PATH is set. On LangGraph
+# Platform the managed checkpointer is used instead, so this stays opt-in.
+_checkpoint_db = os.environ.get("CHECKPOINT_DB_PATH")
+
 # Compile the builder into an executable graph
-graph = builder.compile(name="ReAct Agent")
+graph = builder.compile(
+    name="ReAct Agent",
+    checkpointer=SqliteCheckpointSaver(_checkpoint_db) if _checkpoint_db else None,
+)
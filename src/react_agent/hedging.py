@@ -0,0 +1,122 @@
+"""Hedged model requests.
+
+The latency of every model call is tracked per model. With hedging enabled,
+if the primary request has not finished after the configured latency quantile
+(p95 by default), a duplicate request is sent to the same or a fallback model.
+The first successful response wins and the other request is cancelled. A
+primary that fails before the delay is hedged right away, so the backup also
+serves as a fallback.
+
+Metrics, labelled by model: `hedge.requests`, `hedge.fired`, `hedge.wins`
+(additionally labelled by winner) and `model.latency_ms`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from react_agent import metrics
+
+T = TypeVar("T")
+
+# Quantiles are only trusted after this many observations.
+MIN_SAMPLES = 20
+WINDOW = 200
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies of one model."""
+
+    def __init__(self, window: int = WINDOW):
+        """Keep the last `window` latencies."""
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, latency: float) -> None:
+        """Record one latency in seconds."""
+        with self._lock:
+            self._samples.append(latency)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return the `q` quantile, or None while there are too few samples."""
+        with self._lock:
+            if len(self._samples) < MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+_trackers: Dict[str, LatencyTracker] = {}
+_trackers_lock = threading.Lock()
+
+
+def get_latency_tracker(model: str) -> LatencyTracker:
+    """Return the process-wide latency tracker of `model`."""
+    with _trackers_lock:
+        return _trackers.setdefault(model, LatencyTracker())
+
+
+def hedge_delay(model: str, quantile: float, min_delay: float) -> float:
+    """Return how long to wait for the primary before sending the hedge."""
+    observed = get_latency_tracker(model).quantile(quantile)
+    return max(min_delay, observed) if observed is not None else min_delay
+
+
+async def hedged_call(
+    model: str,
+    primary: Callable[[], Awaitable[T]],
+    backup: Optional[Callable[[], Awaitable[T]]] = None,
+    quantile: float = 0.95,
+    min_delay: float = 2.0,
+) -> T:
+    """Run `primary`, hedging it with `backup` when it is slow or fails.
+
+    Without `backup` the call is only timed, which keeps the latency window
+    warm for when hedging is switched on.
+    """
+    labels = {"model": model}
+    tracker = get_latency_tracker(model)
+    started = time.monotonic()
+    if backup is None:
+        result = await primary()
+        _record_latency(tracker, labels, time.monotonic() - started)
+        return result
+
+    metrics.increment("hedge.requests", labels=labels)
+    delay = hedge_delay(model, quantile, min_delay)
+    tasks: Dict[asyncio.Task, str] = {asyncio.ensure_future(primary()): "primary"}
+    errors: Dict[str, BaseException] = {}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        while True:
+            for task in done:
+                role = tasks.pop(task)
+                if task.exception() is None:
+                    # If the hedge won, the primary took at least this long.
+                    _record_latency(tracker, labels, time.monotonic() - started)
+                    if "hedge" in tasks.values() or role == "hedge":
+                        metrics.increment(
+                            "hedge.wins", labels={**labels, "winner": role}
+                        )
+                    return task.result()
+                errors[role] = task.exception()  # type: ignore[assignment]
+            if "hedge" not in errors and "hedge" not in tasks.values():
+                metrics.increment("hedge.fired", labels=labels)
+                tasks[asyncio.ensure_future(backup())] = "hedge"
+            if not tasks:
+                raise errors.get("primary") or errors["hedge"]
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _record_latency(
+    tracker: LatencyTracker, labels: Dict[str, str], latency: float
+) -> None:
+    tracker.observe(latency)
+    metrics.observe("model.latency_ms", latency * 1000, labels=labels)
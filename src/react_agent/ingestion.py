@@ -0,0 +1,335 @@
+"""Staged ingestion of uploaded and local files.
+
+Every file handler funnels its input through the same stages:
+
+1. normalize - find the payload, file name and declared MIME type in whatever
+   shape the client sent (dict, JSON string, content block, raw text).
+2. decode    - turn the payload into bytes exactly once (data URL, base64,
+   byte list or plain text).
+3. sniff     - determine the real type from magic bytes, not from the name or
+   the declared MIME type.
+4. extract   - pull the text out of the decoded bytes.
+
+The analysis stage lives with the tools that consume `IngestedDocument.text`.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import io
+import json
+import re
+import zipfile
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Union
+from xml.etree import ElementTree
+
+from react_agent.docx_stream import iter_docx_blocks
+from react_agent.progress import report_progress
+
+CONTENT_KEYS = ("content", "data", "file_data", "file_content", "text", "body")
+TYPE_KEYS = ("mime_type", "type", "content_type", "file_type")
+NAME_KEYS = ("filename", "name", "file_name")
+
+PDF_MIME = "application/pdf"
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+DOC_MIME = "application/msword"
+
+KIND_MIME_TYPES = {
+    "pdf": PDF_MIME,
+    "docx": DOCX_MIME,
+    "doc": DOC_MIME,
+    "zip": "application/zip",
+    "text": "text/plain",
+    "binary": "application/octet-stream",
+}
+
+# Base64 is decoded in chunks of this many characters (a multiple of 4) so
+# progress can be reported for large uploads.
+DECODE_CHUNK = 4 * 1024 * 1024
+_DATA_URL = re.compile(r"^data:(?P<mime>[\w.+-]+/[\w.+-]+)?(?:;[\w=-]+)*;base64,", re.I)
+# Matched against the payload with whitespace removed: with whitespace in the
+# character class, long blank runs made the match backtrack quadratically.
+_BASE64 = re.compile(rb"[A-Za-z0-9+/]+={0,2}")
+
+
+class IngestionError(Exception):
+    """Raised when an upload cannot be decoded or its text cannot be extracted."""
+
+
+@dataclass
+class RawUpload:
+    """An upload after normalization: payload plus declared metadata."""
+
+    payload: Union[str, bytes]
+    filename: str = "unknown"
+    mime_type: str = ""
+
+
+@dataclass
+class IngestedDocument:
+    """A decoded upload with its sniffed type and extracted text."""
+
+    filename: str
+    declared_mime_type: str
+    kind: str
+    size: int
+    sha256: str
+    text: str = ""
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def mime_type(self) -> str:
+        """MIME type derived from the sniffed kind."""
+        return KIND_MIME_TYPES.get(self.kind, self.declared_mime_type)
+
+
+# Stage 1: normalize
+
+
+def _first(data: Dict[str, Any], keys: tuple[str, ...]) -> Any:
+    for key in keys:
+        value = data.get(key)
+        if value:
+            return value
+    return None
+
+
+def normalize_input(
+    data: Any, filename: Optional[str] = None, mime_type: Optional[str] = None
+) -> RawUpload:
+    """Find the payload and its metadata in any supported input shape.
+
+    Supports plain strings and bytes, JSON strings, dicts with the usual
+    content/type/name keys (including LangChain and OpenAI file content
+    blocks) and lists of byte values.
+    """
+    if isinstance(data, str) and data.lstrip().startswith("{"):
+        try:
+            data = json.loads(data)
+        except ValueError:
+            pass
+
+    if isinstance(data, dict):
+        nested = data.get("file")
+        if isinstance(nested, dict):
+            return normalize_input(
+                {**{k: v for k, v in data.items() if k != "file"}, **nested},
+                filename,
+                mime_type,
+            )
+        declared = _first(data, TYPE_KEYS)
+        # A content block has "type": "file"; only real MIME types count.
+        if not isinstance(declared, str) or "/" not in declared:
+            declared = ""
+        payload = _first(data, CONTENT_KEYS)
+        if payload is None:
+            raise IngestionError(
+                f"Не удалось найти содержимое файла. Переданные ключи: {list(data.keys())}"
+            )
+        return normalize_input(
+            payload,
+            filename or _first(data, NAME_KEYS),
+            mime_type or declared,
+        )
+
+    if isinstance(data, list) and all(isinstance(b, int) for b in data):
+        data = bytes(data)
+    if not isinstance(data, (str, bytes, bytearray)):
+        raise IngestionError(
+            f"Неподдерживаемый формат входных данных: {type(data).__name__}"
+        )
+    if not data:
+        raise IngestionError("Передано пустое содержимое файла.")
+    return RawUpload(
+        payload=bytes(data) if isinstance(data, bytearray) else data,
+        filename=filename or "unknown",
+        mime_type=mime_type or "",
+    )
+
+
+# Stage 2: decode
+
+
+def _is_textual_mime(mime_type: str) -> bool:
+    return mime_type.startswith("text/") or mime_type in {
+        "application/json",
+        "application/xml",
+    }
+
+
+def decode_payload(upload: RawUpload) -> bytes:
+    """Decode the payload to bytes. Each upload is decoded exactly once."""
+    payload = upload.payload
+    if isinstance(payload, bytes):
+        return payload
+
+    match = _DATA_URL.match(payload)
+    if match:
+        if not upload.mime_type and match.group("mime"):
+            upload.mime_type = match.group("mime")
+        try:
+            decoded = base64.b64decode(payload[match.end() :])
+        except (binascii.Error, ValueError) as e:
+            raise IngestionError(f"Ошибка при декодировании файла: {e}") from e
+        report_progress("decode", bytes=len(decoded))
+        return decoded
+
+    raw = payload.encode("utf-8")
+    if _is_textual_mime(upload.mime_type):
+        return raw
+    compact = b"".join(raw.split())
+    if not _BASE64.fullmatch(compact):
+        return raw
+    try:
+        decoded = _b64decode_chunked(compact)
+    except (binascii.Error, ValueError):
+        return raw
+    # Short words like "test" are valid base64 too, so only accept the decoded
+    # form when the client declared a binary type or the bytes look binary.
+    if upload.mime_type or sniff_type(decoded) != "text":
+        return decoded
+    return raw
+
+
+def _b64decode_chunked(data: bytes) -> bytes:
+    """Strictly decode base64 without whitespace, reporting progress per chunk."""
+    if len(data) <= DECODE_CHUNK:
+        return base64.b64decode(data, validate=True)
+    decoded = bytearray()
+    for offset in range(0, len(data), DECODE_CHUNK):
+        decoded += base64.b64decode(data[offset : offset + DECODE_CHUNK], validate=True)
+        report_progress("decode", bytes=len(decoded), total_bytes=len(data) * 3 // 4)
+    return bytes(decoded)
+
+
+# Stage 3: sniff
+
+
+def sniff_type(data: bytes) -> str:
+    """Detect the file kind from magic bytes.
+
+    Returns:
+        str: One of "pdf", "docx", "doc", "zip", "text" or "binary".
+    """
+    head = data[:1024]
+    if b"%PDF-" in head:
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                names = set(archive.namelist())
+        except zipfile.BadZipFile:
+            return "binary"
+        return "docx" if "word/document.xml" in names else "zip"
+    if head.startswith(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"):
+        return "doc"
+    if b"\x00" in head:
+        return "binary"
+    try:
+        head.decode("utf-8")
+        return "text"
+    except UnicodeDecodeError as e:
+        # A multi-byte character may be cut at the end of the sniffed window.
+        if e.start >= len(head) - 3:
+            return "text"
+    try:
+        head.decode("cp1251")
+        return "text"
+    except UnicodeDecodeError:
+        return "binary"
+
+
+# Stage 4: extract
+
+
+def decode_text(data: bytes) -> str:
+    """Decode text bytes, trying UTF-8 first and then Windows-1251."""
+    try:
+        return data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return data.decode("cp1251", errors="ignore")
+
+
+def _extract_pdf(data: bytes) -> str:
+    try:
+        import PyPDF2  # type: ignore[import-not-found]
+    except ImportError as e:
+        raise IngestionError(
+            "Для работы с PDF нужно установить PyPDF2: pip install PyPDF2"
+        ) from e
+    try:
+        reader = PyPDF2.PdfReader(io.BytesIO(data))
+        total = len(reader.pages)
+        pages = []
+        for page in reader.pages:
+            pages.append((page.extract_text() or "") + "\n")
+            report_progress("extract", pages=len(pages), total_pages=total)
+        # Pages are separated by form feeds so later stages can keep page numbers.
+        return "\f".join(pages)
+    except Exception as e:
+        raise IngestionError(f"Ошибка при чтении PDF: {e}") from e
+
+
+def _extract_docx(data: bytes) -> str:
+    try:
+        parts = []
+        for block in iter_docx_blocks(io.BytesIO(data)):
+            parts.append(block.as_text() + "\n")
+            report_progress("extract", blocks=len(parts))
+        return "".join(parts)
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as e:
+        raise IngestionError(f"Ошибка при чтении DOCX: {e}") from e
+
+
+def extract_text(data: bytes, kind: str) -> str:
+    """Extract plain text from decoded bytes of the given kind."""
+    if kind == "text":
+        return decode_text(data)
+    if kind == "pdf":
+        return _extract_pdf(data)
+    if kind == "docx":
+        return _extract_docx(data)
+    if kind == "doc":
+        raise IngestionError(
+            "Формат .doc (Word 97-2003) не поддерживается. Сохраните документ как .docx"
+        )
+    raise IngestionError(
+        f"Неподдерживаемый тип файла ({kind}). Поддерживаются: PDF, DOCX и текстовые файлы"
+    )
+
+
+# Pipeline
+
+
+def ingest_bytes(
+    data: bytes, filename: str = "unknown", mime_type: str = ""
+) -> IngestedDocument:
+    """Run the sniff and extract stages on already decoded bytes."""
+    kind = sniff_type(data)
+    return IngestedDocument(
+        filename=filename,
+        declared_mime_type=mime_type,
+        kind=kind,
+        size=len(data),
+        sha256=hashlib.sha256(data).hexdigest(),
+        text=extract_text(data, kind),
+    )
+
+
+def ingest(
+    data: Any, filename: Optional[str] = None, mime_type: Optional[str] = None
+) -> IngestedDocument:
+    """Run the full pipeline on an upload in any supported input shape."""
+    upload = normalize_input(data, filename, mime_type)
+    decoded = decode_payload(upload)
+    return ingest_bytes(decoded, upload.filename, upload.mime_type)
+
+
+def ingest_file(file_path: str) -> IngestedDocument:
+    """Run the pipeline on a local file. The file is read once."""
+    with open(file_path, "rb") as file:
+        data = file.read()
+    return ingest_bytes(data, filename=file_path)
@@ -0,0 +1,334 @@
+"""Multi-pattern keyword matching over tender texts.
+
+A keyword dictionary maps categories to terms. Every term is reduced to word
+stems (see `retrieval.stem`) and compiled into one Aho-Corasick automaton, so
+all terms are found in a single pass over the text regardless of how many
+there are. A term matches at the start of a word and may be followed by an
+inflectional ending ("трансформатор" finds "трансформаторов", not
+"трансформаторный"); words of a multi-word term may be separated by any run of
+whitespace. Acronyms and words shorter than `MIN_INFLECTED_WORD` letters must
+end the word ("КРУ" does not match "крупный"). A term ending in "*" is a
+prefix and matches any continuation ("электро*" finds "электроснабжение").
+
+Compiled matchers are cached per dictionary file for the life of the process.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+from react_agent.retrieval import ENDINGS, stem
+
+# Shorter final words of a term only match a whole word.
+MIN_INFLECTED_WORD = 4
+# How the end of a term's last word is checked.
+WHOLE_WORD, INFLECTED, PREFIX = "word", "inflected", "prefix"
+_MAX_ENDING = max(map(len, ENDINGS))
+
+DEFAULT_KEYWORDS: Dict[str, List[str]] = {
+    "участники": [
+        "заказчик",
+        "поставщик",
+        "подрядчик",
+        "исполнитель",
+        "участник закупки",
+        "победитель",
+        "субподрядчик",
+        "генподрядчик",
+    ],
+    "процедура": [
+        "контракт",
+        "договор",
+        "тендер",
+        "конкурс",
+        "аукцион",
+        "закупка",
+        "запрос котировок",
+        "запрос предложений",
+        "извещение",
+        "заявка",
+        "обеспечение заявки",
+        "обеспечение исполнения",
+        "44-ФЗ",
+        "223-ФЗ",
+        "единственный поставщик",
+        "протокол",
+    ],
+    "поставка": [
+        "поставка",
+        "отгрузка",
+        "доставка",
+        "приемка",
+        "гарантийный срок",
+        "монтаж",
+        "пусконаладочные работы",
+        "шеф-монтаж",
+    ],
+    "энергетика": [
+        "энергетик*",
+        "электро*",
+        "электроснабжение",
+        "электроэнергия",
+        "подстанция",
+        "распределительное устройство",
+        "КТП",
+        "КРУ",
+        "ЛЭП",
+        "линия электропередачи",
+        "релейная защита",
+        "АСКУЭ",
+        "энергоаудит",
+        "энергосбережение",
+    ],
+    "оборудование": [
+        "трансформатор",
+        "силовой трансформатор",
+        "выключатель",
+        "вакуумный выключатель",
+        "разъединитель",
+        "разрядник",
+        "ограничитель перенапряжений",
+        "кабель",
+        "провод",
+        "муфта",
+        "изолятор",
+        "щит",
+        "шкаф управления",
+        "генератор",
+        "дизель-генератор",
+        "электродвигатель",
+        "насос",
+        "счетчик электроэнергии",
+        "компенсация реактивной мощности",
+        "аккумуляторная батарея",
+        "ИБП",
+    ],
+    "документы": [
+        "техническое задание",
+        "спецификация",
+        "смета",
+        "локальный сметный расчет",
+        "проектная документация",
+        "рабочая документация",
+        "ГОСТ",
+        "СНиП",
+        "ОКПД2",
+        "сертификат соответствия",
+        "декларация соответствия",
+        "лицензия",
+        "СРО",
+    ],
+}
+
+_NON_WORD = re.compile(r"[\W_]")
+
+
+def _normalize(text: str) -> str:
+    """Lower-case `text` and turn every non-word character into a space.
+
+    The result has the same length as `text`, so offsets map back directly.
+    """
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # A few characters lower-case to several; keep offsets aligned.
+        lowered = "".join(ch.lower()[:1] for ch in text)
+    return _NON_WORD.sub(" ", lowered.replace("ё", "е"))
+
+
+def _pattern(term: str) -> Tuple[str, str]:
+    """Return the automaton pattern of a term and how its last word must end."""
+    prefix = term.rstrip().endswith("*")
+    words = _normalize(term.rstrip().rstrip("*")).split()
+    stems = [stem(word) for word in words]
+    if prefix:
+        stems[-1:] = words[-1:]
+        ending = PREFIX
+    elif not words or term.split()[-1].isupper() or len(words[-1]) < MIN_INFLECTED_WORD:
+        ending = WHOLE_WORD
+    else:
+        ending = INFLECTED
+    # The leading space anchors the term at a word start.
+    return " " + " ".join(stems), ending
+
+
+@dataclass(frozen=True)
+class KeywordHit:
+    """One occurrence of a dictionary term in a text."""
+
+    term: str
+    category: str
+    start: int
+    end: int
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over the stems of a keyword dictionary.
+
+    Two extensions keep stem matching inside the automaton: a node that ends
+    a non-final word of a term absorbs the rest of that word (its ending), and
+    a node reached by a space stays put on further spaces.
+    """
+
+    def __init__(self, dictionary: Mapping[str, Sequence[str]]):
+        """Compile `dictionary` (category -> terms) into an automaton."""
+        self.terms: List[Tuple[str, str, int]] = []  # (term, category, word count)
+        self._endings: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        self._absorbs: set[int] = set()
+
+        seen = set()
+        for category, terms in dictionary.items():
+            for term in terms:
+                pattern, ending = _pattern(term)
+                if pattern.strip() and (pattern, category) not in seen:
+                    seen.add((pattern, category))
+                    self._insert(pattern, len(self.terms))
+                    self.terms.append(
+                        (term.rstrip().rstrip("*"), category, pattern.count(" "))
+                    )
+                    self._endings.append(ending)
+        self._link()
+        self.max_words = max((words for _, _, words in self.terms), default=1)
+
+    def _insert(self, pattern: str, index: int) -> None:
+        state = 0
+        for ch in pattern:
+            if ch == " " and state:
+                self._absorbs.add(state)
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({" ": nxt} if ch == " " else {})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        self._out[state] += (index,)
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                if nxt == state:
+                    continue
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def find_all(self, text: str) -> List[KeywordHit]:
+        """Return every term occurrence in `text`, ordered by end offset.
+
+        Runs in one pass over the text; the work per character is bounded by
+        the automaton, not by the number of terms.
+        """
+        normalized = _normalize(text)
+        goto, fail, out, absorbs, terms = (
+            self._goto,
+            self._fail,
+            self._out,
+            self._absorbs,
+            self.terms,
+        )
+        endings = self._endings
+        word_end = 0  # end of the current word, found on its first hit
+        hits: List[KeywordHit] = []
+        word_starts: deque[int] = deque(maxlen=self.max_words)
+        state = goto[0].get(" ", 0)  # the text starts at a word boundary
+        previous = " "
+        for i, ch in enumerate(normalized):
+            if ch != " " and previous == " ":
+                word_starts.append(i)
+            previous = ch
+            nxt = goto[state].get(ch)
+            if nxt is None:
+                if ch != " " and state in absorbs:
+                    continue  # inflectional ending of a non-final word
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                nxt = goto[state].get(ch, 0)
+            if nxt == state:
+                continue
+            state = nxt
+            for index in out[state]:
+                if endings[index] != PREFIX:
+                    if word_end <= i:
+                        word_end = normalized.find(" ", i + 1)
+                        word_end = word_end if word_end >= 0 else len(normalized)
+                    rest = word_end - i - 1
+                    if rest and (
+                        endings[index] == WHOLE_WORD
+                        or rest > _MAX_ENDING
+                        or normalized[i + 1 : word_end] not in ENDINGS
+                    ):
+                        continue
+                term, category, words = terms[index]
+                hits.append(KeywordHit(term, category, word_starts[-words], i + 1))
+        return hits
+
+
+def summarize_hits(hits: Sequence[KeywordHit], max_offsets: int = 5) -> Dict[str, Any]:
+    """Group hits by category and term with counts and the first offsets."""
+    summary: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for hit in hits:
+        entry = summary.setdefault(hit.category, {}).setdefault(
+            hit.term, {"количество": 0, "позиции": []}
+        )
+        entry["количество"] += 1
+        if len(entry["позиции"]) < max_offsets:
+            entry["позиции"].append([hit.start, hit.end])
+    return summary
+
+
+def load_dictionary(path: str) -> Dict[str, List[str]]:
+    """Load a JSON keyword dictionary: {"category": ["term", ...]}.
+
+    A plain JSON list of terms is accepted too and put in the "прочее" category.
+    """
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+    if isinstance(data, list):
+        data = {"прочее": data}
+    if not isinstance(data, dict) or not all(
+        isinstance(terms, list) and all(isinstance(t, str) for t in terms)
+        for terms in data.values()
+    ):
+        raise ValueError(
+            f'Словарь ключевых слов {path} должен иметь вид {{"категория": ["термин", ...]}}'
+        )
+    return data
+
+
+_matchers: Dict[Tuple[str, int], KeywordMatcher] = {}
+_matchers_lock = threading.Lock()
+
+
+def get_keyword_matcher(path: str = "") -> KeywordMatcher:
+    """Return the compiled matcher for a dictionary file (or the built-in one).
+
+    Matchers are compiled once per process and recompiled only when the file
+    changes.
+    """
+    key = (path, os.stat(path).st_mtime_ns if path else 0)
+    with _matchers_lock:
+        matcher = _matchers.get(key)
+        if matcher is None:
+            matcher = KeywordMatcher(
+                load_dictionary(path) if path else DEFAULT_KEYWORDS
+            )
+            for stale in [k for k in _matchers if k[0] == path]:
+                del _matchers[stale]
+            _matchers[key] = matcher
+        return matcher
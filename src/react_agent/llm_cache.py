@@ -0,0 +1,175 @@
+"""Local exact-match cache for chat model responses.
+
+Responses are keyed on a canonical hash of the model name, the system prompt
+template, the tool schemas bound to the model and the message history. Volatile
+fields (message ids, tool call ids, provider metadata) are left out of the key
+so that rerunning the same analysis in a new thread hits the cache.
+
+Entries are stored in a local SQLite file with a TTL and a maximum number of
+entries; the least recently used entries are evicted first.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    message_to_dict,
+    messages_from_dict,
+)
+
+from react_agent import metrics
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+def _canonical_message(message: BaseMessage) -> Dict[str, Any]:
+    """Keep only the parts of a message that influence the model's answer."""
+    data: Dict[str, Any] = {"type": message.type, "content": message.content}
+    if message.name:
+        data["name"] = message.name
+    if isinstance(message, AIMessage) and message.tool_calls:
+        data["tool_calls"] = [
+            {"name": call["name"], "args": call["args"]} for call in message.tool_calls
+        ]
+    return data
+
+
+def make_cache_key(
+    model: str,
+    system_prompt: str,
+    tool_schemas: Optional[Sequence[Any]],
+    messages: Sequence[BaseMessage],
+) -> str:
+    """Build a stable hash for a model request.
+
+    Args:
+        model (str): Fully specified model name ('provider/model').
+        system_prompt (str): The system prompt *template*, before the current
+            time is substituted into it.
+        tool_schemas: The tool definitions bound to the model.
+        messages: The conversation history sent to the model.
+    """
+    payload = {
+        "model": model,
+        "system_prompt": system_prompt,
+        "tools": list(tool_schemas or []),
+        "messages": [_canonical_message(m) for m in messages],
+    }
+    canonical = json.dumps(
+        payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response cache with TTL and LRU eviction."""
+
+    def __init__(self, path: str, ttl_seconds: int = 86400, max_entries: int = 1000):
+        """Open (and create if needed) the cache database at `path`."""
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key: str) -> Optional[AIMessage]:
+        """Return the cached response for `key`, or None on a miss."""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                metrics.increment("llm_cache.misses")
+                return None
+            conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+        metrics.increment("llm_cache.hits")
+        message = messages_from_dict([json.loads(row[0])])[0]
+        # Let `add_messages` assign a fresh id so a cached answer never
+        # overwrites an earlier message in the thread.
+        message.id = None
+        return message  # type: ignore[return-value]
+
+    def put(self, key: str, message: AIMessage) -> None:
+        """Store a response and enforce the TTL and size limits."""
+        now = time.time()
+        value = json.dumps(message_to_dict(message), ensure_ascii=False)
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+            conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?"
+                ")",
+                (self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current number of entries."""
+        with self._connect() as conn:
+            (entries,) = conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+        }
+
+
+_caches: Dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(
+    path: str, ttl_seconds: int = 86400, max_entries: int = 1000
+) -> ResponseCache:
+    """Return the process-wide cache for `path`, creating it on first use."""
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = ResponseCache(path, ttl_seconds, max_entries)
+        cache.ttl_seconds = ttl_seconds
+        cache.max_entries = max_entries
+        return cache
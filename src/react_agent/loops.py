@@ -0,0 +1,121 @@
+"""Detection of repeated tool calls within one turn.
+
+Models sometimes bounce between tools with the same arguments, e.g.
+`universal_file_handler`, `handle_file_content` and `process_any_content_type`
+on the same payload, and get the same answer every time until the recursion
+limit is hit. Each finished tool call of the current turn is fingerprinted by
+its arguments and result. A call with a single argument is fingerprinted by
+its value alone, since the payload tools name that parameter differently
+(`file_data`, `content_or_data`, free `**kwargs`). A pending call counts as
+repeated when its arguments were already sent at least `max_repeats` times,
+whatever the tool, and every one of those calls returned the same result:
+running it again cannot bring anything new.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence
+
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, ToolMessage
+
+from react_agent.utils import get_message_text
+
+# Tool messages with this prefix are corrective hints, not tool results.
+LOOP_HINT_PREFIX = "🔁"
+
+
+@dataclass(frozen=True)
+class RepeatedCall:
+    """A pending tool call that repeats earlier calls with the same result."""
+
+    call_id: str
+    name: str
+    repeats: int
+
+
+def _digest(value: Any) -> str:
+    canonical = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _args_digest(args: Any) -> str:
+    # A lone argument is compared by value, unwrapping nesting such as
+    # {"kwargs": {"file_data": ...}}.
+    while isinstance(args, dict) and len(args) == 1:
+        args = next(iter(args.values()))
+    return _digest(args)
+
+
+def _current_turn(messages: Sequence[AnyMessage]) -> Sequence[AnyMessage]:
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], HumanMessage):
+            return messages[i + 1 :]
+    return messages
+
+
+def is_loop_hint(message: AnyMessage) -> bool:
+    """Return True for tool messages written by the loop breaker."""
+    return isinstance(message, ToolMessage) and get_message_text(message).startswith(
+        LOOP_HINT_PREFIX
+    )
+
+
+def find_repeated_calls(
+    messages: Sequence[AnyMessage], max_repeats: int
+) -> List[RepeatedCall]:
+    """Return the pending tool calls of the last message if all of them are repeats.
+
+    A step that makes at least one new call is progress, so nothing is
+    reported for it.
+    """
+    if max_repeats <= 0 or not messages or not isinstance(messages[-1], AIMessage):
+        return []
+    pending = messages[-1].tool_calls
+    turn = _current_turn(messages[:-1])
+    results = {
+        m.tool_call_id: _digest(get_message_text(m))
+        for m in turn
+        if isinstance(m, ToolMessage) and not is_loop_hint(m)
+    }
+    history: Dict[str, List[str]] = {}
+    for message in turn:
+        if isinstance(message, AIMessage):
+            for call in message.tool_calls:
+                if call["id"] in results:
+                    history.setdefault(_args_digest(call["args"]), []).append(
+                        results[call["id"]]
+                    )
+
+    repeated = []
+    for call in pending:
+        seen = history.get(_args_digest(call["args"]), [])
+        if len(seen) < max_repeats or len(set(seen)) > 1:
+            return []
+        repeated.append(RepeatedCall(call["id"] or "", call["name"], len(seen)))
+    return repeated
+
+
+def hints_given(messages: Sequence[AnyMessage]) -> int:
+    """Count the steps of the current turn that were answered with hints."""
+    turn = _current_turn(messages)
+    hinted = {m.tool_call_id for m in turn if is_loop_hint(m)}
+    return sum(
+        1
+        for m in turn
+        if isinstance(m, AIMessage)
+        and any(call["id"] in hinted for call in m.tool_calls)
+    )
+
+
+def loop_hint(call: RepeatedCall) -> str:
+    """Corrective message that replaces the result of a repeated call."""
+    return (
+        f"{LOOP_HINT_PREFIX} Вызов {call.name} не выполнен: с этими же аргументами инструменты "
+        f"уже вызывались {call.repeats} раз(а) и каждый раз возвращали один и тот же результат. "
+        "Не повторяйте его. Измените аргументы, выберите другой подход (например, "
+        "analyze_document или query_document по пути к файлу) или ответьте пользователю "
+        "на основе уже полученных данных."
+    )
@@ -0,0 +1,146 @@
+"""Lightweight in-process metrics shared by the agent components.
+
+Counters and summaries live in a process-wide registry guarded by a lock so
+they can be updated from nodes, tools and worker threads alike. A snapshot can
+be read at any time or dumped to a JSON file for scraping; `ensure_snapshot_writer`
+keeps such a file up to date from a background thread.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class _Summary:
+    """Running aggregate of observed values."""
+
+    count: int = 0
+    total: float = 0.0
+    min: float = float("inf")
+    max: float = float("-inf")
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def as_dict(self) -> Dict[str, float]:
+        mean = self.total / self.count if self.count else 0.0
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+            "mean": mean,
+        }
+
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = {}
+_summaries: Dict[str, _Summary] = {}
+
+
+def _key(name: str, labels: Optional[Dict[str, Any]]) -> str:
+    if not labels:
+        return name
+    rendered = ",".join(f"{k}={labels[k]}" for k in sorted(labels))
+    return f"{name}{{{rendered}}}"
+
+
+def increment(
+    name: str, value: float = 1.0, labels: Optional[Dict[str, Any]] = None
+) -> None:
+    """Increase a counter by `value`."""
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0.0) + value
+
+
+def observe(name: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+    """Record a single observation (latency, size, ...) in a summary."""
+    key = _key(name, labels)
+    with _lock:
+        _summaries.setdefault(key, _Summary()).add(value)
+
+
+def get_counter(name: str, labels: Optional[Dict[str, Any]] = None) -> float:
+    """Return the current value of a counter (0 if it was never incremented)."""
+    with _lock:
+        return _counters.get(_key(name, labels), 0.0)
+
+
+def snapshot() -> Dict[str, Any]:
+    """Return a copy of all counters and summaries."""
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "summaries": {k: s.as_dict() for k, s in _summaries.items()},
+        }
+
+
+def write_snapshot(path: str) -> None:
+    """Dump the current snapshot as JSON to `path`, replacing the file atomically."""
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".", prefix=".metrics-"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(snapshot(), file, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+_writers: Dict[str, threading.Thread] = {}
+_writers_lock = threading.Lock()
+
+
+def _write_quietly(path: str) -> None:
+    try:
+        write_snapshot(path)
+    except OSError:
+        pass
+
+
+def ensure_snapshot_writer(path: str, interval: float) -> None:
+    """Write the snapshot to `path` every `interval` seconds, once per path.
+
+    The writer is a daemon thread; the file is written one last time when the
+    interpreter exits. Does nothing without a path or a positive interval.
+    """
+    if not path or interval <= 0:
+        return
+
+    def run() -> None:
+        while True:
+            _write_quietly(path)
+            time.sleep(interval)
+
+    with _writers_lock:
+        if path in _writers:
+            return
+        thread = _writers[path] = threading.Thread(
+            target=run, name="metrics-writer", daemon=True
+        )
+        thread.start()
+    atexit.register(_write_quietly, path)
+
+
+def reset() -> None:
+    """Drop all recorded metrics. Mostly useful in tests."""
+    with _lock:
+        _counters.clear()
+        _summaries.clear()
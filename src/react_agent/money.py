@@ -0,0 +1,166 @@
+"""Extraction and normalization of money amounts in Russian tender texts.
+
+A single combined pattern finds every amount in one pass over the document
+("1 500 тыс. руб.", "2,5 млн рублей", "€ 300", "12 000,50 ₽"); a currency sign
+may stand before or after the number. Each match is
+converted to a `Decimal` with its multiplier applied, tagged with a currency
+and its text offsets, and optionally marked as the initial (maximum) contract
+price (НМЦК) when such a phrase precedes it.
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from dataclasses import dataclass, replace
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Sequence
+
+_NUMBER = r"\d{1,3}(?:[ \u00a0\u202f]\d{3})+(?:[,.]\d+)?|\d+(?:[,.]\d+)?"
+_MULTIPLIER = r"тыс(?:яч[аи]?)?|млн|миллион(?:а|ов)?|млрд|миллиард(?:а|ов)?"
+_CURRENCY = (
+    r"руб(?:л[а-яё]*)?(?![а-яё])|р(?=\.)|₽|rub|евро|eur|€|долл(?:ар[а-яё]*)?|usd|\$"
+)
+
+MONEY_PATTERN = re.compile(
+    rf"(?<![\w.,])(?:(?P<sign>[€$₽])\s*)?(?P<number>{_NUMBER})\s*"
+    rf"(?:(?P<multiplier>{_MULTIPLIER})\.?\s*)?"
+    rf"(?P<currency>{_CURRENCY})?\.?",
+    re.IGNORECASE,
+)
+NMCK_PATTERN = re.compile(
+    r"нмцк|начальн\w*\s+\(?максимальн\w*\)?\s+цен\w*|максимальн\w*\s+цен\w*\s+(?:контракта|договора)",
+    re.IGNORECASE,
+)
+_SPACES = re.compile(r"[\s\u00a0\u202f]")
+# How far after an НМЦК phrase an amount still belongs to it, in characters.
+NMCK_WINDOW = 200
+
+_MULTIPLIERS = {
+    "тыс": Decimal(10**3),
+    "млн": Decimal(10**6),
+    "мил": Decimal(10**6),
+    "млр": Decimal(10**9),
+}
+_CURRENCIES = {
+    "р": "RUB",
+    "₽": "RUB",
+    "ru": "RUB",
+    "ев": "EUR",
+    "eu": "EUR",
+    "€": "EUR",
+    "до": "USD",
+    "us": "USD",
+    "$": "USD",
+}
+
+
+@dataclass(frozen=True)
+class MoneyAmount:
+    """A normalized money amount found in a text."""
+
+    value: Decimal
+    currency: str
+    raw: str
+    start: int
+    end: int
+    nmck: bool = False
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return a JSON-friendly representation."""
+        return {
+            "значение": f"{self.value:.2f}",
+            "валюта": self.currency,
+            "текст": self.raw,
+            "позиция": [self.start, self.end],
+            **({"нмцк": True} if self.nmck else {}),
+        }
+
+
+def _multiplier(word: Optional[str]) -> Decimal:
+    if not word:
+        return Decimal(1)
+    word = word.lower()
+    if word.startswith("миллиард"):
+        return Decimal(10**9)
+    return _MULTIPLIERS[word[:3]]
+
+
+def _currency(word: Optional[str], default: str) -> str:
+    if not word:
+        return default
+    word = word.lower()
+    return _CURRENCIES.get(word[:2], _CURRENCIES.get(word[:1], default))
+
+
+def find_amounts(text: str, default_currency: str = "RUB") -> List[MoneyAmount]:
+    """Find and normalize every money amount in `text`.
+
+    A number counts as money when it is followed by a currency, a multiplier
+    (тыс/млн/млрд) or both. Amounts with a multiplier but no currency use
+    `default_currency`.
+    """
+    amounts: List[MoneyAmount] = []
+    for match in MONEY_PATTERN.finditer(text):
+        multiplier = match.group("multiplier")
+        currency = match.group("currency") or match.group("sign")
+        if not multiplier and not currency:
+            continue
+        number = _SPACES.sub("", match.group("number")).replace(",", ".")
+        try:
+            value = Decimal(number) * _multiplier(multiplier)
+        except InvalidOperation:
+            continue
+        amounts.append(
+            MoneyAmount(
+                value=value,
+                currency=_currency(currency, default_currency),
+                raw=match.group(0).strip().rstrip("."),
+                start=match.start(),
+                end=match.end(),
+            )
+        )
+
+    # The first amount after an НМЦК phrase is the initial contract price.
+    starts = [a.start for a in amounts]
+    for anchor in NMCK_PATTERN.finditer(text):
+        i = bisect_left(starts, anchor.end())
+        if i < len(amounts) and amounts[i].start - anchor.end() <= NMCK_WINDOW:
+            amounts[i] = replace(amounts[i], nmck=True)
+    return amounts
+
+
+def summarize_amounts(amounts: Sequence[MoneyAmount]) -> Dict[str, Any]:
+    """Aggregate amounts per currency and pick the НМЦК candidate.
+
+    Returns:
+        dict: Per-currency count, total, minimum and maximum, plus the largest
+        amount found right after an НМЦК phrase, if any.
+    """
+    by_currency: Dict[str, Dict[str, Any]] = {}
+    for amount in amounts:
+        stats = by_currency.setdefault(
+            amount.currency,
+            {"количество": 0, "итого": Decimal(0), "минимум": None, "максимум": None},
+        )
+        stats["количество"] += 1
+        stats["итого"] += amount.value
+        if stats["минимум"] is None or amount.value < stats["минимум"].value:
+            stats["минимум"] = amount
+        if stats["максимум"] is None or amount.value > stats["максимум"].value:
+            stats["максимум"] = amount
+
+    summary: Dict[str, Any] = {
+        currency: {
+            "количество": stats["количество"],
+            "итого": f"{stats['итого']:.2f}",
+            "минимум": stats["минимум"].as_dict(),
+            "максимум": stats["максимум"].as_dict(),
+        }
+        for currency, stats in by_currency.items()
+    }
+    nmck = [a for a in amounts if a.nmck]
+    result: Dict[str, Any] = {"по_валютам": summary}
+    if nmck:
+        result["нмцк"] = max(nmck, key=lambda a: a.value).as_dict()
+    return result
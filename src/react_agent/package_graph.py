@@ -0,0 +1,269 @@
+"""Map-reduce agent for multi-document tender packages.
+
+An alternative to the single-loop ReAct graph in `graph.py`. Instead of letting
+the model open a 30-file package one tool call per step, the documents listed
+in the input are expanded (directories and ZIP archives included), each one is
+extracted in its own parallel branch via `Send`, and a reduce node merges the
+structured findings into a single summary message. The model then answers from
+that summary and can still call tools for follow-up questions.
+"""
+
+import asyncio
+import json
+import os
+import zipfile
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.messages import HumanMessage
+from langgraph.graph import StateGraph
+from langgraph.runtime import Runtime
+from langgraph.types import Send
+from typing_extensions import Annotated, TypedDict
+
+from react_agent import metrics
+from react_agent.checkpoint import SqliteCheckpointSaver
+from react_agent.context import Context
+from react_agent.deadlines import index_document
+from react_agent.graph import break_loop, call_model, route_model_output
+from react_agent.ingestion import IngestionError, ingest_bytes
+from react_agent.state import InputState, State
+from react_agent.tool_node import GuardedToolNode
+from react_agent.tools import TOOLS, tender_findings
+from react_agent.watchdog import ensure_watchdog, register_sources
+
+# How many requirement clauses and keywords the summary keeps.
+MAX_SUMMARY_REQUIREMENTS = 20
+MAX_SUMMARY_KEYWORDS = 30
+
+
+class DocumentTask(TypedDict):
+    """One document of a package, sent to its own extraction branch."""
+
+    path: str
+    member: Optional[str]
+
+
+def merge_findings(
+    left: List[Dict[str, Any]], right: Optional[List[Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
+    """Append per-document findings; `None` clears them for a new package."""
+    if right is None:
+        return []
+    return left + right
+
+
+@dataclass
+class PackageInputState(InputState):
+    """Input of the package graph: the conversation plus the documents to process."""
+
+    documents: Sequence[str] = field(default_factory=list)
+    """Paths to files, directories or ZIP archives that make up the package."""
+
+
+@dataclass
+class PackageState(State):
+    """State of the package graph."""
+
+    documents: Sequence[str] = field(default_factory=list)
+
+    findings: Annotated[List[Dict[str, Any]], merge_findings] = field(
+        default_factory=list
+    )
+    """Structured findings of every document, filled by the parallel branches."""
+
+
+def expand_documents(paths: Sequence[str]) -> List[DocumentTask]:
+    """Expand directories and ZIP archives into individual documents."""
+    tasks: List[DocumentTask] = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+                tasks.extend(
+                    expand_documents(
+                        [
+                            os.path.join(root, f)
+                            for f in sorted(files)
+                            if not f.startswith(".")
+                        ]
+                    )
+                )
+        elif zipfile.is_zipfile(path) and not _is_docx(path):
+            with zipfile.ZipFile(path) as archive:
+                tasks.extend(
+                    {"path": path, "member": name}
+                    for name in archive.namelist()
+                    if not name.endswith("/")
+                )
+        else:
+            tasks.append({"path": path, "member": None})
+    return tasks
+
+
+def _is_docx(path: str) -> bool:
+    with zipfile.ZipFile(path) as archive:
+        return "word/document.xml" in archive.namelist()
+
+
+def _extract(task: DocumentTask, deadline_db_path: str = "") -> Dict[str, Any]:
+    name = f"{task['path']}!{task['member']}" if task["member"] else task["path"]
+    try:
+        if task["member"]:
+            with zipfile.ZipFile(task["path"]) as archive:
+                data = archive.read(task["member"])
+        else:
+            with open(task["path"], "rb") as file:
+                data = file.read()
+        doc = ingest_bytes(data, filename=name)
+    except (OSError, zipfile.BadZipFile, IngestionError) as e:
+        return {"документ": name, "ошибка": str(e)}
+    if deadline_db_path:
+        index_document(deadline_db_path, doc.sha256, name, doc.text)
+    return {
+        "документ": name,
+        "тип": doc.kind,
+        "символов": len(doc.text),
+        **tender_findings(doc.text),
+    }
+
+
+async def ingest_package(
+    state: PackageState, runtime: Runtime[Context]
+) -> Dict[str, Any]:
+    """Start a new package: clear the findings of a previous one.
+
+    Turns without new documents keep the findings and go straight to the model.
+    """
+    context = runtime.context or Context()
+    ensure_watchdog(context.stall_threshold_ms, context.stall_log_path)
+    metrics.ensure_snapshot_writer(
+        context.metrics_path, context.metrics_interval_ms / 1000
+    )
+    return {"findings": None} if state.documents else {}
+
+
+def fan_out_documents(state: PackageState) -> Any:
+    """Send every document of the package to its own extraction branch."""
+    tasks = expand_documents(state.documents)
+    if not tasks:
+        return "call_model"
+    return [Send("extract_document", task) for task in tasks]
+
+
+async def extract_document(
+    task: DocumentTask, runtime: Runtime[Context]
+) -> Dict[str, Any]:
+    """Extract structured findings from one document of the package.
+
+    Its deadlines go to the deadline index when one is configured.
+    """
+    context = runtime.context or Context()
+    return {
+        "findings": [await asyncio.to_thread(_extract, task, context.deadline_db_path)]
+    }
+
+
+def summarize_findings(findings: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge per-document findings into one package summary."""
+    totals: Dict[str, Dict[str, Any]] = {}
+    keywords: Dict[str, int] = {}
+    requirements: List[Dict[str, str]] = []
+    nmck: List[Dict[str, Any]] = []
+    documents: List[Dict[str, Any]] = []
+    errors: List[Dict[str, str]] = []
+
+    for finding in sorted(findings, key=lambda f: f["документ"]):
+        name = finding["документ"]
+        if "ошибка" in finding:
+            errors.append({"документ": name, "ошибка": finding["ошибка"]})
+            continue
+        info = finding.get("найденная_информация", {})
+        documents.append(
+            {
+                "документ": name,
+                "тип": finding["тип"],
+                "символов": finding["символов"],
+                "даты": info.get("даты", []),
+            }
+        )
+        amounts = info.get("суммы_итого", {})
+        for currency, stats in amounts.get("по_валютам", {}).items():
+            total = totals.setdefault(currency, {"количество": 0, "итого": Decimal(0)})
+            total["количество"] += stats["количество"]
+            total["итого"] += Decimal(stats["итого"])
+        if "нмцк" in amounts:
+            nmck.append({"документ": name, **amounts["нмцк"]})
+        for terms in info.get("ключевые_слова_по_категориям", {}).values():
+            for term, stats in terms.items():
+                keywords[term] = keywords.get(term, 0) + stats["количество"]
+        for clause in info.get("требования", []):
+            if len(requirements) < MAX_SUMMARY_REQUIREMENTS:
+                requirements.append({"документ": name, "текст": clause})
+
+    summary: Dict[str, Any] = {
+        "документов": len(findings),
+        "обработано": len(documents),
+        "документы": documents,
+        "суммы_по_валютам": {
+            currency: {"количество": t["количество"], "итого": f"{t['итого']:.2f}"}
+            for currency, t in totals.items()
+        },
+        "ключевые_слова": dict(
+            sorted(keywords.items(), key=lambda item: item[1], reverse=True)[
+                :MAX_SUMMARY_KEYWORDS
+            ]
+        ),
+        "требования": requirements,
+    }
+    if nmck:
+        summary["нмцк"] = max(nmck, key=lambda a: Decimal(a["значение"]))
+    if errors:
+        summary["ошибки"] = errors
+    return summary
+
+
+async def reduce_findings(state: PackageState) -> Dict[str, Any]:
+    """Merge the findings of all branches into one message for the model."""
+    summary = summarize_findings(state.findings)
+    content = (
+        "Сводка по пакету тендерной документации (извлечено автоматически):\n"
+        + json.dumps(summary, ensure_ascii=False, indent=2)
+    )
+    # The package is processed; later turns on the thread should not redo it.
+    return {
+        "messages": [HumanMessage(content=content, name="package_summary")],
+        "documents": [],
+    }
+
+
+register_sources(ingest_package, extract_document, reduce_findings)
+
+builder = StateGraph(
+    PackageState, input_schema=PackageInputState, context_schema=Context
+)
+
+builder.add_node(ingest_package)
+builder.add_node(extract_document)
+builder.add_node(reduce_findings)
+builder.add_node(call_model)
+builder.add_node("tools", GuardedToolNode(TOOLS))
+builder.add_node(break_loop)
+
+builder.add_edge("__start__", "ingest_package")
+builder.add_conditional_edges(
+    "ingest_package", fan_out_documents, ["extract_document", "call_model"]
+)
+# Runs once, after every extraction branch of the superstep has finished
+builder.add_edge("extract_document", "reduce_findings")
+builder.add_edge("reduce_findings", "call_model")
+builder.add_conditional_edges("call_model", route_model_output)
+builder.add_edge("tools", "call_model")
+
+_checkpoint_db = os.environ.get("CHECKPOINT_DB_PATH")
+
+graph = builder.compile(
+    name="Tender Package Agent",
+    checkpointer=SqliteCheckpointSaver(_checkpoint_db) if _checkpoint_db else None,
+)
@@ -0,0 +1,164 @@
+"""Speculative extraction of attachments.
+
+When a user message arrives with attached files, the model usually answers
+with a file tool call, and only then does extraction start. The prefetch
+node finds file content blocks in the new message and starts decoding and
+text extraction in the background right away, so the extraction overlaps the
+first model call.
+
+Prefetched documents are registered by a digest of the raw payload before
+decoding starts, and by the SHA-256 of the decoded bytes once decoding is
+done. The raw digest ignores a data URL prefix and whitespace, so an upload
+tool looks the payload up before decoding it and picks up the in-flight
+extraction whether the model passes the file on as a data URL, bare base64 or
+content block; the decoded hash catches a payload the model re-encoded, e.g.
+a text file passed on as plain text.
+
+Attachments larger than any tool would accept (see `react_agent.tool_node`)
+are not prefetched, and a prefetched document is dropped as soon as a tool
+takes it, so only documents still waiting for their tool call stay in memory.
+
+Metrics: `prefetch.started`, `prefetch.skipped` and `prefetch.reused`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import List, Optional, Set, Union
+
+from langchain_core.messages import HumanMessage
+
+from react_agent import metrics
+from react_agent.ingestion import (
+    IngestedDocument,
+    IngestionError,
+    RawUpload,
+    decode_payload,
+    ingest_bytes,
+    normalize_input,
+)
+from react_agent.tool_node import payload_size
+
+logger = logging.getLogger(__name__)
+
+# Registry keys, up to two per document.
+MAX_PREFETCHED = 16
+
+_documents: OrderedDict[str, asyncio.Future[IngestedDocument]] = OrderedDict()
+# Keeps prefetch tasks alive until their extraction is done.
+_tasks: Set[asyncio.Task[None]] = set()
+
+
+def payload_key(payload: Union[str, bytes]) -> str:
+    """Return the registry key of an upload payload.
+
+    Bytes are taken as decoded and keyed by their SHA-256; a string payload is
+    keyed by its base64 data without a data URL prefix and whitespace.
+    """
+    if isinstance(payload, bytes):
+        return hashlib.sha256(payload).hexdigest()
+    if payload.startswith("data:"):
+        payload = payload.partition(",")[2]
+    return "raw:" + hashlib.sha256("".join(payload.split()).encode("utf-8")).hexdigest()
+
+
+def find_attachments(message: HumanMessage) -> List[dict]:
+    """Return the file content blocks of a message that carry inline data."""
+    if isinstance(message.content, str):
+        return []
+    return [
+        block
+        for block in message.content
+        if isinstance(block, dict)
+        and block.get("type") == "file"
+        and block.get("source_type", "base64") == "base64"
+    ]
+
+
+def _normalize(block: dict) -> tuple[RawUpload, str]:
+    upload = normalize_input(block)
+    return upload, payload_key(upload.payload)
+
+
+def _decode(upload: RawUpload) -> tuple[str, bytes]:
+    if isinstance(upload.payload, str) and not upload.payload.startswith("data:"):
+        # Block data is base64 even for text files, which the decode stage
+        # would otherwise take literally.
+        upload.payload = f"data:{upload.mime_type or 'application/octet-stream'};base64,{upload.payload}"
+    data = decode_payload(upload)
+    return payload_key(data), data
+
+
+def _register(key: str, future: asyncio.Future[IngestedDocument]) -> None:
+    _documents.setdefault(key, future)
+    while len(_documents) > MAX_PREFETCHED:
+        _documents.popitem(last=False)
+
+
+async def _prefetch(block: dict) -> None:
+    try:
+        upload, key = await asyncio.to_thread(_normalize, block)
+    except IngestionError as e:
+        logger.debug("Attachment was not prefetched: %s", e)
+        return
+    if key in _documents:
+        return
+    future: asyncio.Future[IngestedDocument] = (
+        asyncio.get_running_loop().create_future()
+    )
+    # Failures surface when a tool reuses the result; do not log them as unretrieved.
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    # Registered before decoding, so a tool call arriving meanwhile waits for it
+    _register(key, future)
+    try:
+        decoded_key, data = await asyncio.to_thread(_decode, upload)
+        if _documents.get(key) is future:  # not taken by a tool meanwhile
+            _register(decoded_key, future)
+        doc = await asyncio.to_thread(
+            ingest_bytes, data, upload.filename, upload.mime_type
+        )
+    except Exception as e:
+        future.set_exception(e)
+    else:
+        future.set_result(doc)
+
+
+def start_prefetch(message: HumanMessage, max_bytes: int = 0) -> int:
+    """Start decoding and extracting the attachments of `message` in the background.
+
+    Attachments over `max_bytes` (0 means no limit) are skipped. Returns the
+    number of attachments being prefetched.
+    """
+    attachments = []
+    for block in find_attachments(message):
+        if 0 < max_bytes < payload_size(block):
+            metrics.increment("prefetch.skipped")
+            continue
+        attachments.append(block)
+        task = asyncio.ensure_future(_prefetch(block))
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+        metrics.increment("prefetch.started")
+    return len(attachments)
+
+
+async def reuse_prefetched(payload: Union[str, bytes]) -> Optional[IngestedDocument]:
+    """Return the prefetched document for this payload, waiting if it is in flight.
+
+    `payload` is the raw upload payload or its decoded bytes (see `payload_key`).
+    """
+    if not _documents:
+        return None
+    key = await asyncio.to_thread(payload_key, payload)
+    future = _documents.get(key)
+    if future is None or future.get_loop() is not asyncio.get_running_loop():
+        return None
+    # Handed over to the tool; the cache does not keep it alive any longer.
+    for other in [k for k, f in _documents.items() if f is future]:
+        del _documents[other]
+    metrics.increment("prefetch.reused")
+    # Shielded: a cancelled tool call must not cancel the extraction thread.
+    return await asyncio.shield(future)
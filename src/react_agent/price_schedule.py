@@ -0,0 +1,274 @@
+"""Streaming aggregation of CSV price schedules and bills of quantities.
+
+Rows are read with the `csv` module and buffered in fixed-size chunks of
+`array('d')` columns; each chunk is reduced to running totals and dropped, so
+memory depends on the chunk size and the number of groups, not on the file
+size. NumPy is used for the per-chunk reductions when it is installed.
+
+Numbers are parsed in Russian notation: spaces (including non-breaking ones)
+as thousands separators and a comma as the decimal separator.
+"""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import math
+import re
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when NumPy is missing
+    np = None
+
+_NAN = float("nan")
+_SAMPLE_BYTES = 64 * 1024
+_SPACES = re.compile(r"[\s\u00a0\u202f']+")
+_CURRENCY = re.compile(r"(?:руб(?:лей|ля|ль)?|р|₽|rub|\$|€|eur|usd)\.?$", re.I)
+_DIGIT_OR_SIGN = frozenset("0123456789+-")
+_NUMBER = re.compile(r"^[+-]?\d+(?:\.\d+)?$")
+
+
+def _is_grouped(integer: str, separator: str) -> bool:
+    groups = integer.lstrip("+-").split(separator)
+    return 1 <= len(groups[0]) <= 3 and all(len(g) == 3 for g in groups[1:])
+
+
+def parse_number(value: str) -> Optional[float]:
+    """Parse a number written in Russian or international notation.
+
+    Examples: "1 234 567,89", "1 500", "2.5", "1.234.567,00", "(300,00)",
+    "12 500 руб.". Returns None when the value is not a number.
+    """
+    # Fast paths for plain and "1 234,5"-style values, which dominate exports.
+    if value[:1] in _DIGIT_OR_SIGN:
+        compact = value.replace(" ", "").replace("\u00a0", "")
+        if "." not in compact and compact.count(",") <= 1:
+            compact = compact.replace(",", ".")
+        try:
+            return float(compact)
+        except ValueError:
+            pass
+
+    text = _CURRENCY.sub("", value.strip()).strip()
+    if not text:
+        return None
+    negative = text.startswith("(") and text.endswith(")")
+    if negative:
+        text = text[1:-1]
+    text = _SPACES.sub("", text)
+
+    comma, dot = text.rfind(","), text.rfind(".")
+    if comma >= 0 and dot >= 0:
+        # The separator that comes last is the decimal one.
+        thousands, decimal = (".", ",") if comma > dot else (",", ".")
+        integer, _, fraction = text.rpartition(decimal)
+        if not _is_grouped(integer, thousands):
+            return None
+        text = integer.replace(thousands, "") + "." + fraction
+    elif text.count(",") == 1:
+        text = text.replace(",", ".")
+    elif comma >= 0 or text.count(".") > 1:
+        # Several identical separators can only be thousands separators;
+        # this also keeps dates like 10.06.2025 from parsing as numbers.
+        separator = "," if comma >= 0 else "."
+        if not _is_grouped(text, separator):
+            return None
+        text = text.replace(separator, "")
+
+    if not _NUMBER.match(text):
+        return None
+    number = float(text)
+    return -number if negative else number
+
+
+@dataclass
+class ColumnStats:
+    """Running aggregates of one numeric column."""
+
+    count: int = 0
+    total: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+
+    def add_chunk(self, values: array) -> None:
+        """Fold a chunk of values (NaN marks a missing value) into the totals."""
+        if np is not None:
+            chunk = np.frombuffer(values, dtype=np.float64)
+            present = chunk[~np.isnan(chunk)]
+            if present.size:
+                self.count += int(present.size)
+                self.total += float(present.sum())
+                self.min = min(self.min, float(present.min()))
+                self.max = max(self.max, float(present.max()))
+            return
+        for v in values:
+            if v == v:  # skip NaN
+                self.count += 1
+                self.total += v
+                if v < self.min:
+                    self.min = v
+                if v > self.max:
+                    self.max = v
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the aggregates as plain JSON-friendly values."""
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "sum": round(self.total, 2),
+            "min": self.min,
+            "max": self.max,
+            "avg": round(self.total / self.count, 2),
+        }
+
+
+def detect_encoding(sample: bytes) -> str:
+    """Choose between UTF-8 and Windows-1251 for a CSV export."""
+    try:
+        codecs.getincrementaldecoder("utf-8-sig")().decode(sample, final=False)
+        return "utf-8-sig"
+    except UnicodeDecodeError:
+        return "cp1251"
+
+
+def detect_delimiter(sample: str) -> str:
+    """Guess the delimiter. Russian exports usually use ';'."""
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=";,\t|").delimiter
+    except csv.Error:
+        first_line = sample.split("\n", 1)[0]
+        return max(";,\t|", key=first_line.count)
+
+
+def _resolve(header: Sequence[str], names: Iterable[str]) -> List[int]:
+    lookup = {name.strip().lower(): i for i, name in enumerate(header)}
+    indexes = []
+    for name in names:
+        key = name.strip().lower()
+        if key not in lookup:
+            raise ValueError(
+                f"Колонка '{name}' не найдена. Доступные колонки: {', '.join(header)}"
+            )
+        indexes.append(lookup[key])
+    return indexes
+
+
+def _numeric_columns(header: Sequence[str], rows: Sequence[Sequence[str]]) -> List[int]:
+    """Pick the columns where most non-empty sample values are numbers."""
+    result = []
+    for i in range(len(header)):
+        values = [row[i] for row in rows if i < len(row) and row[i].strip()]
+        parsed = sum(parse_number(v) is not None for v in values)
+        if values and parsed / len(values) >= 0.8:
+            result.append(i)
+    return result
+
+
+def aggregate_csv(
+    file_path: str,
+    value_columns: Optional[Sequence[str]] = None,
+    group_by: Optional[str] = None,
+    delimiter: Optional[str] = None,
+    chunk_rows: int = 50_000,
+    max_groups: int = 50,
+) -> Dict[str, Any]:
+    """Stream a CSV file and aggregate its numeric columns.
+
+    Args:
+        file_path: Path to the CSV file.
+        value_columns: Column names to aggregate. Numeric columns are detected
+            from the first chunk when omitted.
+        group_by: Optional column name to group totals by.
+        delimiter: Field delimiter; detected from the file when omitted.
+        chunk_rows: Number of rows buffered before they are reduced.
+        max_groups: Maximum number of groups in the result, largest first.
+
+    Returns:
+        dict: Row count, per-column totals and (optionally) per-group totals.
+    """
+    with open(file_path, "rb") as raw:
+        sample = raw.read(_SAMPLE_BYTES)
+    encoding = detect_encoding(sample)
+    sample_text = sample.decode(encoding, errors="ignore")
+    delimiter = delimiter or detect_delimiter(sample_text)
+
+    with open(file_path, encoding=encoding, errors="replace", newline="") as file:
+        reader = csv.reader(file, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError("Файл пуст")
+        header = [h.strip() for h in header]
+        group_index = _resolve(header, [group_by])[0] if group_by else None
+
+        buffered: List[List[str]] = []
+        columns: Optional[List[int]] = (
+            _resolve(header, value_columns) if value_columns else None
+        )
+        totals: Dict[int, ColumnStats] = {}
+        groups: Dict[str, Dict[int, ColumnStats]] = {}
+        row_count = 0
+
+        def flush() -> None:
+            nonlocal columns
+            if columns is None:
+                columns = [
+                    i for i in _numeric_columns(header, buffered) if i != group_index
+                ]
+            for i in columns:
+                values = array(
+                    "d",
+                    (
+                        _NAN
+                        if i >= len(row) or (v := parse_number(row[i])) is None
+                        else v
+                        for row in buffered
+                    ),
+                )
+                totals.setdefault(i, ColumnStats()).add_chunk(values)
+                if group_index is not None:
+                    per_group: Dict[str, array] = {}
+                    for row, value in zip(buffered, values):
+                        key = row[group_index].strip() if group_index < len(row) else ""
+                        per_group.setdefault(key, array("d")).append(value)
+                    for key, group_values in per_group.items():
+                        groups.setdefault(key, {}).setdefault(
+                            i, ColumnStats()
+                        ).add_chunk(group_values)
+            buffered.clear()
+
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            buffered.append(row)
+            row_count += 1
+            if len(buffered) >= chunk_rows:
+                flush()
+        if buffered:
+            flush()
+
+    result: Dict[str, Any] = {
+        "файл": file_path,
+        "строк": row_count,
+        "разделитель": delimiter,
+        "кодировка": encoding,
+        "итоги": {header[i]: stats.as_dict() for i, stats in totals.items()},
+    }
+    if group_index is not None and columns:
+        first = columns[0]
+        ordered = sorted(
+            groups.items(),
+            key=lambda item: item[1].get(first, ColumnStats()).total,
+            reverse=True,
+        )
+        result["группировка"] = header[group_index]
+        result["всего_групп"] = len(groups)
+        result["группы"] = {
+            key: {header[i]: stats.as_dict() for i, stats in per_column.items()}
+            for key, per_column in ordered[:max_groups]
+        }
+    return result
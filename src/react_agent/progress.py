@@ -0,0 +1,103 @@
+"""Throttled progress events from long-running tools.
+
+Parsing a large PDF or decoding a big upload can take long enough for clients
+to time out and retry. While a tool runs, the ingestion and analysis stages
+report what they have done so far (pages parsed, bytes decoded, matches
+found) and the events are sent through LangGraph's custom stream writer, so
+they reach clients streaming with `stream_mode="custom"`:
+
+    {"type": "progress", "tool": "analyze_document", "stage": "extract",
+     "pages": 120, "total_pages": 500, "elapsed_ms": 5300}
+
+Within one stage at most one event per interval is sent; the first event of
+every stage and the final "done" event always go out. The reporter of the
+running tool call lives in a context variable, so the stages need no extra
+arguments and reports from worker threads started with `asyncio.to_thread`
+reach the right call.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+from langgraph.config import get_stream_writer
+
+
+class ProgressReporter:
+    """Sends the progress events of one tool call at a bounded rate."""
+
+    def __init__(self, tool: str, writer: Callable[[Any], None], interval: float):
+        """Send events for `tool` through `writer`, at most one per `interval` seconds per stage."""
+        self.tool = tool
+        self.interval = interval
+        self.sent = 0
+        self.suppressed = 0
+        self._writer = writer
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._stage = ""
+        self._last = 0.0
+
+    def report(self, stage: str, final: bool = False, **counters: Any) -> None:
+        """Report the counters of `stage`; throttled unless the stage changed or `final`."""
+        now = time.monotonic()
+        with self._lock:
+            if not final and stage == self._stage and now - self._last < self.interval:
+                self.suppressed += 1
+                return
+            self._stage = stage
+            self._last = now
+            self.sent += 1
+        self._writer(
+            {
+                "type": "progress",
+                "tool": self.tool,
+                "stage": stage,
+                **counters,
+                "elapsed_ms": round((now - self._started) * 1000),
+            }
+        )
+
+
+_current: ContextVar[Optional[ProgressReporter]] = ContextVar(
+    "tool_progress", default=None
+)
+
+
+def _stream_writer() -> Optional[Callable[[Any], None]]:
+    try:
+        return get_stream_writer()
+    except (RuntimeError, KeyError):
+        return None
+
+
+@contextmanager
+def tool_progress(tool: str, interval: float) -> Iterator[Optional[ProgressReporter]]:
+    """Collect progress of the tool call running in this context.
+
+    Yields None (and reports are dropped) outside a graph run or when
+    `interval` is not positive.
+    """
+    writer = _stream_writer()
+    if writer is None or interval <= 0:
+        yield None
+        return
+    reporter = ProgressReporter(tool, writer, interval)
+    token = _current.set(reporter)
+    try:
+        yield reporter
+    finally:
+        _current.reset(token)
+        if reporter.sent:
+            reporter.report("done", final=True)
+
+
+def report_progress(stage: str, **counters: Any) -> None:
+    """Report progress of the current tool call, if there is one."""
+    reporter = _current.get()
+    if reporter is not None:
+        reporter.report(stage, **counters)
@@ -0,0 +1,191 @@
+"""Adaptive client-side concurrency limiting for model provider calls.
+
+Every provider/model pair gets one process-wide limiter. The number of calls
+allowed in flight adapts with AIMD: it grows by about one per round of
+successful calls while latency stays close to the best observed latency, and
+is halved when the provider answers with a rate-limit error (429). Halving
+happens at most once per typical call duration, so a burst of 429s from calls
+that were already in flight counts as one congestion signal.
+
+Calls that do not fit are queued per conversation thread and served
+round-robin across threads, so one busy thread cannot starve the others.
+Queue-wait time is recorded in the `rate_limit.queue_wait_ms` metric.
+Rate-limited calls are retried through the queue with jittered backoff
+instead of hammering the provider.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+from react_agent import metrics
+
+T = TypeVar("T")
+
+# A call slower than this multiple of the best latency stops the growth.
+LATENCY_TOLERANCE = 2.0
+MAX_ATTEMPTS = 4
+BASE_BACKOFF = 0.5
+
+_Waiter = Tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Return True for provider errors that signal throttling (HTTP 429)."""
+    status = getattr(error, "status_code", None) or getattr(
+        getattr(error, "response", None), "status_code", None
+    )
+    return status == 429 or "RateLimit" in type(error).__name__
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit with fair per-thread queueing."""
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: float = 4,
+        min_limit: float = 1,
+        max_limit: float = 32,
+    ):
+        """Create a limiter; `name` labels its metrics."""
+        self.name = name
+        self.limit = float(initial_limit)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._queues: OrderedDict[str, Deque[_Waiter]] = OrderedDict()
+        self._best_latency: Optional[float] = None
+        self._avg_latency = 1.0
+        self._last_decrease = 0.0
+
+    async def acquire(self, thread_id: str = "default") -> float:
+        """Wait for a slot; returns the time spent in the queue in seconds."""
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if not self._queues and self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return 0.0
+            future: asyncio.Future[None] = loop.create_future()
+            self._queues.setdefault(thread_id, deque()).append((loop, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                queue = self._queues.get(thread_id)
+                if queue and (loop, future) in queue:
+                    queue.remove((loop, future))
+                    if not queue:
+                        del self._queues[thread_id]
+                elif future.done() and not future.cancelled():
+                    # Cancelled right after the slot was granted.
+                    self.in_flight -= 1
+                    self._dispatch()
+            raise
+        return time.monotonic() - started
+
+    def release(self, latency: Optional[float] = None, throttled: bool = False) -> None:
+        """Free a slot and adapt the limit to the outcome of the call."""
+        now = time.monotonic()
+        with self._lock:
+            self.in_flight -= 1
+            if throttled:
+                if now - self._last_decrease > self._avg_latency:
+                    self.limit = max(self.min_limit, self.limit / 2)
+                    self._last_decrease = now
+            elif latency is not None:
+                self._avg_latency = 0.8 * self._avg_latency + 0.2 * latency
+                if self._best_latency is None or latency < self._best_latency:
+                    self._best_latency = latency
+                if latency <= self._best_latency * LATENCY_TOLERANCE:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._dispatch()
+        metrics.observe("rate_limit.limit", self.limit, labels={"model": self.name})
+
+    def _dispatch(self) -> None:
+        # Called with the lock held. Threads take turns: the served thread
+        # moves to the back of the line.
+        while self._queues and self.in_flight < int(self.limit):
+            thread_id, queue = next(iter(self._queues.items()))
+            loop, future = queue.popleft()
+            if queue:
+                self._queues.move_to_end(thread_id)
+            else:
+                del self._queues[thread_id]
+            self.in_flight += 1
+            loop.call_soon_threadsafe(self._grant, future)
+
+    def _grant(self, future: asyncio.Future[None]) -> None:
+        if future.done():
+            # The waiter was cancelled after it had been picked; free its slot.
+            with self._lock:
+                self.in_flight -= 1
+                self._dispatch()
+        else:
+            future.set_result(None)
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        thread_id: str = "default",
+        max_attempts: int = MAX_ATTEMPTS,
+    ) -> T:
+        """Run `fn` within the limit, retrying rate-limited attempts."""
+        labels = {"model": self.name}
+        for attempt in range(1, max_attempts + 1):
+            waited = await self.acquire(thread_id)
+            metrics.observe("rate_limit.queue_wait_ms", waited * 1000, labels=labels)
+            started = time.monotonic()
+            try:
+                result = await fn()
+            except Exception as e:
+                throttled = is_rate_limit_error(e)
+                self.release(throttled=throttled)
+                if not throttled or attempt == max_attempts:
+                    raise
+                metrics.increment("rate_limit.throttled", labels=labels)
+                await asyncio.sleep(
+                    BASE_BACKOFF * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+                )
+                continue
+            except BaseException:
+                self.release()
+                raise
+            self.release(latency=time.monotonic() - started)
+            return result
+        raise AssertionError("unreachable")
+
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(model: str, max_concurrency: int = 32) -> AdaptiveLimiter:
+    """Return the process-wide limiter for a fully specified model name."""
+    with _limiters_lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            limiter = AdaptiveLimiter(
+                model, initial_limit=min(4, max_concurrency), max_limit=max_concurrency
+            )
+            _limiters[model] = limiter
+        return limiter
+
+
+async def call_with_limit(
+    model: str,
+    thread_id: str,
+    fn: Callable[[], Awaitable[T]],
+    max_concurrency: int = 32,
+) -> T:
+    """Call `fn` through the limiter of `model`; no limiting if `max_concurrency` <= 0."""
+    if max_concurrency <= 0:
+        return await fn()
+    return await get_limiter(model, max_concurrency).call(fn, thread_id)
@@ -0,0 +1,348 @@
+r"""Append-only columnar file of structured tender records.
+
+Batch extraction writes one typed record per document (amounts, dates,
+keywords, requirements, source path and hash) so that dashboards can scan the
+results directly instead of re-parsing chat history. The file is a sequence of
+row groups after a short magic header:
+
+    b"TREC1\n"
+    b"RGRP" <u32 header length> <u32 body length> <header JSON> <body>
+    ...
+
+The header of a row group holds the number of rows and, per column, the
+offset and length of its compressed chunk in the body plus the min/max of its
+values. A scan reads only the headers, skips row groups whose statistics rule
+out the predicate, and decompresses only the columns it needs. Numeric
+columns are packed float64/int64 arrays; string and list columns are JSON
+arrays. Every chunk is zlib-compressed.
+
+Writers buffer rows and append a whole row group at a time under an `fcntl`
+lock, so several processes can append to the same file. A row group cut short
+by a crash is ignored by readers and cut off by the next flush of any writer,
+before it appends.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import struct
+import threading
+import time
+import zlib
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from react_agent.deadlines import find_deadlines, tender_number
+from react_agent.ingestion import IngestedDocument
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not POSIX
+    fcntl = None  # type: ignore[assignment]
+
+MAGIC = b"TREC1\n"
+GROUP_MAGIC = b"RGRP"
+_GROUP_HEADER = struct.Struct("<4sII")
+ROW_GROUP_ROWS = 1024
+
+# Column types: packed numbers, strings and lists of them.
+COLUMN_TYPES = {
+    "source": "str",
+    "sha256": "str",
+    "kind": "str",
+    "tender_id": "str",
+    "chars": "int",
+    "nmck": "float",
+    "max_amount": "float",
+    "amounts": "list[float]",
+    "currencies": "list[str]",
+    "deadline": "str",
+    "dates": "list[str]",
+    "keywords": "list[str]",
+    "requirements": "list[str]",
+    "exported_at": "float",
+}
+
+
+@dataclass
+class TenderRecord:
+    """Structured findings of one document.
+
+    Missing numbers are NaN, missing strings are empty; dates are ISO strings,
+    so they compare in date order.
+    """
+
+    source: str
+    sha256: str
+    kind: str
+    tender_id: str = ""
+    chars: int = 0
+    nmck: float = math.nan
+    max_amount: float = math.nan
+    amounts: List[float] = field(default_factory=list)
+    currencies: List[str] = field(default_factory=list)
+    deadline: str = ""
+    dates: List[str] = field(default_factory=list)
+    keywords: List[str] = field(default_factory=list)
+    requirements: List[str] = field(default_factory=list)
+    exported_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_findings(
+        cls, doc: IngestedDocument, findings: Dict[str, Any]
+    ) -> TenderRecord:
+        """Build the record of a document from its `tender_findings` result."""
+        found = findings.get("найденная_информация", {})
+        amounts = found.get("суммы", [])
+        nmck = found.get("суммы_итого", {}).get("нмцк")
+        dates = sorted({d.due.isoformat() for d in find_deadlines(doc.text)})
+        values = [float(a["значение"]) for a in amounts]
+        return cls(
+            source=doc.filename,
+            sha256=doc.sha256,
+            kind=doc.kind,
+            tender_id=tender_number(doc.text) or "",
+            chars=len(doc.text),
+            nmck=float(nmck["значение"]) if nmck else math.nan,
+            max_amount=max(values, default=math.nan),
+            amounts=values,
+            currencies=[a["валюта"] for a in amounts],
+            deadline=dates[0] if dates else "",
+            dates=dates,
+            keywords=list(found.get("ключевые_слова", [])),
+            requirements=list(found.get("требования", [])),
+        )
+
+
+def _encode(kind: str, values: List[Any]) -> bytes:
+    if kind == "float":
+        return array("d", values).tobytes()
+    if kind == "int":
+        return array("q", values).tobytes()
+    return json.dumps(values, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _decode(kind: str, data: bytes) -> List[Any]:
+    if kind in ("float", "int"):
+        packed = array("d" if kind == "float" else "q")
+        packed.frombytes(data)
+        return packed.tolist()
+    return json.loads(data)
+
+
+def _stats(kind: str, values: List[Any]) -> Tuple[Any, Any]:
+    """Min and max over the present values (list elements for list columns)."""
+    if kind.startswith("list"):
+        values = [item for value in values for item in value]
+    present = [
+        v for v in values if v != "" and not (isinstance(v, float) and math.isnan(v))
+    ]
+    if not present:
+        return None, None
+    return min(present), max(present)
+
+
+def _encode_group(records: Sequence[TenderRecord]) -> bytes:
+    columns = {}
+    chunks = []
+    offset = 0
+    for name, kind in COLUMN_TYPES.items():
+        values = [getattr(record, name) for record in records]
+        chunk = zlib.compress(_encode(kind, values))
+        low, high = _stats(kind, values)
+        columns[name] = {
+            "offset": offset,
+            "length": len(chunk),
+            "min": low,
+            "max": high,
+        }
+        chunks.append(chunk)
+        offset += len(chunk)
+    header = json.dumps(
+        {"rows": len(records), "columns": columns}, ensure_ascii=False
+    ).encode("utf-8")
+    body = b"".join(chunks)
+    return _GROUP_HEADER.pack(GROUP_MAGIC, len(header), len(body)) + header + body
+
+
+class RecordWriter:
+    """Buffers records and appends them to `path` one row group at a time."""
+
+    def __init__(self, path: str, row_group_rows: int = ROW_GROUP_ROWS):
+        """Append to `path`, creating it if needed."""
+        self.path = path
+        self.row_group_rows = row_group_rows
+        self.written = 0
+        # End of the last complete row group this writer saw in the file.
+        self._end = 0
+        self._pending: List[TenderRecord] = []
+        self._lock = threading.Lock()
+
+    def append(self, record: TenderRecord) -> None:
+        """Add a record; a full row group is written right away."""
+        with self._lock:
+            self._pending.append(record)
+            if len(self._pending) >= self.row_group_rows:
+                self._flush()
+
+    def flush(self) -> None:
+        """Write the buffered records as a (possibly short) row group."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        data = _encode_group(self._pending)
+        with open(self.path, "ab") as file:
+            if fcntl is not None:
+                fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                size = os.fstat(file.fileno()).st_size
+                if size == 0:
+                    file.write(MAGIC)
+                    size = self._end = len(MAGIC)
+                elif size != self._end:
+                    # Other writers appended since, or one crashed mid-group:
+                    # check the new tail and drop an incomplete group.
+                    start = self._end if len(MAGIC) <= self._end <= size else len(MAGIC)
+                    end = _complete_end(self.path, start)
+                    if end < size:
+                        file.truncate(end)
+                    self._end = end
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+                self._end += len(data)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(file, fcntl.LOCK_UN)
+        self.written += len(self._pending)
+        self._pending = []
+
+    def __enter__(self) -> RecordWriter:
+        """Return the writer; the buffered records are written on exit."""
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        """Write the records still buffered."""
+        self.flush()
+
+
+@dataclass(frozen=True)
+class RowGroup:
+    """Location and statistics of one row group."""
+
+    offset: int
+    length: int
+    rows: int
+    columns: Dict[str, Dict[str, Any]]
+
+
+def _read_groups(path: str, start: int) -> Iterator[RowGroup]:
+    """Read the complete row groups from offset `start`; stops at a torn one."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a tender record file")
+        file.seek(start)
+        while True:
+            group_start = file.tell()
+            prefix = file.read(_GROUP_HEADER.size)
+            if len(prefix) < _GROUP_HEADER.size:
+                return
+            magic, header_length, body_length = _GROUP_HEADER.unpack(prefix)
+            body_offset = group_start + _GROUP_HEADER.size + header_length
+            if magic != GROUP_MAGIC or body_offset + body_length > size:
+                return  # a group cut short by a crash
+            try:
+                header = json.loads(file.read(header_length))
+                group = RowGroup(
+                    body_offset, body_length, header["rows"], header["columns"]
+                )
+            except (ValueError, KeyError, TypeError):
+                return  # a header that was not written completely
+            yield group
+            file.seek(body_length, os.SEEK_CUR)
+
+
+def _complete_end(path: str, start: int) -> int:
+    """Return the end offset of the last complete row group after `start`."""
+    end = start
+    for group in _read_groups(path, start):
+        end = group.offset + group.length
+    return end
+
+
+def row_groups(path: str) -> Iterator[RowGroup]:
+    """Read the row group headers of a file, skipping over the column data."""
+    return _read_groups(path, len(MAGIC))
+
+
+Range = Tuple[Any, Any]
+
+
+def _in_range(value: Any, bounds: Range) -> bool:
+    low, high = bounds
+    return (low is None or value >= low) and (high is None or value <= high)
+
+
+def _may_match(group: RowGroup, where: Dict[str, Range]) -> bool:
+    for name, (low, high) in where.items():
+        stats = group.columns[name]
+        if stats["min"] is None:
+            return False
+        if (low is not None and stats["max"] < low) or (
+            high is not None and stats["min"] > high
+        ):
+            return False
+    return True
+
+
+def _matches(kind: str, value: Any, bounds: Range) -> bool:
+    if kind.startswith("list"):
+        return any(_in_range(item, bounds) for item in value)
+    if value == "" or (isinstance(value, float) and math.isnan(value)):
+        return False
+    return _in_range(value, bounds)
+
+
+def scan(
+    path: str,
+    columns: Optional[Iterable[str]] = None,
+    where: Optional[Dict[str, Range]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield the rows whose columns fall in the `where` ranges.
+
+    `where` maps a column to an inclusive (low, high) range, None for an open
+    end; a list column matches when any element is in range. Only `columns`
+    (all by default) and the filtered columns are decoded, and row groups
+    whose min/max rule out a range are not read at all.
+    """
+    where = where or {}
+    wanted = list(columns) if columns is not None else list(COLUMN_TYPES)
+    needed = list(dict.fromkeys([*wanted, *where]))
+    with open(path, "rb") as file:
+        for group in row_groups(path):
+            if not _may_match(group, where):
+                continue
+            data = {}
+            for name in needed:
+                stats = group.columns[name]
+                file.seek(group.offset + stats["offset"])
+                data[name] = _decode(
+                    COLUMN_TYPES[name], zlib.decompress(file.read(stats["length"]))
+                )
+            for i in range(group.rows):
+                if all(
+                    _matches(COLUMN_TYPES[n], data[n][i], r) for n, r in where.items()
+                ):
+                    yield {name: data[name][i] for name in wanted}
+
+
+def count_records(path: str) -> int:
+    """Return the number of records in the file without decoding any column."""
+    return sum(group.rows for group in row_groups(path))
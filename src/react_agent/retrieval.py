@@ -0,0 +1,156 @@
+"""Chunking and BM25 retrieval over extracted documents.
+
+Documents are split into chunks that respect page breaks (form feeds emitted
+by the PDF extractor) and section headings, then indexed in an in-memory BM25
+index. Indexes are cached per thread and document, so a document is indexed
+once and every later question in the thread only pays for the lookup.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Tuple
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_HEADING = re.compile(
+    r"^\s*(?:\d{1,2}(?:\.\d{1,2})*\.?\s+[А-ЯЁA-Z]"
+    r"|(?i:раздел|глава|статья|приложение)\s+(?:№\s*)?\d"
+    r"|[А-ЯЁ][А-ЯЁ ,\-]{8,}$)"
+)
+# Longest endings first; only stripped when a stem of 3+ letters remains.
+_ENDINGS = sorted(
+    (
+        "иями ями ами ией ием иям иях ого его ому ему ыми ими ать ять ить еть ует уют "
+        "ение ения ений ении ость ости ая яя ое ее ые ие ии ию ый ий ой ей ом ем ам ям "
+        "ах ях ов ев ую юю ия ья а я о е ы и у ю ь й"
+    ).split(),
+    key=len,
+    reverse=True,
+)
+ENDINGS = frozenset(_ENDINGS)
+
+
+def stem(token: str) -> str:
+    """Strip a common Russian inflectional ending from a lower-case token."""
+    for ending in _ENDINGS:
+        if token.endswith(ending) and len(token) - len(ending) >= 3:
+            return token[: -len(ending)]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into stemmed lower-case terms."""
+    return [stem(t) for t in _TOKEN.findall(text.lower()) if len(t) > 1 or t.isdigit()]
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """A retrievable piece of a document."""
+
+    text: str
+    page: int
+    section: str
+    start: int
+    end: int
+
+
+def chunk_document(text: str, max_chars: int = 1500) -> List[Chunk]:
+    """Split a document into page- and section-aware chunks.
+
+    Paragraphs are packed into chunks of up to `max_chars` characters. A chunk
+    never spans a page break or a section heading; oversized paragraphs are
+    split on their own.
+    """
+    chunks: List[Chunk] = []
+    section = ""
+    offset = 0
+    for page_number, page in enumerate(text.split("\f"), start=1):
+        lines: List[str] = []
+        size = 0
+        start = position = offset
+
+        def emit(end: int) -> None:
+            body = "\n".join(lines).strip()
+            if body:
+                chunks.append(Chunk(body, page_number, section, start, end))
+
+        for line in page.split("\n"):
+            pieces = [line[i : i + max_chars] for i in range(0, len(line), max_chars)]
+            for piece in pieces or [""]:
+                heading = len(piece) < 200 and _HEADING.match(piece) is not None
+                if heading or size + len(piece) > max_chars:
+                    emit(position)
+                    lines, size, start = [], 0, position
+                    if heading:
+                        section = piece.strip()
+                lines.append(piece)
+                size += len(piece) + 1
+                position += len(piece)
+            position += 1
+        emit(position - 1)
+        offset += len(page) + 1
+    return chunks
+
+
+class BM25Index:
+    """Okapi BM25 over a list of chunks."""
+
+    def __init__(self, chunks: List[Chunk], k1: float = 1.5, b: float = 0.75):
+        """Build the inverted index for `chunks`."""
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.lengths: List[int] = []
+        for i, chunk in enumerate(chunks):
+            terms = tokenize(chunk.section + "\n" + chunk.text)
+            self.lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                self.postings.setdefault(term, []).append((i, tf))
+        self.avg_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+
+    def _idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        n = len(self.chunks)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[Chunk, float]]:
+        """Return the `top_k` chunks that best match `query`, best first."""
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            idf = self._idf(term)
+            for i, tf in self.postings.get(term, ()):
+                norm = self.k1 * (
+                    1 - self.b + self.b * self.lengths[i] / self.avg_length
+                )
+                scores[i] = scores.get(i, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        return [(self.chunks[i], score) for i, score in best]
+
+
+_indexes: OrderedDict[Hashable, BM25Index] = OrderedDict()
+_indexes_lock = threading.Lock()
+MAX_CACHED_INDEXES = 32
+
+
+def get_cached_index(key: Hashable) -> Optional[BM25Index]:
+    """Return a cached index and mark it as recently used."""
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+        return index
+
+
+def cache_index(key: Hashable, index: BM25Index) -> None:
+    """Cache an index, evicting the least recently used ones."""
+    with _indexes_lock:
+        _indexes[key] = index
+        _indexes.move_to_end(key)
+        while len(_indexes) > MAX_CACHED_INDEXES:
+            _indexes.popitem(last=False)
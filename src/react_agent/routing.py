@@ -0,0 +1,133 @@
+"""Per-step model routing.
+
+Each ReAct step is classified from cheap local signals before the model is
+called, and the class picks the model from a routing table:
+
+* ``simple`` - the step only has to phrase results of deterministic tools
+  (deadline check, calculator, report formatting) that are short and error
+  free. A small fast model is enough.
+* ``tool_results`` - other tool results that fit in a small budget have to be
+  summarized; further tool calls are possible but unlikely.
+* ``reasoning`` - a new user question (tool calls are likely), large or
+  failed tool results, or a long conversation.
+
+The table is a JSON object in `Context.routing_table`, e.g.
+``{"simple": "openai/gpt-4o-mini", "reasoning": "openai/gpt-4o"}``. Classes
+missing from the table, and every step when the table is empty, use
+`Context.model`.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Dict, Sequence
+
+from langchain_core.messages import AnyMessage, ToolMessage
+
+from react_agent import metrics
+from react_agent.budget import estimate_tokens
+from react_agent.utils import get_message_text
+
+logger = logging.getLogger(__name__)
+
+STEP_CLASSES = ("simple", "tool_results", "reasoning")
+SIMPLE_TOOLS = frozenset(
+    {"check_tender_deadline", "calculate", "get_current_time", "format_tender_report"}
+)
+ERROR_MARKERS = ("Ошибка", "Error", "не найден", "не удалось")
+# Conversations longer than this are always routed to the reasoning model.
+MAX_ROUTED_CONVERSATION_TOKENS = 20_000
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    """The class of a step, the chosen model and the signals behind it."""
+
+    step_class: str
+    model: str
+    tool_names: tuple[str, ...]
+    tool_result_tokens: int
+    conversation_tokens: int
+
+
+@lru_cache(maxsize=32)
+def parse_routing_table(table: str) -> Dict[str, str]:
+    """Parse and validate the JSON routing table from the context."""
+    if not table.strip():
+        return {}
+    routes = json.loads(table)
+    if not isinstance(routes, dict) or not all(
+        key in STEP_CLASSES and isinstance(value, str) and "/" in value
+        for key, value in routes.items()
+    ):
+        raise ValueError(
+            f"routing_table must map {', '.join(STEP_CLASSES)} to 'provider/model' names, got {table!r}"
+        )
+    return routes
+
+
+def classify_step(
+    messages: Sequence[AnyMessage], simple_max_tokens: int
+) -> RouteDecision:
+    """Classify the next model step; the model field is left empty."""
+    pending = []
+    for message in reversed(messages):
+        if not isinstance(message, ToolMessage):
+            break
+        pending.append(message)
+    texts = [get_message_text(m) for m in pending]
+    result_tokens = sum(estimate_tokens(t) for t in texts)
+    conversation_tokens = result_tokens + sum(
+        estimate_tokens(get_message_text(m))
+        for m in messages[: len(messages) - len(pending)]
+    )
+    names = tuple(sorted({m.name or "" for m in pending}))
+
+    failed = any(m.status == "error" for m in pending) or any(
+        marker in text[:200] for text in texts for marker in ERROR_MARKERS
+    )
+    if (
+        not pending
+        or failed
+        or result_tokens > simple_max_tokens * 4
+        or conversation_tokens > MAX_ROUTED_CONVERSATION_TOKENS
+    ):
+        step_class = "reasoning"
+    elif result_tokens <= simple_max_tokens and SIMPLE_TOOLS.issuperset(names):
+        step_class = "simple"
+    else:
+        step_class = "tool_results"
+    return RouteDecision(step_class, "", names, result_tokens, conversation_tokens)
+
+
+def route_step(
+    messages: Sequence[AnyMessage],
+    default_model: str,
+    table: str,
+    simple_max_tokens: int,
+) -> RouteDecision:
+    """Pick the model for the next step from the routing table."""
+    routes = parse_routing_table(table)
+    if not routes:
+        return RouteDecision("default", default_model, (), 0, 0)
+    decision = classify_step(messages, simple_max_tokens)
+    return replace(decision, model=routes.get(decision.step_class, default_model))
+
+
+def log_decision(decision: RouteDecision, latency: float) -> None:
+    """Log a routing decision together with the latency of the model call."""
+    labels = {"step": decision.step_class, "model": decision.model}
+    metrics.increment("routing.decisions", labels=labels)
+    metrics.observe("routing.latency_ms", latency * 1000, labels=labels)
+    logger.info(
+        "Routed %s step to %s in %.0f ms (tools=%s, result_tokens=%d, conversation_tokens=%d)",
+        decision.step_class,
+        decision.model,
+        latency * 1000,
+        ",".join(decision.tool_names) or "-",
+        decision.tool_result_tokens,
+        decision.conversation_tokens,
+    )
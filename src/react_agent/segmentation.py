@@ -0,0 +1,139 @@
+"""Linear-time sentence and clause segmentation of tender texts.
+
+The text is split in a single left-to-right pass. Boundaries are sentence
+punctuation followed by something that can start a sentence, semicolons,
+blank lines, page breaks and line breaks before list items. Every quantifier
+in the boundary pattern is possessive, and a run of sentence punctuation is
+only tried from its first character, so each character is examined a bounded
+number of times however long the run is. Clauses longer than
+`max_clause_chars` (typical for table-heavy PDF extracts without punctuation)
+are cut at the last space before the limit.
+
+Clauses are tagged with the keyword automaton from `react_agent.keywords`,
+which also runs once over the whole text. Segmentation and tagging are
+therefore O(n) in the length of the text.
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from react_agent.keywords import KeywordMatcher
+
+CLAUSE_TAGS: Dict[str, List[str]] = {
+    "требование": [
+        "требование",
+        "требуется",
+        "должен",
+        "должны",
+        "обязан",
+        "необходимо",
+        "обязательно",
+    ],
+    "условие": [
+        "условие",
+        "в случае",
+        "при наличии",
+        "если",
+        "порядок оплаты",
+        "срок поставки",
+    ],
+    "критерий": [
+        "критерий",
+        "оценка заявок",
+        "порядок оценки",
+        "баллы",
+        "значимость",
+    ],
+}
+
+BOUNDARY = re.compile(
+    # Only at the start of a punctuation run, so a run is scanned once, and
+    # not after a single letter or a 1-2 digit number ("г. Москва", "1. Общие").
+    r"(?<![.!?…])(?<!\b\w)(?<!\b\d\d)[.!?…]++(?=[ \t]*+(?:[\r\n]|$)|[ \t]++[А-ЯЁA-Z«\"(•*\-–—])"
+    r"|;"
+    r"|\f"
+    r"|\n[ \t\r\v]*+\n"
+    r"|\n(?=[ \t]*+(?:\d{1,3}(?:\.\d{1,3})*+[.)]|[•*\-–—]))"
+)
+MAX_CLAUSE_CHARS = 1000
+
+_MATCHER = KeywordMatcher(CLAUSE_TAGS)
+
+
+@dataclass(frozen=True)
+class Clause:
+    """A sentence or clause of a document with its offsets and tags."""
+
+    text: str
+    start: int
+    end: int
+    tags: Tuple[str, ...] = ()
+
+
+def _spans(text: str, max_clause_chars: int) -> List[Tuple[int, int]]:
+    spans = []
+    start = 0
+    for match in BOUNDARY.finditer(text):
+        spans.append((start, match.end()))
+        start = match.end()
+    spans.append((start, len(text)))
+
+    result = []
+    for start, end in spans:
+        while end - start > max_clause_chars:
+            cut = text.rfind(
+                " ", start + max_clause_chars // 2, start + max_clause_chars
+            )
+            cut = cut + 1 if cut > 0 else start + max_clause_chars
+            result.append((start, cut))
+            start = cut
+        result.append((start, end))
+    return result
+
+
+def segment(text: str, max_clause_chars: int = MAX_CLAUSE_CHARS) -> List[Clause]:
+    """Split `text` into clauses and tag requirement, condition and criteria ones.
+
+    Args:
+        text: Document text.
+        max_clause_chars: Longest clause returned; longer runs are cut.
+
+    Returns:
+        list[Clause]: Non-empty clauses in document order.
+    """
+    clauses: List[Clause] = []
+    starts: List[int] = []
+    for start, end in _spans(text, max_clause_chars):
+        body = text[start:end]
+        stripped = body.strip()
+        if stripped:
+            offset = start + len(body) - len(body.lstrip())
+            clauses.append(Clause(stripped, offset, offset + len(stripped)))
+            starts.append(offset)
+
+    tags: Dict[int, List[str]] = {}
+    for hit in _MATCHER.find_all(text):
+        i = bisect_right(starts, hit.start) - 1
+        if i >= 0 and hit.start < clauses[i].end:
+            found = tags.setdefault(i, [])
+            if hit.category not in found:
+                found.append(hit.category)
+    for i, found in tags.items():
+        clause = clauses[i]
+        clauses[i] = Clause(clause.text, clause.start, clause.end, tuple(found))
+    return clauses
+
+
+def tagged_clauses(text: str, per_tag: int = 2) -> Dict[str, List[str]]:
+    """Return up to `per_tag` clause texts for each tag, in document order."""
+    result: Dict[str, List[str]] = {}
+    for clause in segment(text):
+        for tag in clause.tags:
+            found = result.setdefault(tag, [])
+            if len(found) < per_tag:
+                found.append(clause.text)
+    return result
@@ -0,0 +1,192 @@
+"""Extraction cache shared by the worker processes of one host.
+
+Every worker extracts uploaded documents on its own, and the in-process
+caches do not help when the same file reaches another worker. This cache
+keeps extracted text and analysis results as content-addressed files in a
+local directory that all workers point at:
+
+    <root>/<namespace>/<key[:2]>/<key>
+
+Writers build an entry in a temporary file next to it and move it in place
+with an atomic rename, so readers see either no entry or a complete one and
+never take a lock. Readers memory-map the file and decode straight from the
+mapping, without reading the payload into an intermediate buffer first. A read
+bumps the file's mtime, which the eviction uses as the LRU order: when the
+directory grows past its size limit, the least recently used entries are
+removed under an exclusive `fcntl` lock so that only one process scans at a
+time. An entry removed while a reader has it mapped stays readable until the
+reader is done.
+
+Metrics: `shared_cache.hits`, `shared_cache.misses` (labelled by namespace)
+and `shared_cache.evicted`.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional, Tuple
+
+from react_agent import metrics
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not POSIX
+    fcntl = None  # type: ignore[assignment]
+
+# Entries are touched on read at most this often, in seconds.
+TOUCH_INTERVAL = 1.0
+# Eviction brings the directory down to this share of its limit.
+EVICT_TO = 0.9
+_LOCK_FILE = ".lock"
+
+
+class SharedCache:
+    """Content-addressed files under `root`, bounded to `max_bytes` in total."""
+
+    def __init__(self, root: str, max_bytes: int):
+        """Use (and create if needed) the cache directory `root`."""
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        # Bytes written by this process since the last size check.
+        self._written = max_bytes
+
+    def _path(self, namespace: str, key: str) -> str:
+        return os.path.join(self.root, namespace, key[:2], key)
+
+    @contextmanager
+    def view(self, namespace: str, key: str) -> Iterator[Optional[memoryview]]:
+        """Map the entry read-only; yields None when it is missing."""
+        path = self._path(namespace, key)
+        try:
+            file = open(path, "rb")
+        except FileNotFoundError:
+            metrics.increment("shared_cache.misses", labels={"namespace": namespace})
+            yield None
+            return
+        metrics.increment("shared_cache.hits", labels={"namespace": namespace})
+        with file:
+            stat = os.fstat(file.fileno())
+            if time.time() - stat.st_mtime > TOUCH_INTERVAL:
+                try:
+                    os.utime(path)
+                except FileNotFoundError:
+                    pass
+            if stat.st_size == 0:
+                yield memoryview(b"")
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    yield view
+                finally:
+                    view.release()
+
+    def get_json(self, namespace: str, key: str) -> Any:
+        """Return the decoded JSON entry, or None when it is missing."""
+        with self.view(namespace, key) as view:
+            if view is None:
+                return None
+            return json.loads(str(view, "utf-8"))
+
+    def put(self, namespace: str, key: str, data: bytes) -> None:
+        """Store `data` under `key`, replacing the entry atomically."""
+        path = self._path(namespace, key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        with self._lock:
+            self._written += len(data)
+            # Scanning the directory is only worth it once enough was written.
+            due = self._written >= self.max_bytes * (1 - EVICT_TO)
+            if due:
+                self._written = 0
+        if due:
+            self.evict()
+
+    def put_json(self, namespace: str, key: str, value: Any) -> None:
+        """Store `value` as compact JSON."""
+        data = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode(
+            "utf-8"
+        )
+        self.put(namespace, key, data)
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                if name == _LOCK_FILE or name.startswith(".tmp-"):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        with self._lock, open(os.path.join(self.root, _LOCK_FILE), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def evict(self) -> int:
+        """Remove least recently used entries while over the limit; return how many."""
+        with self._exclusive():
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            if total <= self.max_bytes:
+                return 0
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes * EVICT_TO:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+        metrics.increment("shared_cache.evicted", removed)
+        return removed
+
+    def size(self) -> int:
+        """Return the total size of the stored entries in bytes."""
+        return sum(size for _, size, _ in self._entries())
+
+
+_caches: dict[str, SharedCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_shared_cache(root: str, max_bytes: int) -> SharedCache:
+    """Return the process-wide cache for `root`, opening it on first use."""
+    with _caches_lock:
+        cache = _caches.get(root)
+        if cache is None:
+            cache = _caches[root] = SharedCache(root, max_bytes)
+        cache.max_bytes = max_bytes
+        return cache
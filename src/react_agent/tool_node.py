@@ -0,0 +1,370 @@
+"""Tools node with per-call resource guards.
+
+Large uploads are the main source of memory pressure: the payload arrives as a
+base64 string in the tool arguments, is decoded into bytes and then expanded
+into text. `GuardedToolNode` runs every tool call through these guards:
+
+* The in-memory size of the arguments is checked against a per-tool ceiling
+  before the tool runs. Oversized calls get a clear error ToolMessage, or,
+  when a spill directory is configured, the decoded file is written to disk
+  and the model is pointed at the path-based tools instead.
+* Calls of idempotent tools are memoized per thread. The key is the tool, its
+  canonical arguments and the modification time and size of the files named
+  in them, so a repeated `analyze_document(path)` returns at once unless the
+  file changed. Tools catch their own exceptions and return an error text;
+  they flag it with `mark_tool_error`, the message gets the error status and
+  is not memoized, so a transient failure is retried on the next call.
+* Long tools stream throttled progress events (see `react_agent.progress`).
+* With memory tracking on, Python allocations are traced with `tracemalloc`
+  during the call and the peak is exported per tool. Concurrent calls share
+  one trace, so for overlapping calls the peak is an upper bound.
+
+Metrics, labelled by tool: `tool.payload_bytes`, `tool.memory_peak_bytes`,
+`tool.rejected`, `tool.spilled`, `tool_cache.hits` and `tool_cache.misses`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import tracemalloc
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Dict, Literal, Optional, Tuple
+
+from langchain_core.messages import ToolCall, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.prebuilt import ToolNode
+from langgraph.runtime import get_runtime
+
+from react_agent import metrics
+from react_agent.context import Context
+from react_agent.ingestion import IngestionError, decode_payload, normalize_input
+from react_agent.progress import tool_progress
+from react_agent.utils import get_thread_id
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Tools whose result depends only on their arguments and on the files they
+# read, mapped to the arguments that name files. Tools that fit their output
+# to the current token budget are left out.
+IDEMPOTENT_TOOLS: Dict[str, Tuple[str, ...]] = {
+    "calculate": (),
+    "check_tender_deadline": (),
+    "extract_tender_info": (),
+    "format_tender_report": (),
+    "aggregate_price_schedule": ("file_path",),
+    "analyze_document": ("file_path",),
+    "query_document": ("file_path",),
+}
+# Results that depend on today's date are keyed by it as well.
+DATE_DEPENDENT_TOOLS = frozenset({"check_tender_deadline"})
+MAX_MEMO_ENTRIES = 4096
+
+
+def _current_context() -> Context:
+    try:
+        context = get_runtime(Context).context
+    except (RuntimeError, KeyError):
+        return Context()
+    return context if isinstance(context, Context) else Context()
+
+
+def payload_size(value: Any) -> int:
+    """Return the in-memory size of tool arguments in bytes."""
+    if isinstance(value, (str, bytes, bytearray)):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sum(payload_size(k) + payload_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(payload_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+@lru_cache(maxsize=32)
+def parse_payload_limits(limits: str) -> Dict[str, int]:
+    """Parse and validate the JSON per-tool limits from the context."""
+    if not limits.strip():
+        return {}
+    parsed = json.loads(limits)
+    if not isinstance(parsed, dict) or not all(
+        isinstance(value, int) and not isinstance(value, bool)
+        for value in parsed.values()
+    ):
+        raise ValueError(
+            f"tool_payload_limits must map tool names to sizes in bytes, got {limits!r}"
+        )
+    return parsed
+
+
+def payload_limit(tool: str, context: Context) -> int:
+    """Return the argument size ceiling of `tool`; 0 means no limit."""
+    return parse_payload_limits(context.tool_payload_limits).get(
+        tool, context.tool_payload_limit_bytes
+    )
+
+
+def largest_payload_limit(context: Context) -> int:
+    """Return the largest argument size any tool accepts; 0 means no limit."""
+    limits = [
+        context.tool_payload_limit_bytes,
+        *parse_payload_limits(context.tool_payload_limits).values(),
+    ]
+    return 0 if 0 in limits else max(limits)
+
+
+class _MemoryTrace:
+    """One tracemalloc session shared by the tool calls in flight."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._active = 0
+        self._owned = False
+
+    def start(self) -> int:
+        """Start tracing if needed; returns the baseline of the call."""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._owned = True
+            if self._active == 0:
+                tracemalloc.reset_peak()
+            self._active += 1
+            return tracemalloc.get_traced_memory()[0]
+
+    def stop(self, baseline: int) -> int:
+        """Return the peak above `baseline`; stops tracing after the last call."""
+        with self._lock:
+            peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+            self._active -= 1
+            if self._active == 0 and self._owned:
+                tracemalloc.stop()
+                self._owned = False
+        return max(0, peak - baseline)
+
+
+_trace = _MemoryTrace()
+
+
+def _file_version(path: Any) -> Optional[list[Any]]:
+    try:
+        stat = os.stat(path) if isinstance(path, str) and path else None
+    except OSError:
+        stat = None
+    return [os.path.abspath(path), stat.st_mtime_ns, stat.st_size] if stat else None
+
+
+def memo_key(tool: str, args: Dict[str, Any], context: Context) -> Optional[str]:
+    """Return the memoization key of a call, or None if `tool` is not idempotent.
+
+    Besides the arguments, the key covers the versions of the files the call
+    reads and the settings that change the result: the output mode and the
+    keyword dictionary.
+    """
+    path_args = IDEMPOTENT_TOOLS.get(tool)
+    if path_args is None:
+        return None
+    parts: list[Any] = [
+        tool,
+        args,
+        context.output_mode,
+        context.keyword_dictionary_path,
+        _file_version(context.keyword_dictionary_path),
+    ]
+    parts.extend(_file_version(args.get(name)) for name in path_args)
+    if tool in DATE_DEPENDENT_TOOLS:
+        parts.append(datetime.date.today().isoformat())
+    canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ToolMemo:
+    """Per-thread LRU of idempotent tool results."""
+
+    def __init__(self, max_entries: int = MAX_MEMO_ENTRIES):
+        """Keep at most `max_entries` results across all threads."""
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Tuple[str, str], str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, thread_id: str, key: str) -> Optional[str]:
+        """Return the cached result and count the hit or miss."""
+        with self._lock:
+            content = self._entries.get((thread_id, key))
+            if content is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end((thread_id, key))
+            return content
+
+    def put(self, thread_id: str, key: str, content: str) -> None:
+        """Store a result, evicting the least recently used ones."""
+        with self._lock:
+            self._entries[(thread_id, key)] = content
+            self._entries.move_to_end((thread_id, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @property
+    def hit_ratio(self) -> float:
+        """Share of lookups answered from the cache."""
+        with self._lock:
+            total = self.hits + self.misses
+            return self.hits / total if total else 0.0
+
+
+_memo = ToolMemo()
+
+
+def get_tool_memo() -> ToolMemo:
+    """Return the process-wide memo of tool results."""
+    return _memo
+
+
+# Errors reported by the running tool call. The list is shared, not replaced,
+# so reports from copied contexts (worker threads, tasks) reach the node.
+_call_errors: ContextVar[Optional[list[str]]] = ContextVar(
+    "tool_call_errors", default=None
+)
+
+
+def mark_tool_error(message: str) -> None:
+    """Flag the result of the running tool call as an error."""
+    errors = _call_errors.get()
+    if errors is not None:
+        errors.append(message)
+
+
+def _spill(args: Dict[str, Any], spill_dir: str) -> tuple[str, int]:
+    """Decode the file payload in `args` and save it under `spill_dir`."""
+    upload = normalize_input(next(iter(args.values())) if len(args) == 1 else args)
+    data = decode_payload(upload)
+    os.makedirs(spill_dir, exist_ok=True)
+    name = os.path.basename(upload.filename) or "upload"
+    path = os.path.join(spill_dir, f"{uuid.uuid4().hex[:12]}_{name}")
+    with open(path, "wb") as file:
+        file.write(data)
+    return path, len(data)
+
+
+class GuardedToolNode(ToolNode):
+    """`ToolNode` that enforces payload ceilings and accounts tool memory.
+
+    Only the async path is guarded; all tools of the agent are coroutines.
+    """
+
+    async def _arun_one(
+        self,
+        call: ToolCall,
+        input_type: Literal["list", "dict", "tool_calls"],
+        config: RunnableConfig,
+    ) -> ToolMessage:
+        name = call["name"]
+        if name not in self.tools_by_name:
+            return await super()._arun_one(call, input_type, config)
+        context = _current_context()
+        labels = {"tool": name}
+
+        size = payload_size(call["args"])
+        metrics.observe("tool.payload_bytes", size, labels=labels)
+        limit = payload_limit(name, context)
+        if 0 < limit < size:
+            return await self._oversized(call, size, limit, context.tool_spill_dir)
+
+        key = (
+            memo_key(name, call["args"], context) if context.tool_memoization else None
+        )
+        thread_id = get_thread_id()
+        if key is not None:
+            cached = _memo.get(thread_id, key)
+            metrics.increment(
+                "tool_cache.hits" if cached is not None else "tool_cache.misses",
+                labels=labels,
+            )
+            if cached is not None:
+                logger.debug(
+                    "Tool cache hit for %s (hit ratio %.0f%%)",
+                    name,
+                    _memo.hit_ratio * 100,
+                )
+                return ToolMessage(content=cached, name=name, tool_call_id=call["id"])
+
+        errors: list[str] = []
+        token = _call_errors.set(errors)
+        try:
+            with tool_progress(name, context.progress_interval_ms / 1000):
+                message = await self._run_measured(call, input_type, config, context)
+        finally:
+            _call_errors.reset(token)
+        if errors:
+            message.status = "error"
+        if (
+            key is not None
+            and message.status != "error"
+            and isinstance(message.content, str)
+        ):
+            _memo.put(thread_id, key, message.content)
+        return message
+
+    async def _run_measured(
+        self,
+        call: ToolCall,
+        input_type: Literal["list", "dict", "tool_calls"],
+        config: RunnableConfig,
+        context: Context,
+    ) -> ToolMessage:
+        if not context.tool_memory_tracking:
+            return await super()._arun_one(call, input_type, config)
+        baseline = _trace.start()
+        try:
+            return await super()._arun_one(call, input_type, config)
+        finally:
+            metrics.observe(
+                "tool.memory_peak_bytes",
+                _trace.stop(baseline),
+                labels={"tool": call["name"]},
+            )
+
+    async def _oversized(
+        self, call: ToolCall, size: int, limit: int, spill_dir: str
+    ) -> ToolMessage:
+        name = call["name"]
+        labels = {"tool": name}
+        explanation = (
+            f"Данные для инструмента {name} слишком велики: "
+            f"{size / MB:.1f} МБ при лимите {limit / MB:.1f} МБ."
+        )
+        if spill_dir:
+            try:
+                path, written = await asyncio.to_thread(_spill, call["args"], spill_dir)
+            except (IngestionError, OSError):
+                pass
+            else:
+                metrics.increment("tool.spilled", labels=labels)
+                return ToolMessage(
+                    content=f"📦 {explanation} Файл ({written:,} байт) сохранен на диск: {path}\n"
+                    "Используйте analyze_document или query_document с этим путем.",
+                    name=name,
+                    tool_call_id=call["id"],
+                )
+        metrics.increment("tool.rejected", labels=labels)
+        return ToolMessage(
+            content=f"⛔ {explanation} Вызов отклонен, чтобы не исчерпать память. "
+            "Сохраните файл на диск и используйте analyze_document или query_document с путем к файлу.",
+            name=name,
+            tool_call_id=call["id"],
+            status="error",
+        )
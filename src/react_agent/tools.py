@@ -6,15 +6,91 @@ These tools are intended as free examples to get started. For production use,
 consider implementing more robust and specialized tools tailored to your needs.
 """
 
-from typing import Any, Callable, List, Optional, cast
+from dataclasses import replace
+from typing import Any, Callable, Dict, List, Optional, cast
+import asyncio
 import datetime
+import hashlib
 import json
+import os
 import re
 
+from langchain_core.tools import tool
 from langchain_tavily import TavilySearch  # type: ignore[import-not-found]
 from langgraph.runtime import get_runtime
 
+from react_agent.budget import estimate_tokens, fit_to_budget, result_budget
 from react_agent.context import Context
+from react_agent.deadlines import get_deadline_index, index_document
+from react_agent.dedup import DedupIndex, DuplicateMatch, get_dedup_index, minhash_signature
+from react_agent.ingestion import (
+    IngestedDocument,
+    IngestionError,
+    decode_payload,
+    ingest,
+    ingest_bytes,
+    ingest_file,
+    normalize_input,
+)
+from react_agent.keywords import get_keyword_matcher, summarize_hits
+from react_agent.money import find_amounts, summarize_amounts
+from react_agent.prefetch import reuse_prefetched
+from react_agent.progress import report_progress
+from react_agent.records import RecordWriter, TenderRecord
+from react_agent.retrieval import BM25Index, cache_index, chunk_document, get_cached_index
+from react_agent.segmentation import tagged_clauses
+from react_agent.shared_cache import SharedCache, get_shared_cache
+from react_agent.tool_node import mark_tool_error
+from react_agent.utils import get_thread_id
+
+
+def _context() -> Context:
+    """Вернуть контекст текущего запуска (или настройки по умолчанию вне графа)."""
+    try:
+        runtime = get_runtime(Context)
+    except (RuntimeError, KeyError):
+        return Context()
+    context = getattr(runtime, "context", None)
+    return context if isinstance(context, Context) else Context()
+
+
+def _compact_mode() -> bool:
+    """Нужно ли отвечать компактным JSON вместо текста для человека."""
+    return _context().output_mode == "compact"
+
+
+def _as_json(data: Any) -> str:
+    """Компактный JSON без отступов и оформления."""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _reply(verbose: str, **data: Any) -> str:
+    """Вернуть текст для человека или, в режиме output_mode="compact", только данные в JSON."""
+    return _as_json(data) if _compact_mode() else verbose
+
+
+def _fail(message: str) -> str:
+    """Сообщение об ошибке: как есть или {"ошибка": ...} в компактном режиме.
+    
+    Результат помечается как ошибка, поэтому он не запоминается в кэше вызовов.
+    """
+    mark_tool_error(message)
+    return _reply(message, ошибка=message)
+
+
+async def _fit_result(text: str) -> str:
+    """Сократить результат инструмента до бюджета токенов текущего шага.
+    
+    Возвращает тот же объект строки, если сокращать не пришлось.
+    """
+    context = _context()
+    budget = result_budget(
+        get_thread_id(), context.model, context.context_window_tokens, context.tool_result_share
+    )
+    if estimate_tokens(text) <= budget:
+        return text
+    matcher = get_keyword_matcher(context.keyword_dictionary_path)
+    return await asyncio.to_thread(fit_to_budget, text, budget, matcher)
 
 
 async def search(query: str) -> Optional[dict[str, Any]]:
@@ -26,13 +102,24 @@ async def search(query: str) -> Optional[dict[str, Any]]:
     """
     runtime = get_runtime(Context)
     wrapped = TavilySearch(max_results=runtime.context.max_search_results)
-    return cast(dict[str, Any], await wrapped.ainvoke({"query": query}))
+    response = cast(dict[str, Any], await wrapped.ainvoke({"query": query}))
+    if _compact_mode() and isinstance(response.get("results"), list):
+        return {
+            "results": [
+                {key: r.get(key) for key in ("title", "url", "content")}
+                for r in response["results"]
+            ]
+        }
+    return response
 
 
 async def get_current_time() -> str:
     """Получить текущее время и дату в Москве."""
     now = datetime.datetime.now()
-    return f"Текущее время: {now.strftime('%Y-%m-%d %H:%M:%S')} (московское время)"
+    return _reply(
+        f"Текущее время: {now.strftime('%Y-%m-%d %H:%M:%S')} (московское время)",
+        время=now.isoformat(timespec="seconds"),
+    )
 
 
 async def calculate(expression: str) -> str:
@@ -55,12 +142,107 @@ async def calculate(expression: str) -> str:
         # Проверка на опасные операции
         forbidden = ["import", "exec", "eval", "__", "open", "file"]
         if any(word in expression.lower() for word in forbidden):
-            return "Ошибка: Недопустимые операции в выражении"
+            return _fail("Ошибка: Недопустимые операции в выражении")
         
         result = eval(expression, {"__builtins__": {}}, safe_dict)
-        return f"Результат: {result}"
+        return _reply(f"Результат: {result}", результат=result)
     except Exception as e:
-        return f"Ошибка вычисления: {str(e)}"
+        return _fail(f"Ошибка вычисления: {str(e)}")
+
+
+def tender_findings(text: str) -> Dict[str, Any]:
+    """Собрать структурированные сведения о тендере: суммы, даты, ключевые слова, требования.
+    
+    Возвращает словарь вида {"найденная_информация": {...}}; пустой вложенный
+    словарь означает, что ничего не найдено.
+    """
+    info: Dict[str, Any] = {"найденная_информация": {}}
+    
+    # Поиск денежных сумм: один проход по тексту, значения приведены к Decimal
+    amounts = find_amounts(text)
+    
+    if amounts:
+        largest = sorted(amounts, key=lambda a: a.value, reverse=True)
+        info["найденная_информация"]["суммы"] = [a.as_dict() for a in largest[:10]]
+        info["найденная_информация"]["суммы_итого"] = {
+            "всего_найдено": len(amounts),
+            **summarize_amounts(amounts),
+        }
+    
+    # Поиск дат
+    date_patterns = [
+        r'\d{1,2}[\.\/\-]\d{1,2}[\.\/\-]\d{2,4}',
+        r'\d{2,4}[\.\/\-]\d{1,2}[\.\/\-]\d{1,2}'
+    ]
+    
+    dates = []
+    for pattern in date_patterns:
+        matches = re.findall(pattern, text)
+        dates.extend(matches)
+    
+    if dates:
+        info["найденная_информация"]["даты"] = dates[:3]
+    
+    # Ключевые слова тендеров: один проход автоматом по всему словарю
+    matcher = get_keyword_matcher(_context().keyword_dictionary_path)
+    hits = matcher.find_all(text)
+    report_progress("analyze", amounts=len(amounts), keyword_matches=len(hits))
+    
+    if hits:
+        counts: dict[str, int] = {}
+        for hit in hits:
+            counts[hit.term] = counts.get(hit.term, 0) + 1
+        info["найденная_информация"]["ключевые_слова"] = sorted(counts, key=counts.get, reverse=True)
+        info["найденная_информация"]["ключевые_слова_по_категориям"] = summarize_hits(hits)
+    
+    # Требования, условия и критерии: один линейный проход сегментатора
+    requirements = []
+    for clauses in tagged_clauses(text).values():
+        requirements.extend(c for c in clauses if c not in requirements)
+    
+    if requirements:
+        info["найденная_информация"]["требования"] = requirements
+    
+    return info
+
+
+def compact_findings(info: Dict[str, Any]) -> Dict[str, Any]:
+    """Оставить в сведениях tender_findings только значения, без позиций и повторов.
+    
+    Суммы сводятся к значению и валюте, ключевые слова по категориям — к числу
+    вхождений, одинаковые суммы и даты выводятся один раз.
+    """
+    found = info["найденная_информация"]
+    compact: Dict[str, Any] = {}
+    if "суммы" in found:
+        amounts = [
+            {k: a[k] for k in ("значение", "валюта", "нмцк") if k in a} for a in found["суммы"]
+        ]
+        compact["суммы"] = [a for i, a in enumerate(amounts) if a not in amounts[:i]]
+        totals = found["суммы_итого"]
+        compact["суммы_итого"] = {
+            currency: {"количество": t["количество"], "итого": t["итого"]}
+            for currency, t in totals["по_валютам"].items()
+        }
+        if "нмцк" in totals:
+            compact["нмцк"] = totals["нмцк"]["значение"]
+    if "даты" in found:
+        compact["даты"] = list(dict.fromkeys(found["даты"]))
+    if "ключевые_слова_по_категориям" in found:
+        compact["ключевые_слова"] = {
+            category: {term: hit["количество"] for term, hit in terms.items()}
+            for category, terms in found["ключевые_слова_по_категориям"].items()
+        }
+    if "требования" in found:
+        compact["требования"] = found["требования"]
+    return compact
+
+
+def _findings_text(info: Dict[str, Any]) -> str:
+    """Сведения tender_findings в виде текста для человека."""
+    if not info["найденная_информация"]:
+        return "В тексте не обнаружена информация о тендере"
+    return json.dumps(info, ensure_ascii=False, indent=2)
 
 
 async def extract_tender_info(text: str) -> str:
@@ -69,75 +251,15 @@ async def extract_tender_info(text: str) -> str:
     Ищет в тексте информацию о ценах, сроках, заказчике и других важных параметрах.
     """
     try:
-        info = {"найденная_информация": {}}
-        
-        # Поиск денежных сумм
-        money_patterns = [
-            r'(\d+(?:\s\d{3})*(?:[,\.]\d+)?)\s*(?:руб|₽|рубл)',
-            r'(\d+(?:\s\d{3})*(?:[,\.]\d+)?)\s*(?:тыс|млн|млрд)',
-            r'(\d+(?:\s\d{3})*(?:[,\.]\d+)?)\s*(?:евро|€)',
-            r'(\d+(?:\s\d{3})*(?:[,\.]\d+)?)\s*(?:долл|\$)'
-        ]
-        
-        amounts = []
-        for pattern in money_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            amounts.extend(matches)
-        
-        if amounts:
-            info["найденная_информация"]["суммы"] = amounts[:5]
-        
-        # Поиск дат
-        date_patterns = [
-            r'\d{1,2}[\.\/\-]\d{1,2}[\.\/\-]\d{2,4}',
-            r'\d{2,4}[\.\/\-]\d{1,2}[\.\/\-]\d{1,2}'
-        ]
-        
-        dates = []
-        for pattern in date_patterns:
-            matches = re.findall(pattern, text)
-            dates.extend(matches)
-        
-        if dates:
-            info["найденная_информация"]["даты"] = dates[:3]
-        
-        # Ключевые слова тендеров
-        tender_keywords = [
-            'заказчик', 'поставщик', 'подрядчик', 'исполнитель',
-            'контракт', 'договор', 'тендер', 'конкурс', 'аукцион',
-            'закупка', 'поставка', 'энергетик', 'электро'
-        ]
-        
-        found_keywords = []
-        for keyword in tender_keywords:
-            if keyword in text.lower():
-                found_keywords.append(keyword)
-        
-        if found_keywords:
-            info["найденная_информация"]["ключевые_слова"] = found_keywords
-        
-        # Поиск требований и условий
-        requirements = []
-        req_patterns = [
-            r'требовани[ея].*?(?:[\.!?]|$)',
-            r'услови[ея].*?(?:[\.!?]|$)',
-            r'критери[ий].*?(?:[\.!?]|$)'
-        ]
-        
-        for pattern in req_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE | re.DOTALL)
-            requirements.extend(matches[:2])
+        info = tender_findings(text)
         
-        if requirements:
-            info["найденная_информация"]["требования"] = requirements
+        if _compact_mode():
+            return _as_json(compact_findings(info))
         
-        if not info["найденная_информация"]:
-            return "В тексте не обнаружена информация о тендере"
-        
-        return json.dumps(info, ensure_ascii=False, indent=2)
+        return _findings_text(info)
         
     except Exception as e:
-        return f"Ошибка при анализе текста: {str(e)}"
+        return _fail(f"Ошибка при анализе текста: {str(e)}")
 
 
 async def format_tender_report(title: str, budget: str, deadline: str, description: str) -> str:
@@ -148,6 +270,11 @@ async def format_tender_report(title: str, budget: str, deadline: str, descripti
     try:
         current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
         
+        if _compact_mode():
+            return _as_json(
+                {"название": title, "бюджет": budget, "срок_подачи": deadline, "описание": description, "сформирован": current_time}
+            )
+        
         report = f"""
 ╔══════════════════════════════════════════════════════════════╗
 ║                        ОТЧЕТ ПО ТЕНДЕРУ                      ║
@@ -176,7 +303,7 @@ async def format_tender_report(title: str, budget: str, deadline: str, descripti
         return report
         
     except Exception as e:
-        return f"Ошибка при создании отчета: {str(e)}"
+        return _fail(f"Ошибка при создании отчета: {str(e)}")
 
 
 async def check_tender_deadline(deadline_str: str) -> str:
@@ -199,11 +326,14 @@ async def check_tender_deadline(deadline_str: str) -> str:
                 continue
         
         if not deadline_date:
-            return f"Не удалось распознать формат даты: {deadline_str}. Используйте DD.MM.YYYY или YYYY-MM-DD"
+            return _fail(f"Не удалось распознать формат даты: {deadline_str}. Используйте DD.MM.YYYY или YYYY-MM-DD")
         
         today = datetime.now()
         days_left = (deadline_date - today).days
         
+        if _compact_mode():
+            return _as_json({"срок": deadline_date.date().isoformat(), "дней_осталось": days_left})
+        
         if days_left < 0:
             return f"⚠️ ВНИМАНИЕ: Дедлайн прошел {abs(days_left)} дней назад ({deadline_str})"
         elif days_left == 0:
@@ -218,7 +348,64 @@ async def check_tender_deadline(deadline_str: str) -> str:
             return f"📆 До дедлайна осталось {days_left} дней ({deadline_str})"
             
     except Exception as e:
-        return f"Ошибка при проверке дедлайна: {str(e)}"
+        return _fail(f"Ошибка при проверке дедлайна: {str(e)}")
+
+
+async def find_upcoming_deadlines(date_from: str = "", date_to: str = "", limit: int = 10) -> str:
+    """Найти сроки по всем ранее проанализированным тендерам.
+    
+    Без дат возвращает limit ближайших сроков начиная с сегодняшнего дня.
+    С date_from и/или date_to (DD.MM.YYYY или YYYY-MM-DD) возвращает сроки в этом диапазоне,
+    например, чтобы ответить «какие тендеры закрываются в ближайшие 10 дней».
+    """
+    try:
+        from datetime import date, datetime
+        
+        context = _context()
+        if not context.deadline_db_path:
+            return _fail("Индекс сроков не настроен: укажите deadline_db_path в настройках агента")
+        
+        def parse(value: str) -> Optional[date]:
+            for fmt in ('%d.%m.%Y', '%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y'):
+                try:
+                    return datetime.strptime(value.strip(), fmt).date()
+                except ValueError:
+                    continue
+            raise ValueError(f"Не удалось распознать формат даты: {value}. Используйте DD.MM.YYYY или YYYY-MM-DD")
+        
+        today = date.today()
+        first = parse(date_from) if date_from.strip() else today
+        last = parse(date_to) if date_to.strip() else None
+        index = get_deadline_index(context.deadline_db_path)
+        found = await asyncio.to_thread(index.between, first, last, max(1, limit))
+        
+        if _compact_mode():
+            return _as_json(
+                {
+                    "сроки": [
+                        {"дата": d.due.isoformat(), "дней_осталось": (d.due - today).days, "тендер": d.tender_id, "вид": d.kind, "источник": d.source, "начало": d.start, "конец": d.end}
+                        for d in found
+                    ]
+                }
+            )
+        
+        if not found:
+            return "Сроков в указанном диапазоне не найдено"
+        
+        lines = []
+        for d in found:
+            days_left = (d.due - today).days
+            when = f"через {days_left} дн." if days_left > 0 else "сегодня" if days_left == 0 else f"{-days_left} дн. назад"
+            lines.append(
+                f"📅 {d.due:%d.%m.%Y} ({when}) — тендер {d.tender_id}, {d.kind}\n"
+                f"   {d.source}, символы {d.start}-{d.end}: «{d.context}»"
+            )
+        return f"Найдено сроков: {len(found)}\n\n" + "\n".join(lines)
+        
+    except ValueError as e:
+        return _fail(str(e))
+    except Exception as e:
+        return _fail(f"Ошибка при поиске сроков: {str(e)}")
 
 
 async def read_file_content(file_path: str) -> str:
@@ -232,7 +419,7 @@ async def read_file_content(file_path: str) -> str:
         
         # Проверяем существование файла
         if not os.path.exists(file_path):
-            return f"Файл не найден: {file_path}"
+            return _fail(f"Файл не найден: {file_path}")
         
         # Получаем расширение файла
         file_extension = Path(file_path).suffix.lower()
@@ -241,20 +428,112 @@ async def read_file_content(file_path: str) -> str:
         safe_extensions = {'.txt', '.md', '.json', '.csv', '.py', '.js', '.html', '.xml', '.yml', '.yaml', '.log', '.cfg', '.ini'}
         
         if file_extension not in safe_extensions:
-            return f"Неподдерживаемый тип файла: {file_extension}. Поддерживаются: {', '.join(safe_extensions)}"
+            return _fail(f"Неподдерживаемый тип файла: {file_extension}. Поддерживаются: {', '.join(safe_extensions)}")
         
         # Читаем файл
         with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
             content = file.read()
         
-        # Ограничиваем размер вывода
-        if len(content) > 10000:
-            content = content[:10000] + "\n... [файл обрезан, показаны первые 10000 символов]"
+        # Ограничиваем размер вывода бюджетом токенов текущего шага
+        shortened = await _fit_result(content)
+        if _compact_mode():
+            return _as_json({"файл": file_path, "сокращено": shortened is not content, "содержимое": shortened})
+        if shortened is not content:
+            content = shortened + "\n... [файл сокращен до бюджета контекста модели]"
+            if file_extension == '.csv':
+                content += "\nДля итогов по всему файлу используйте aggregate_price_schedule"
         
         return f"Содержимое файла {file_path}:\n\n{content}"
         
     except Exception as e:
-        return f"Ошибка при чтении файла: {str(e)}"
+        return _fail(f"Ошибка при чтении файла: {str(e)}")
+
+
+async def aggregate_price_schedule(file_path: str, value_columns: str = "", group_by: str = "", delimiter: str = "") -> str:
+    """Посчитать итоги по CSV-файлу со сметой, прайсом или ведомостью объемов работ.
+    
+    Читает файл любого размера потоково и возвращает только агрегаты: сумму, минимум,
+    максимум и среднее по числовым колонкам, а также итоги по группам.
+    Понимает русский формат чисел ("1 234 567,89").
+    value_columns: названия колонок через запятую (по умолчанию все числовые).
+    group_by: название колонки для группировки (например, "Раздел" или "Лот").
+    """
+    try:
+        import os
+        from react_agent.price_schedule import aggregate_csv
+        
+        if not os.path.exists(file_path):
+            return _fail(f"Файл не найден: {file_path}")
+        
+        columns = [c for c in value_columns.split(",") if c.strip()] or None
+        result = await asyncio.to_thread(
+            aggregate_csv, file_path, columns, group_by or None, delimiter or None
+        )
+        
+        if not result["итоги"]:
+            return _fail(f"В файле {file_path} не найдены числовые колонки")
+        
+        if _compact_mode():
+            return _as_json(result)
+        
+        return json.dumps(result, ensure_ascii=False, indent=2)
+        
+    except ValueError as e:
+        return _fail(str(e))
+    except Exception as e:
+        return _fail(f"Ошибка при агрегации файла: {str(e)}")
+
+
+# Пространства имен общего кэша; версия меняется вместе с форматом записей
+SHARED_DOCUMENTS = "documents-v1"
+SHARED_FINDINGS = "findings-v1"
+
+
+def _shared_cache() -> Optional[SharedCache]:
+    """Общий для процессов кэш извлечения, если он включен в контексте."""
+    context = _context()
+    if not context.shared_cache_dir:
+        return None
+    return get_shared_cache(context.shared_cache_dir, context.shared_cache_max_mb * 1024 * 1024)
+
+
+def _ingest_shared(data: bytes, filename: str = "unknown", mime_type: str = "") -> IngestedDocument:
+    """ingest_bytes с текстом из общего кэша: документ извлекается один раз на хост."""
+    cache = _shared_cache()
+    if cache is None:
+        return ingest_bytes(data, filename, mime_type)
+    sha256 = hashlib.sha256(data).hexdigest()
+    entry = cache.get_json(SHARED_DOCUMENTS, sha256)
+    if entry is not None:
+        return IngestedDocument(
+            filename, mime_type, entry["kind"], len(data), sha256, entry["text"], entry["metadata"]
+        )
+    doc = ingest_bytes(data, filename, mime_type)
+    cache.put_json(SHARED_DOCUMENTS, sha256, {"kind": doc.kind, "text": doc.text, "metadata": doc.metadata})
+    return doc
+
+
+def _ingest_file(file_path: str) -> IngestedDocument:
+    """Прочитать локальный файл и извлечь текст через общий кэш."""
+    with open(file_path, "rb") as file:
+        data = file.read()
+    return _ingest_shared(data, filename=file_path)
+
+
+def _document_findings(doc: IngestedDocument) -> Dict[str, Any]:
+    """tender_findings по тексту документа, из общего кэша, если он включен."""
+    cache = _shared_cache()
+    if cache is None:
+        return tender_findings(doc.text)
+    # Находки зависят еще и от словаря ключевых слов
+    dictionary = _context().keyword_dictionary_path
+    version = os.stat(dictionary).st_mtime_ns if dictionary else 0
+    key = hashlib.sha256(f"{doc.sha256}\0{dictionary}\0{version}".encode()).hexdigest()
+    findings = cache.get_json(SHARED_FINDINGS, key)
+    if findings is None:
+        findings = tender_findings(doc.text)
+        cache.put_json(SHARED_FINDINGS, key, findings)
+    return findings
 
 
 async def analyze_document(file_path: str) -> str:
@@ -264,74 +543,121 @@ async def analyze_document(file_path: str) -> str:
     """
     try:
         import os
-        from pathlib import Path
         
         if not os.path.exists(file_path):
-            return f"Файл не найден: {file_path}"
+            return _fail(f"Файл не найден: {file_path}")
         
-        file_extension = Path(file_path).suffix.lower()
-        content = ""
+        try:
+            doc = await asyncio.to_thread(_ingest_file, file_path)
+        except IngestionError as e:
+            return _fail(str(e))
         
-        # Обработка разных типов файлов
-        if file_extension == '.txt':
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-                content = file.read()
-                
-        elif file_extension == '.pdf':
-            try:
-                import PyPDF2
-                with open(file_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    for page in pdf_reader.pages:
-                        content += page.extract_text() + "\n"
-            except ImportError:
-                return "Для работы с PDF нужно установить PyPDF2: pip install PyPDF2"
-            except Exception as e:
-                return f"Ошибка при чтении PDF: {str(e)}"
-                
-        elif file_extension in ['.docx', '.doc']:
-            try:
-                import docx
-                doc = docx.Document(file_path)
-                for paragraph in doc.paragraphs:
-                    content += paragraph.text + "\n"
-            except ImportError:
-                return "Для работы с DOCX нужно установить python-docx: pip install python-docx"
-            except Exception as e:
-                return f"Ошибка при чтении DOCX: {str(e)}"
-        else:
-            return f"Неподдерживаемый формат: {file_extension}. Поддерживаются: .txt, .pdf, .docx"
+        return await _analyze_ingested(doc)
         
-        if not content.strip():
-            return "Документ пуст или не удалось извлечь текст"
+    except Exception as e:
+        return _fail(f"Ошибка при анализе документа: {str(e)}")
+
+
+async def query_document(file_path: str, question: str, top_k: int = 5) -> str:
+    """Найти в документе фрагменты, относящиеся к вопросу.
+    
+    Вместо чтения всего документа возвращает только top_k наиболее релевантных
+    фрагментов (BM25) с номером страницы и раздела. Индекс строится один раз
+    на документ и переиспользуется в рамках треда.
+    """
+    try:
+        import os
         
-        # Анализируем содержимое с помощью существующей функции
-        analysis = await extract_tender_info(content)
+        if not os.path.exists(file_path):
+            return _fail(f"Файл не найден: {file_path}")
         
-        # Дополнительный анализ
-        word_count = len(content.split())
-        char_count = len(content)
+        stat = os.stat(file_path)
+        key = (get_thread_id(), os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+        index = get_cached_index(key)
+        if index is None:
+            try:
+                doc = await asyncio.to_thread(ingest_file, file_path)
+            except IngestionError as e:
+                return _fail(str(e))
+            index = await asyncio.to_thread(lambda: BM25Index(chunk_document(doc.text)))
+            cache_index(key, index)
+        
+        results = index.search(question, max(1, top_k))
+        if _compact_mode():
+            return _as_json(
+                {
+                    "всего_фрагментов": len(index.chunks),
+                    "фрагменты": [
+                        {"стр": c.page, "раздел": c.section, "начало": c.start, "конец": c.end, "оценка": round(score, 2), "текст": c.text}
+                        for c, score in results
+                    ],
+                }
+            )
+        if not results:
+            return f"В документе {file_path} не найдено фрагментов по запросу: {question}"
+        
+        parts = []
+        for chunk, score in results:
+            section = f", раздел «{chunk.section}»" if chunk.section else ""
+            parts.append(f"[стр. {chunk.page}{section}, символы {chunk.start}-{chunk.end}, оценка {score:.2f}]\n{chunk.text}")
+        return f"Найдено фрагментов: {len(results)} из {len(index.chunks)}\n\n" + "\n\n".join(parts)
         
-        result = f"""
-📄 АНАЛИЗ ДОКУМЕНТА: {Path(file_path).name}
-
-📊 Статистика:
-• Символов: {char_count:,}
-• Слов: {word_count:,}
-• Тип: {file_extension.upper()}
+    except Exception as e:
+        return _fail(f"Ошибка при поиске по документу: {str(e)}")
 
-{analysis}
 
-💡 Рекомендации:
-• Сохраните важную информацию в отдельный файл
-• Проверьте все найденные даты и суммы
-• Убедитесь в соответствии требованиям
-        """.strip()
+def _export_records(files: List[str], output_path: str, deadline_db_path: str = "") -> tuple[int, List[str]]:
+    """Извлечь записи по файлам и дописать их в колоночный файл, группами строк.
+    
+    С deadline_db_path сроки документов попадают и в индекс сроков.
+    """
+    errors = []
+    with RecordWriter(output_path) as writer:
+        for done, path in enumerate(files, 1):
+            try:
+                doc = _ingest_file(path)
+                writer.append(TenderRecord.from_findings(doc, _document_findings(doc)))
+                if deadline_db_path:
+                    index_document(deadline_db_path, doc.sha256, doc.filename, doc.text)
+            except (OSError, IngestionError) as e:
+                errors.append(f"{path}: {e}")
+            report_progress("export", documents=done, total_documents=len(files))
+    return writer.written, errors
+
+
+async def export_tender_records(input_path: str, output_path: str = "") -> str:
+    """Выгрузить структурированные записи по документам в колоночный файл для аналитики.
+    
+    Обрабатывает файл или все файлы папки (рекурсивно) и дописывает по одной
+    записи на документ: суммы, НМЦК, сроки, ключевые слова, требования, путь и хеш.
+    Без output_path используется файл из настройки records_path.
+    """
+    try:
+        context = _context()
+        output_path = output_path or context.records_path
+        if not output_path:
+            return _fail("Не указан файл выгрузки: передайте output_path или задайте records_path")
+        if os.path.isdir(input_path):
+            files = [
+                os.path.join(root, name)
+                for root, dirs, names in os.walk(input_path)
+                for name in sorted(names)
+                if not name.startswith(".")
+            ]
+        elif os.path.exists(input_path):
+            files = [input_path]
+        else:
+            return _fail(f"Путь не найден: {input_path}")
         
-        return result
+        written, errors = await asyncio.to_thread(_export_records, files, output_path, context.deadline_db_path)
         
+        verbose = f"📦 Выгружено записей: {written} из {len(files)} в {output_path}"
+        if errors:
+            verbose += "\n\n⚠️ Не удалось обработать:\n" + "\n".join(f"• {e}" for e in errors[:20])
+        return _reply(verbose, файл=output_path, записей=written, ошибки=errors)
+    
     except Exception as e:
-        return f"Ошибка при анализе документа: {str(e)}"
+        return _fail(f"Ошибка при выгрузке записей: {str(e)}")
 
 
 async def list_files_in_directory(directory_path: str) -> str:
@@ -344,10 +670,20 @@ async def list_files_in_directory(directory_path: str) -> str:
         from pathlib import Path
         
         if not os.path.exists(directory_path):
-            return f"Папка не найдена: {directory_path}"
+            return _fail(f"Папка не найдена: {directory_path}")
         
         if not os.path.isdir(directory_path):
-            return f"Указанный путь не является папкой: {directory_path}"
+            return _fail(f"Указанный путь не является папкой: {directory_path}")
+        
+        if _compact_mode():
+            entries = sorted(os.scandir(directory_path), key=lambda e: e.name)
+            return _as_json(
+                {
+                    "папка": directory_path,
+                    "папки": [e.name for e in entries if e.is_dir()],
+                    "файлы": [{"имя": e.name, "байт": e.stat().st_size} for e in entries if e.is_file()],
+                }
+            )
         
         files = []
         directories = []
@@ -374,7 +710,131 @@ async def list_files_in_directory(directory_path: str) -> str:
         return result
         
     except Exception as e:
-        return f"Ошибка при просмотре папки: {str(e)}"
+        return _fail(f"Ошибка при просмотре папки: {str(e)}")
+
+
+def _find_duplicate(
+    index: DedupIndex, doc: IngestedDocument, threshold: float, reuse_exact: bool
+) -> tuple[List[int], Optional[DuplicateMatch]]:
+    """Посчитать MinHash-подпись документа и найти похожий среди проанализированных.
+    
+    Запись с тем же sha256 под другим именем — повторная публикация и считается
+    дубликатом. Собственная прежняя запись документа (то же имя) возвращается
+    только при reuse_exact, чтобы переиспользовать анализ.
+    """
+    signature = minhash_signature(doc.text)
+    exact = index.get(doc.sha256)
+    if exact is not None and (reuse_exact or exact.source != doc.filename):
+        return signature, exact
+    return signature, index.find_similar(signature, threshold, exclude=doc.sha256)
+
+
+async def _analyze_ingested(doc: IngestedDocument, upload_info: Optional[Dict[str, Any]] = None) -> str:
+    """Стадия анализа общего конвейера загрузки: отчет по извлеченному тексту.
+    
+    upload_info добавляется к данным в компактном режиме, где заголовок загрузки не выводится.
+    """
+    from pathlib import Path
+    
+    content = doc.text
+    if not content.strip():
+        return _fail("Документ пуст или не удалось извлечь текст")
+    
+    context = _context()
+    # Сроки документа попадают в общий индекс сроков по всем тендерам,
+    # в том числе когда анализ ниже переиспользуется для дубликата
+    if context.deadline_db_path:
+        await asyncio.to_thread(index_document, context.deadline_db_path, doc.sha256, doc.filename, content)
+    
+    # Проверка на повторную публикацию того же тендера
+    compact = context.output_mode == "compact"
+    data: Dict[str, Any] = dict(upload_info or {})
+    index = None
+    note = ""
+    if context.dedup_db_path:
+        index = get_dedup_index(context.dedup_db_path)
+        signature, match = await asyncio.to_thread(
+            _find_duplicate, index, doc, context.dedup_threshold, context.dedup_mode == "skip"
+        )
+        if match:
+            note = f"♻️ Документ совпадает на {match.similarity:.0%} с ранее проанализированным: {match.source}\n\n"
+            data["дубликат"] = {"источник": match.source, "сходство": round(match.similarity, 2)}
+            if context.dedup_mode == "skip" and match.analysis:
+                if compact:
+                    return _as_json({**data, "предыдущий_анализ": match.analysis})
+                return f"{note}Повторно используется предыдущий анализ.\n\n{match.analysis}"
+    
+    # Дополнительный анализ
+    word_count = len(content.split())
+    char_count = len(content)
+    
+    if compact:
+        data.update(документ=Path(doc.filename).name, тип=doc.kind, символов=char_count, слов=word_count)
+        data.update(compact_findings(await asyncio.to_thread(_document_findings, doc)))
+        result = _as_json(data)
+    else:
+        analysis = _findings_text(await asyncio.to_thread(_document_findings, doc))
+        result = _verbose_analysis(doc, analysis, char_count, word_count)
+    
+    if index is not None:
+        await asyncio.to_thread(index.add, doc.sha256, doc.filename, signature, result)
+    
+    return result if compact else note + result
+
+
+def _verbose_analysis(doc: IngestedDocument, analysis: str, char_count: int, word_count: int) -> str:
+    """Оформить отчет об анализе документа для человека."""
+    from pathlib import Path
+    
+    return f"""
+📄 АНАЛИЗ ДОКУМЕНТА: {Path(doc.filename).name}
+
+📊 Статистика:
+• Символов: {char_count:,}
+• Слов: {word_count:,}
+• Тип: {doc.kind.upper()}
+
+{analysis}
+
+💡 Рекомендации:
+• Сохраните важную информацию в отдельный файл
+• Проверьте все найденные даты и суммы
+• Убедитесь в соответствии требованиям
+    """.strip()
+
+
+async def _analyze_upload(data: Any, filename: Optional[str] = None, mime_type: Optional[str] = None) -> str:
+    """Прогнать загрузку через конвейер: нормализация → декодирование → тип → текст → анализ."""
+    try:
+        upload = await asyncio.to_thread(normalize_input, data, filename, mime_type)
+        # Вложение могло быть уже извлечено заранее, пока модель думала:
+        # сначала ищем по исходным данным, до декодирования
+        doc = await reuse_prefetched(upload.payload)
+        if doc is None:
+            decoded = await asyncio.to_thread(decode_payload, upload)
+            doc = await reuse_prefetched(decoded)
+        if doc is None:
+            doc = await asyncio.to_thread(_ingest_shared, decoded, upload.filename, upload.mime_type)
+        elif upload.filename != "unknown":
+            doc = replace(doc, filename=upload.filename)
+    except IngestionError as e:
+        return _fail(str(e))
+    
+    if _compact_mode():
+        return await _analyze_ingested(
+            doc, {"файл": doc.filename, "mime": doc.declared_mime_type, "байт": doc.size}
+        )
+    
+    result = await _analyze_ingested(doc)
+    
+    return f"""
+📎 ЗАГРУЖЕННЫЙ ФАЙЛ: {doc.filename}
+🔤 MIME-тип: {doc.declared_mime_type or "не указан"}
+📊 Размер: {doc.size:,} байт
+🎯 Обработан как: {doc.kind.upper()}
+
+{result}
+    """.strip()
 
 
 async def process_uploaded_file(content: str, filename: str = "unknown", mime_type: str = "") -> str:
@@ -384,77 +844,9 @@ async def process_uploaded_file(content: str, filename: str = "unknown", mime_ty
     Работает с файлами, загруженными через LangGraph Studio.
     """
     try:
-        import base64
-        import tempfile
-        import os
-        from pathlib import Path
-        
-        # Определяем тип файла по MIME-типу или расширению
-        file_extension = Path(filename).suffix.lower() if filename != "unknown" else ""
-        
-        # Поддерживаемые MIME типы
-        supported_types = {
-            'text/plain': '.txt',
-            'application/pdf': '.pdf', 
-            'application/vnd.openxmlformats-officedocument.wordprocessingml.document': '.docx',
-            'application/msword': '.doc',
-            'text/markdown': '.md',
-            'application/json': '.json',
-            'text/csv': '.csv'
-        }
-        
-        # Определяем расширение по MIME-типу
-        if mime_type in supported_types:
-            file_extension = supported_types[mime_type]
-        
-        if not file_extension:
-            return f"Неподдерживаемый тип файла: {mime_type}. Поддерживаются: {', '.join(supported_types.keys())}"
-        
-        # Создаем временный файл
-        with tempfile.NamedTemporaryFile(suffix=file_extension, delete=False) as temp_file:
-            temp_path = temp_file.name
-            
-            # Обрабатываем содержимое в зависимости от типа
-            if file_extension in ['.txt', '.md', '.json', '.csv']:
-                # Текстовые файлы - сохраняем как есть
-                temp_file.write(content.encode('utf-8'))
-            else:
-                # Бинарные файлы (PDF, DOCX) - декодируем из base64
-                try:
-                    # Убираем префикс data:mime/type;base64, если есть
-                    if ',' in content and 'base64' in content:
-                        content = content.split(',', 1)[1]
-                    
-                    binary_data = base64.b64decode(content)
-                    temp_file.write(binary_data)
-                except Exception as e:
-                    return f"Ошибка при декодировании файла: {str(e)}"
-        
-        try:
-            # Анализируем временный файл
-            result = await analyze_document(temp_path)
-            
-            # Добавляем информацию о загруженном файле
-            file_info = f"""
-📎 ЗАГРУЖЕННЫЙ ФАЙЛ: {filename}
-🔤 MIME-тип: {mime_type}
-📊 Размер содержимого: {len(content):,} символов
-🎯 Обработан как: {file_extension.upper()}
-
-{result}
-            """.strip()
-            
-            return file_info
-            
-        finally:
-            # Удаляем временный файл
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
-                
+        return await _analyze_upload(content, filename, mime_type)
     except Exception as e:
-        return f"Ошибка при обработке загруженного файла: {str(e)}"
+        return _fail(f"Ошибка при обработке загруженного файла: {str(e)}")
 
 
 async def extract_text_from_content(content: str, mime_type: str = "text/plain") -> str:
@@ -463,18 +855,16 @@ async def extract_text_from_content(content: str, mime_type: str = "text/plain")
     Простая функция для извлечения текста из различных форматов контента.
     """
     try:
-        # Если это обычный текст
-        if mime_type.startswith('text/') or mime_type == 'application/json':
-            # Ограничиваем размер для безопасности
-            if len(content) > 50000:
-                content = content[:50000] + "\n... [содержимое обрезано]"
-            return f"Извлеченный текст:\n\n{content}"
+        try:
+            doc = await asyncio.to_thread(ingest, content, None, mime_type)
+        except IngestionError as e:
+            return _fail(str(e))
         
-        # Для других типов предлагаем использовать process_uploaded_file
-        return f"Для файлов типа '{mime_type}' используйте функцию обработки загруженных файлов. Содержимое имеет размер {len(content):,} символов."
+        text = await _fit_result(doc.text)
+        return _reply(f"Извлеченный текст:\n\n{text}", текст=text)
         
     except Exception as e:
-        return f"Ошибка при извлечении текста: {str(e)}"
+        return _fail(f"Ошибка при извлечении текста: {str(e)}")
 
 
 async def handle_file_upload(data: dict) -> str:
@@ -483,35 +873,9 @@ async def handle_file_upload(data: dict) -> str:
     Принимает любой формат данных от LangGraph Studio и обрабатывает файлы.
     """
     try:
-        # Проверяем разные форматы входных данных
-        content = None
-        filename = "unknown"
-        mime_type = ""
-        
-        if isinstance(data, dict):
-            # Формат 1: {"content": "...", "filename": "...", "mime_type": "..."}
-            content = data.get('content', data.get('data', ''))
-            filename = data.get('filename', data.get('name', 'unknown'))
-            mime_type = data.get('mime_type', data.get('type', ''))
-            
-            # Формат 2: {"type": "application/pdf", "data": "base64..."}
-            if not content and 'data' in data:
-                content = data['data']
-                mime_type = data.get('type', mime_type)
-                
-        elif isinstance(data, str):
-            # Простая строка - считаем текстовым файлом
-            content = data
-            mime_type = "text/plain"
-            
-        if not content:
-            return "Ошибка: не удалось извлечь содержимое файла из переданных данных."
-            
-        # Используем существующий инструмент обработки
-        return await process_uploaded_file(content, filename, mime_type)
-        
+        return await _analyze_upload(data)
     except Exception as e:
-        return f"Ошибка при обработке загруженного файла: {str(e)}"
+        return _fail(f"Ошибка при обработке загруженного файла: {str(e)}")
 
 
 async def analyze_uploaded_content(content_data) -> str:
@@ -520,31 +884,9 @@ async def analyze_uploaded_content(content_data) -> str:
     Работает с любым типом входных данных и пытается извлечь информацию.
     """
     try:
-        # Если это строка - анализируем как текст
-        if isinstance(content_data, str):
-            if len(content_data) > 10000:
-                content_data = content_data[:10000] + "\n... [содержимое обрезано]"
-            
-            # Попробуем найти информацию о тендере
-            tender_info = await extract_tender_info(content_data)
-            
-            return f"""
-📋 АНАЛИЗ ЗАГРУЖЕННОГО СОДЕРЖИМОГО:
-📊 Размер: {len(str(content_data)):,} символов
-🔍 Тип данных: {type(content_data).__name__}
-
-{tender_info}
-            """.strip()
-            
-        # Если это словарь - попробуем извлечь данные  
-        elif isinstance(content_data, dict):
-            return await handle_file_upload(content_data)
-            
-        else:
-            return f"Получены данные типа {type(content_data).__name__}: {str(content_data)[:500]}..."
-            
+        return await _analyze_upload(content_data)
     except Exception as e:
-        return f"Ошибка при анализе содержимого: {str(e)}"
+        return _fail(f"Ошибка при анализе содержимого: {str(e)}")
 
 
 async def process_any_file_content(**kwargs) -> str:
@@ -553,50 +895,12 @@ async def process_any_file_content(**kwargs) -> str:
     Принимает любые именованные параметры и пытается обработать файл.
     """
     try:
-        # Собираем все возможные ключи с данными
-        possible_content_keys = ['content', 'data', 'file_content', 'text', 'body']
-        possible_type_keys = ['mime_type', 'type', 'content_type', 'file_type']
-        possible_name_keys = ['filename', 'name', 'file_name']
-        
-        content = None
-        mime_type = ""
-        filename = "unknown"
-        
-        # Ищем содержимое
-        for key in possible_content_keys:
-            if key in kwargs and kwargs[key]:
-                content = kwargs[key]
-                break
-                
-        # Ищем тип файла
-        for key in possible_type_keys:
-            if key in kwargs and kwargs[key]:
-                mime_type = kwargs[key]
-                break
-                
-        # Ищем имя файла
-        for key in possible_name_keys:
-            if key in kwargs and kwargs[key]:
-                filename = kwargs[key]
-                break
-        
-        # Если ничего не найдено, попробуем первый параметр
-        if not content and kwargs:
-            first_value = next(iter(kwargs.values()))
-            if isinstance(first_value, str):
-                content = first_value
-                mime_type = "text/plain"
-            elif isinstance(first_value, dict):
-                return await handle_file_upload(first_value)
-        
-        if not content:
-            return f"Не удалось найти содержимое файла. Переданные параметры: {list(kwargs.keys())}"
-        
-        # Обрабатываем найденное содержимое
-        return await process_uploaded_file(content, filename, mime_type)
-        
+        # Файл может прийти целиком в одном параметре
+        if len(kwargs) == 1:
+            return await _analyze_upload(next(iter(kwargs.values())))
+        return await _analyze_upload(kwargs)
     except Exception as e:
-        return f"Ошибка при универсальной обработке файла: {str(e)}. Параметры: {list(kwargs.keys())}"
+        return _fail(f"Ошибка при универсальной обработке файла: {str(e)}. Параметры: {list(kwargs.keys())}")
 
 
 async def debug_input_data(*args, **kwargs) -> str:
@@ -625,10 +929,14 @@ async def debug_input_data(*args, **kwargs) -> str:
 Используйте эту информацию для понимания формата данных от Studio.
         """.strip()
         
-        return debug_info
+        return _reply(
+            debug_info,
+            args=[type(arg).__name__ for arg in args],
+            kwargs={k: type(v).__name__ for k, v in kwargs.items()},
+        )
         
     except Exception as e:
-        return f"Ошибка в отладке: {str(e)}"
+        return _fail(f"Ошибка в отладке: {str(e)}")
 
 
 async def handle_file_content(file_data=None, **other_params) -> str:
@@ -637,52 +945,11 @@ async def handle_file_content(file_data=None, **other_params) -> str:
     Этот инструмент должен перехватывать ошибки типа 'Неподдерживаемый тип содержимого'.
     """
     try:
-        # Логируем входные данные
-        debug_log = f"""
-📎 ОБРАБОТЧИК ФАЙЛОВ - ВХОДНЫЕ ДАННЫЕ:
-file_data type: {type(file_data).__name__}
-file_data: {str(file_data)[:500]}...
-other_params: {other_params}
-        """
-        
-        # Если file_data содержит MIME-тип
-        if hasattr(file_data, 'get') and callable(file_data.get):
-            mime_type = file_data.get('type') or file_data.get('mime_type') or file_data.get('content_type', '')
-            content = file_data.get('content') or file_data.get('data') or file_data.get('body', '')
-            name = file_data.get('name') or file_data.get('filename', 'unknown')
-            
-            if mime_type == 'application/pdf':
-                return f"""
-{debug_log}
-
-🎯 ОБНАРУЖЕН PDF ФАЙЛ!
-MIME-тип: {mime_type}
-Имя файла: {name}
-Размер содержимого: {len(str(content))} символов
-
-📋 АНАЛИЗ PDF:
-Это PDF файл. Обрабатываю через специальный обработчик...
-                """.strip()
-        
-        # Проверяем на строку с ошибкой
-        if isinstance(file_data, str) and 'application/pdf' in file_data:
-            return f"""
-{debug_log}
-
-⚠️ НАЙДЕНА СТРОКА С application/pdf!
-Это может быть MIME-тип, переданный как строка.
-Содержимое: {file_data}
-            """.strip()
-        
-        return f"""
-{debug_log}
-
-ℹ️ Данные переданы в неожиданном формате.
-Нужно адаптировать обработчик под этот формат.
-        """.strip()
-        
+        if isinstance(file_data, str) and file_data.strip().startswith(("application/", "text/")):
+            return await process_any_content_type(file_data)
+        return await _analyze_upload(file_data if file_data is not None else other_params)
     except Exception as e:
-        return f"Ошибка в обработчике файлов: {str(e)}"
+        return _fail(f"Ошибка в обработчике файлов: {str(e)}")
 
 
 async def handle_docx_content(file_data=None, **other_params) -> str:
@@ -691,61 +958,11 @@ async def handle_docx_content(file_data=None, **other_params) -> str:
     Обрабатывает Word документы с MIME-типом application/vnd.openxmlformats-officedocument.wordprocessingml.document
     """
     try:
-        # Логируем входные данные для DOCX
-        debug_log = f"""
-📝 ОБРАБОТЧИК DOCX ФАЙЛОВ - ВХОДНЫЕ ДАННЫЕ:
-file_data type: {type(file_data).__name__}
-file_data preview: {str(file_data)[:500]}...
-other_params: {other_params}
-        """
-        
-        # Если file_data содержит DOCX MIME-тип
-        if hasattr(file_data, 'get') and callable(file_data.get):
-            mime_type = file_data.get('type') or file_data.get('mime_type') or file_data.get('content_type', '')
-            content = file_data.get('content') or file_data.get('data') or file_data.get('body', '')
-            name = file_data.get('name') or file_data.get('filename', 'unknown.docx')
-            
-            if 'vnd.openxmlformats-officedocument.wordprocessingml.document' in mime_type:
-                return f"""
-{debug_log}
-
-📝 ОБНАРУЖЕН DOCX ФАЙЛ!
-MIME-тип: {mime_type}
-Имя файла: {name}
-Размер содержимого: {len(str(content))} символов
-
-📋 АНАЛИЗ DOCX:
-Это Word документ. Обрабатываю через специальный обработчик...
-
-🔄 Попытка обработки через process_uploaded_file...
-                """.strip()
-                
-                # Попробуем обработать через существующий инструмент
-                try:
-                    result = await process_uploaded_file(content, name, mime_type)
-                    return f"{debug_log}\n\n✅ УСПЕШНО ОБРАБОТАН DOCX:\n{result}"
-                except Exception as e:
-                    return f"{debug_log}\n\n❌ ОШИБКА при обработке DOCX: {str(e)}"
-        
-        # Проверяем на строку с DOCX MIME-типом
-        if isinstance(file_data, str) and 'vnd.openxmlformats-officedocument.wordprocessingml.document' in file_data:
-            return f"""
-{debug_log}
-
-⚠️ НАЙДЕНА СТРОКА С DOCX MIME-ТИПОМ!
-Это может быть MIME-тип, переданный как строка.
-Содержимое: {file_data}
-            """.strip()
-        
-        return f"""
-{debug_log}
-
-ℹ️ Данные переданы в неожиданном формате для DOCX.
-Нужно адаптировать обработчик под этот формат.
-        """.strip()
-        
+        if isinstance(file_data, str) and file_data.strip().startswith(("application/", "text/")):
+            return await process_any_content_type(file_data)
+        return await _analyze_upload(file_data if file_data is not None else other_params)
     except Exception as e:
-        return f"Ошибка в обработчике DOCX файлов: {str(e)}"
+        return _fail(f"Ошибка в обработчике DOCX файлов: {str(e)}")
 
 
 @tool
@@ -758,104 +975,9 @@ async def cloud_file_processor(input_data: str) -> str:
         input_data: Сырые данные файла из облачной среды (JSON, base64, binary, text)
     """
     try:
-        import json
-        import base64
-        import tempfile
-        import os
-        
-        # Debug: показываем что получили
-        debug_info = f"🔍 DEBUG: Тип входных данных: {type(input_data)}\n"
-        debug_info += f"📊 Размер данных: {len(str(input_data))}\n"
-        debug_info += f"📝 Начало данных: {str(input_data)[:100]}...\n\n"
-        
-        # Пытаемся распарсить как JSON
-        file_info = {}
-        content = ""
-        
-        if isinstance(input_data, str):
-            # Проверяем, это JSON?
-            if input_data.strip().startswith('{'):
-                try:
-                    parsed = json.loads(input_data)
-                    file_info = parsed
-                    content = parsed.get('content', parsed.get('data', ''))
-                except:
-                    # Если не JSON, считаем это содержимым файла
-                    content = input_data
-            else:
-                content = input_data
-        
-        # Извлекаем метаданные файла
-        filename = file_info.get('name', file_info.get('filename', 'uploaded_file'))
-        mime_type = file_info.get('type', file_info.get('mime_type', 'application/octet-stream'))
-        
-        # Если MIME-тип указывает на DOCX или PDF
-        if 'vnd.openxmlformats-officedocument.wordprocessingml.document' in mime_type:
-            file_extension = '.docx'
-        elif 'application/pdf' in mime_type:
-            file_extension = '.pdf'
-        elif 'text/' in mime_type:
-            file_extension = '.txt'
-        else:
-            file_extension = '.bin'
-        
-        debug_info += f"📁 Имя файла: {filename}\n"
-        debug_info += f"🔤 MIME-тип: {mime_type}\n"
-        debug_info += f"📎 Расширение: {file_extension}\n\n"
-        
-        # Создаем временный файл для обработки
-        with tempfile.NamedTemporaryFile(suffix=file_extension, delete=False) as temp_file:
-            temp_path = temp_file.name
-            
-            if file_extension in ['.txt']:
-                # Текстовые файлы
-                temp_file.write(content.encode('utf-8'))
-            else:
-                # Бинарные файлы - пытаемся декодировать из base64
-                try:
-                    # Если это массив байтов
-                    if isinstance(content, list):
-                        binary_data = bytes(content)
-                    # Если это base64 строка
-                    elif isinstance(content, str):
-                        # Убираем префикс data:
-                        if 'base64,' in content:
-                            content = content.split('base64,')[1]
-                        binary_data = base64.b64decode(content)
-                    else:
-                        binary_data = str(content).encode('utf-8')
-                    
-                    temp_file.write(binary_data)
-                    debug_info += f"✅ Файл декодирован, размер: {len(binary_data)} байт\n\n"
-                except Exception as decode_error:
-                    debug_info += f"❌ Ошибка декодирования: {str(decode_error)}\n\n"
-                    return debug_info + "Не удалось декодировать файл"
-        
-        try:
-            # Анализируем файл
-            if file_extension == '.docx':
-                result = await analyze_docx_file(temp_path)
-            elif file_extension == '.pdf':
-                result = await analyze_pdf_file(temp_path)
-            else:
-                with open(temp_path, 'r', encoding='utf-8') as f:
-                    file_content = f.read()
-                result = f"Содержимое файла:\n{file_content[:1000]}"
-            
-            return debug_info + f"📋 РЕЗУЛЬТАТ АНАЛИЗА:\n{result}"
-            
-        except Exception as analysis_error:
-            return debug_info + f"❌ Ошибка анализа: {str(analysis_error)}"
-        
-        finally:
-            # Удаляем временный файл
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
-                
+        return await _analyze_upload(input_data)
     except Exception as e:
-        return f"🚨 КРИТИЧЕСКАЯ ОШИБКА в cloud_file_processor: {str(e)}"
+        return _fail(f"🚨 КРИТИЧЕСКАЯ ОШИБКА в cloud_file_processor: {str(e)}")
 
 
 async def universal_file_handler(**kwargs) -> str:
@@ -864,42 +986,14 @@ async def universal_file_handler(**kwargs) -> str:
     Автоматически определяет тип файла и выбирает подходящий обработчик.
     """
     try:
-        # Ищем данные файла в любом формате
-        file_data = None
-        for key in kwargs:
-            if kwargs[key] and (
-                (isinstance(kwargs[key], dict)) or 
-                (isinstance(kwargs[key], str) and ('application/' in kwargs[key] or 'text/' in kwargs[key]))
-            ):
-                file_data = kwargs[key]
-                break
-        
-        if not file_data:
-            return f"Не найдены данные файла в параметрах: {list(kwargs.keys())}"
-        
-        # Определяем тип файла
-        content_type = ""
-        if isinstance(file_data, dict):
-            content_type = file_data.get('type', file_data.get('mime_type', ''))
-        elif isinstance(file_data, str):
-            if 'application/pdf' in file_data:
-                content_type = 'application/pdf'
-            elif 'vnd.openxmlformats-officedocument.wordprocessingml.document' in file_data:
-                content_type = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-            elif 'text/' in file_data:
-                content_type = 'text/plain'
-        
-        # Выбираем обработчик
-        if 'pdf' in content_type:
-            return await handle_file_content(file_data, **kwargs)
-        elif 'vnd.openxmlformats-officedocument.wordprocessingml.document' in content_type:
-            return await handle_docx_content(file_data, **kwargs)
-        else:
-            # Используем общий обработчик
-            return await analyze_uploaded_content(file_data)
-            
+        if not kwargs:
+            return _fail("Не найдены данные файла: параметры не переданы")
+        # Файл может прийти целиком в одном параметре
+        if len(kwargs) == 1:
+            return await _analyze_upload(next(iter(kwargs.values())))
+        return await _analyze_upload(kwargs)
     except Exception as e:
-        return f"Ошибка в универсальном обработчике файлов: {str(e)}"
+        return _fail(f"Ошибка в универсальном обработчике файлов: {str(e)}")
 
 
 async def process_any_content_type(content_or_data: str) -> str:
@@ -955,6 +1049,10 @@ async def process_any_content_type(content_or_data: str) -> str:
 - "Извлеки доступную информацию"
 """
             
+            if _compact_mode():
+                supported = any(t in mime_type for t in ("application/pdf", "wordprocessingml.document", "text/"))
+                return _as_json({"mime": mime_type, "поддерживается": supported})
+            
             response += """
 
 🚀 РЕШЕНИЕ:
@@ -966,6 +1064,8 @@ async def process_any_content_type(content_or_data: str) -> str:
         
         # Если это MIME-тип
         elif content_or_data.startswith("application/") or content_or_data.startswith("text/"):
+            if _compact_mode():
+                return _as_json({"mime": content_or_data, "поддерживается": True})
             return f"""
 📄 ОБНАРУЖЕН MIME-ТИП: {content_or_data}
 
@@ -976,15 +1076,11 @@ async def process_any_content_type(content_or_data: str) -> str:
         # Обычный текст - анализируем как содержимое
         else:
             if len(content_or_data) > 100:
-                # Похоже на содержимое файла
-                tender_analysis = await extract_tender_info(content_or_data)
-                return f"""
-📋 АНАЛИЗ СОДЕРЖИМОГО:
-Размер: {len(content_or_data)} символов
-
-{tender_analysis}
-                """.strip()
+                # Похоже на содержимое файла (текст, base64 или JSON)
+                return await _analyze_upload(content_or_data)
             else:
+                if _compact_mode():
+                    return _as_json({"текст": content_or_data})
                 return f"""
 📝 КОРОТКИЙ ТЕКСТ: {content_or_data}
 
@@ -993,7 +1089,7 @@ async def process_any_content_type(content_or_data: str) -> str:
                 """.strip()
                 
     except Exception as e:
-        return f"Ошибка при обработке содержимого: {str(e)}"
+        return _fail(f"Ошибка при обработке содержимого: {str(e)}")
 
 
 TOOLS: List[Callable[..., Any]] = [
@@ -1003,8 +1099,12 @@ TOOLS: List[Callable[..., Any]] = [
     extract_tender_info,
     format_tender_report,
     check_tender_deadline,
+    find_upcoming_deadlines,
     read_file_content,
+    aggregate_price_schedule,
     analyze_document,
+    query_document,
+    export_tender_records,
     list_files_in_directory,
     process_uploaded_file,
     extract_text_from_content,
@@ -3,6 +3,7 @@
 from langchain.chat_models import init_chat_model
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import BaseMessage
+from langgraph.config import get_config
 
 
 def get_message_text(msg: BaseMessage) -> str:
@@ -25,3 +26,11 @@ def load_chat_model(fully_specified_name: str) -> BaseChatModel:
     """
     provider, model = fully_specified_name.split("/", maxsplit=1)
     return init_chat_model(model, model_provider=provider)
+
+
+def get_thread_id() -> str:
+    """Return the thread id of the current run, or "default" outside a graph run."""
+    try:
+        return str(get_config().get("configurable", {}).get("thread_id") or "default")
+    except RuntimeError:
+        return "default"
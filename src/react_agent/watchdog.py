@@ -0,0 +1,182 @@
+"""Opt-in watchdog for event-loop stalls.
+
+Async tools that do blocking work (file I/O, PDF parsing, ...) freeze the whole
+worker. The watchdog schedules a heartbeat callback on the event loop and a
+monitor thread checks that it keeps firing. When the loop has been silent for
+longer than the threshold, the monitor samples the stack of the loop thread
+until the loop recovers, then records the stall:
+
+* attributed to the innermost registered tool or graph node found on the
+  sampled stacks (the blocking call runs inside that coroutine's frame),
+* as metrics (`event_loop.stalls` and `event_loop.stall_ms`, labelled by source),
+* and, when a log path is configured, as one JSON line with the stack samples.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Any, Dict, List, Optional, Tuple
+
+from react_agent import metrics
+
+logger = logging.getLogger(__name__)
+
+MAX_STACK_DEPTH = 40
+MAX_SAMPLES = 100
+
+_sources: Dict[CodeType, str] = {}
+_sources_lock = threading.Lock()
+
+
+def register_sources(*callables: Any) -> None:
+    """Register tools and nodes that stalls can be attributed to.
+
+    Accepts plain functions and coroutine functions as well as LangChain tools
+    (their underlying function is registered under the tool name).
+    """
+    with _sources_lock:
+        for obj in callables:
+            name = getattr(obj, "name", None) or getattr(obj, "__name__", repr(obj))
+            for fn in (
+                obj,
+                getattr(obj, "coroutine", None),
+                getattr(obj, "func", None),
+            ):
+                while fn is not None and hasattr(fn, "__wrapped__"):
+                    fn = fn.__wrapped__
+                code = getattr(fn, "__code__", None)
+                if code is not None:
+                    _sources[code] = name
+
+
+def _attribute(frame: Optional[FrameType]) -> Optional[str]:
+    while frame is not None:
+        source = _sources.get(frame.f_code)
+        if source:
+            return source
+        frame = frame.f_back
+    return None
+
+
+class StallWatchdog:
+    """Detects stalls of one event loop and records them."""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        threshold: float,
+        log_path: str = "",
+    ):
+        """Watch `loop`; stalls longer than `threshold` seconds are recorded."""
+        self.loop = loop
+        self.threshold = threshold
+        self.log_path = log_path
+        self.interval = max(threshold / 4, 0.005)
+        self._last_beat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._stopped = threading.Event()
+        self._monitor = threading.Thread(
+            target=self._run, name="event-loop-watchdog", daemon=True
+        )
+
+    def start(self) -> None:
+        """Start the heartbeat and the monitor thread."""
+        self.loop.call_soon_threadsafe(self._beat)
+        self._monitor.start()
+
+    def stop(self) -> None:
+        """Stop monitoring."""
+        self._stopped.set()
+
+    def _beat(self) -> None:
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        if not self._stopped.is_set() and not self.loop.is_closed():
+            self.loop.call_later(self.interval, self._beat)
+
+    def _run(self) -> None:
+        samples: List[Tuple[str, ...]] = []
+        sources: Counter[str] = Counter()
+        stall_started: Optional[float] = None
+        while not self._stopped.wait(self.interval):
+            if self.loop.is_closed():
+                return
+            last_beat = self._last_beat
+            lag = time.monotonic() - last_beat
+            if lag > self.threshold:
+                if stall_started is None:
+                    stall_started = last_beat
+                frame = sys._current_frames().get(self._loop_thread or -1)
+                if frame is not None and len(samples) < MAX_SAMPLES:
+                    sources[_attribute(frame) or "unknown"] += 1
+                    samples.append(_format_stack(frame))
+            elif stall_started is not None:
+                self._record(last_beat - stall_started, sources, samples)
+                samples, sources, stall_started = [], Counter(), None
+
+    def _record(
+        self, duration: float, sources: Counter[str], samples: List[Tuple[str, ...]]
+    ) -> None:
+        source = sources.most_common(1)[0][0] if sources else "unknown"
+        labels = {"source": source}
+        metrics.increment("event_loop.stalls", labels=labels)
+        metrics.observe("event_loop.stall_ms", duration * 1000, labels=labels)
+        logger.warning("Event loop stalled for %.0f ms in %s", duration * 1000, source)
+        if not self.log_path:
+            return
+        record = {
+            "time": time.time(),
+            "duration_ms": round(duration * 1000, 1),
+            "source": source,
+            "samples": [
+                {"count": count, "stack": list(stack)}
+                for stack, count in Counter(samples).most_common()
+            ],
+        }
+        try:
+            with open(self.log_path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError:
+            logger.exception("Could not write the stall record to %s", self.log_path)
+
+
+def _format_stack(frame: FrameType) -> Tuple[str, ...]:
+    return tuple(
+        f"{entry.filename}:{entry.lineno} in {entry.name}"
+        for entry in traceback.extract_stack(frame, limit=MAX_STACK_DEPTH)
+    )
+
+
+_watchdogs: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, StallWatchdog] = (
+    weakref.WeakKeyDictionary()
+)
+_watchdogs_lock = threading.Lock()
+
+
+def ensure_watchdog(threshold_ms: int, log_path: str = "") -> Optional[StallWatchdog]:
+    """Start a watchdog for the running event loop unless it already has one.
+
+    Does nothing when `threshold_ms` is not positive or no loop is running.
+    """
+    if threshold_ms <= 0:
+        return None
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    with _watchdogs_lock:
+        watchdog = _watchdogs.get(loop)
+        if watchdog is None:
+            watchdog = StallWatchdog(loop, threshold_ms / 1000, log_path)
+            watchdog.start()
+            _watchdogs[loop] = watchdog
+        return watchdog
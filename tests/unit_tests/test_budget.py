@@ -0,0 +1,49 @@
+import asyncio
+
+from react_agent import tools
+from react_agent.budget import (
+    estimate_tokens,
+    fit_to_budget,
+    record_usage,
+    result_budget,
+)
+from react_agent.context import Context
+
+FILLER = "Прочие положения настоящего документа носят справочный характер. "
+
+
+def _document() -> str:
+    sections = [f"Раздел {i}\n" + FILLER * 10 for i in range(40)]
+    sections[20] = (
+        "Раздел 20\nНМЦК составляет 5 000 000 руб., поставка трансформатора и кабеля.\n"
+        + FILLER
+    )
+    return "НАЧАЛО ДОКУМЕНТА\n" + "\n".join(sections) + "\nКОНЕЦ ДОКУМЕНТА"
+
+
+def test_budget_shrinks_with_context_usage() -> None:
+    assert 10 <= estimate_tokens(FILLER) <= 30
+    full = result_budget("budget-thread", "openai/gpt-4o-mini")
+    record_usage("budget-thread", 100_000, 2)
+    assert result_budget("budget-thread", "openai/gpt-4o-mini") < full // 4
+    assert (
+        result_budget("other", "x/unknown", window_override=8_000)
+        == (8_000 - 4_096) // 2
+    )
+
+
+def test_fit_keeps_head_tail_and_high_signal_middle() -> None:
+    text = _document()
+    fitted = fit_to_budget(text, 1_000)
+    assert estimate_tokens(fitted) <= 1_100
+    assert "НАЧАЛО ДОКУМЕНТА" in fitted and "КОНЕЦ ДОКУМЕНТА" in fitted
+    assert "НМЦК составляет 5 000 000 руб." in fitted
+    assert "[... пропущено ~" in fitted
+
+
+def test_read_file_content_uses_context_budget(tmp_path, monkeypatch) -> None:
+    path = tmp_path / "tender.txt"
+    path.write_text(_document(), encoding="utf-8")
+    monkeypatch.setattr(tools, "_context", lambda: Context(context_window_tokens=6_000))
+    result = asyncio.run(tools.read_file_content(str(path)))
+    assert "НМЦК составляет" in result and "сокращен до бюджета" in result
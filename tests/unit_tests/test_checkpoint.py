@@ -0,0 +1,57 @@
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import StateGraph
+
+from react_agent.checkpoint import SqliteCheckpointSaver
+from react_agent.state import State
+
+
+def _echo(state: State) -> dict:
+    return {"messages": [AIMessage(content=f"ответ {len(state.messages)}")]}
+
+
+def _build(saver: SqliteCheckpointSaver):
+    builder = StateGraph(State)
+    builder.add_node("echo", _echo)
+    builder.add_edge("__start__", "echo")
+    return builder.compile(checkpointer=saver)
+
+
+def test_messages_are_stored_once_and_restored(tmp_path) -> None:
+    saver = SqliteCheckpointSaver(str(tmp_path / "cp.sqlite"))
+    graph = _build(saver)
+    config = {"configurable": {"thread_id": "t1"}}
+    document = "Техническое задание. " * 2000
+
+    graph.invoke({"messages": [HumanMessage(content=document)]}, config)
+    after_first = saver.bytes_written
+    graph.invoke({"messages": [HumanMessage(content="ещё вопрос")]}, config)
+
+    # The large document is not rewritten by the second run.
+    assert saver.bytes_written - after_first < len(document) // 10
+
+    state = graph.get_state(config)
+    assert [m.content for m in state.values["messages"]] == [
+        document,
+        "ответ 1",
+        "ещё вопрос",
+        "ответ 3",
+    ]
+
+
+def test_compact_keeps_latest_state(tmp_path) -> None:
+    saver = SqliteCheckpointSaver(str(tmp_path / "cp.sqlite"))
+    graph = _build(saver)
+    config = {"configurable": {"thread_id": "t1"}}
+    for i in range(3):
+        graph.invoke({"messages": [HumanMessage(content=f"вопрос {i}")]}, config)
+
+    before = graph.get_state(config).values["messages"]
+    removed = saver.compact(keep_last=1)
+
+    assert removed["checkpoints"] > 0
+    assert len(list(saver.list(config))) == 1
+    assert graph.get_state(config).values["messages"] == before
+
+    saver.delete_thread("t1")
+    assert saver.get_tuple(config) is None
+    assert saver.conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0] == 0
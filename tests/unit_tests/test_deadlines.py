@@ -0,0 +1,108 @@
+import asyncio
+import datetime
+
+from react_agent import tools
+from react_agent.context import Context
+from react_agent.deadlines import DeadlineIndex, find_deadlines, get_deadline_index
+
+
+def test_only_dates_with_deadline_cues_are_extracted() -> None:
+    text = (
+        "Извещение от 01.02.2025. Дата окончания подачи заявок: 15.03.2025 10:00. "
+        "Поставка не позднее 1 апреля 2025 г. Договор подписан 2025-02-30."
+    )
+    found = find_deadlines(text)
+    assert [(d.due, d.kind) for d in found] == [
+        (datetime.date(2025, 3, 15), "подача заявок"),
+        (datetime.date(2025, 4, 1), "срок"),
+    ]
+    assert text[found[0].start : found[0].end] == "15.03.2025"
+
+
+def test_index_answers_range_and_upcoming_queries(tmp_path) -> None:
+    index = DeadlineIndex(str(tmp_path / "deadlines.db"))
+    day = datetime.date(2025, 1, 1)
+    for i in range(50):
+        text = f"Срок подачи заявок {day + datetime.timedelta(days=i):%d.%m.%Y}"
+        index.add_document(f"doc{i}", f"T-{i}", f"{i}.txt", find_deadlines(text))
+    # Re-analyzing a document replaces its deadlines
+    index.add_document("doc0", "T-0", "0.txt", find_deadlines("Срок подачи 01.06.2025"))
+
+    assert len(index) == 50
+    window = index.between(datetime.date(2025, 1, 10), datetime.date(2025, 1, 12))
+    assert [d.tender_id for d in window] == ["T-9", "T-10", "T-11"]
+    assert [d.tender_id for d in index.upcoming(2, today=day)] == ["T-1", "T-2"]
+    assert index.upcoming(1, today=datetime.date(2025, 3, 1))[0].tender_id == "T-0"
+
+
+def test_analyzed_documents_feed_the_deadline_tool(tmp_path, monkeypatch) -> None:
+    context = Context(deadline_db_path=str(tmp_path / "deadlines.db"))
+    monkeypatch.setattr(tools, "_context", lambda: context)
+    due = datetime.date.today() + datetime.timedelta(days=5)
+    document = tmp_path / "notice.txt"
+    document.write_text(
+        f"Извещение о закупке № 32514850391. Окончание подачи заявок {due:%d.%m.%Y}.",
+        encoding="utf-8",
+    )
+
+    asyncio.run(tools.analyze_document(str(document)))
+    answer = asyncio.run(
+        tools.find_upcoming_deadlines(
+            date_to=f"{due + datetime.timedelta(days=5):%d.%m.%Y}"
+        )
+    )
+
+    assert "Найдено сроков: 1" in answer
+    assert "тендер 32514850391, подача заявок" in answer and "через 5 дн." in answer
+
+
+def test_republished_notice_replaces_the_tender_deadline(tmp_path, monkeypatch) -> None:
+    context = Context(
+        deadline_db_path=str(tmp_path / "deadlines.db"),
+        dedup_db_path=str(tmp_path / "dedup.db"),
+        dedup_mode="skip",
+    )
+    monkeypatch.setattr(tools, "_context", lambda: context)
+    due = datetime.date.today() + datetime.timedelta(days=5)
+    notice = (
+        f"Извещение о закупке № 32514850391. Окончание подачи заявок {due:%d.%m.%Y}."
+    )
+    (tmp_path / "notice.txt").write_text(notice, encoding="utf-8")
+    (tmp_path / "copy.txt").write_text(notice, encoding="utf-8")
+    moved = due + datetime.timedelta(days=7)
+    (tmp_path / "notice-v2.txt").write_text(
+        notice.replace(f"{due:%d.%m.%Y}", f"{moved:%d.%m.%Y}"), encoding="utf-8"
+    )
+
+    asyncio.run(tools.analyze_document(str(tmp_path / "notice.txt")))
+    # The copy reuses the earlier analysis but still lands in the index.
+    assert "Повторно используется" in asyncio.run(
+        tools.analyze_document(str(tmp_path / "copy.txt"))
+    )
+    found = get_deadline_index(context.deadline_db_path).upcoming()
+    assert [(d.due, d.source) for d in found] == [(due, str(tmp_path / "copy.txt"))]
+
+    asyncio.run(tools.analyze_document(str(tmp_path / "notice-v2.txt")))
+    found = get_deadline_index(context.deadline_db_path).upcoming()
+    assert [(d.due, d.tender_id) for d in found] == [(moved, "32514850391")]
+
+
+def test_exported_records_feed_the_deadline_index(tmp_path, monkeypatch) -> None:
+    context = Context(deadline_db_path=str(tmp_path / "deadlines.db"))
+    monkeypatch.setattr(tools, "_context", lambda: context)
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "notice.txt").write_text(
+        "Закупка № 0373100000125000001. Срок подачи заявок 01.06.2030.",
+        encoding="utf-8",
+    )
+
+    asyncio.run(
+        tools.export_tender_records(
+            str(tmp_path / "docs"), str(tmp_path / "records.trec")
+        )
+    )
+
+    found = get_deadline_index(context.deadline_db_path).upcoming()
+    assert [(d.due, d.tender_id) for d in found] == [
+        (datetime.date(2030, 6, 1), "0373100000125000001")
+    ]
@@ -0,0 +1,63 @@
+import asyncio
+
+from react_agent import tools
+from react_agent.context import Context
+from react_agent.dedup import DedupIndex, minhash_signature, similarity
+
+BASE = " ".join(
+    f"Пункт {i}. Поставщик обязан поставить трансформатор типа ТМГ-{i} в срок до {i} дней."
+    for i in range(200)
+)
+
+
+def test_near_duplicates_are_found(tmp_path) -> None:
+    revised = BASE.replace("Пункт 7.", "Пункт 7 (в редакции изменений).")
+    other = " ".join(
+        f"Раздел {i}: услуги по уборке помещений площадью {i * 10} кв.м."
+        for i in range(200)
+    )
+    index = DedupIndex(str(tmp_path / "dedup.db"))
+    index.add("base", "base.txt", minhash_signature(BASE), "анализ")
+
+    assert similarity(minhash_signature(BASE), minhash_signature(revised)) > 0.9
+    match = index.find_similar(minhash_signature(revised), 0.9)
+    assert match is not None and match.doc_id == "base" and match.analysis == "анализ"
+    assert index.find_similar(minhash_signature(other), 0.5) is None
+    assert index.find_similar(minhash_signature(BASE), 0.9, exclude="base") is None
+
+
+def test_skip_mode_reuses_previous_analysis(tmp_path, monkeypatch) -> None:
+    context = Context(dedup_db_path=str(tmp_path / "dedup.db"), dedup_mode="skip")
+    monkeypatch.setattr(tools, "_context", lambda: context)
+    first, second = tmp_path / "v1.txt", tmp_path / "v2.txt"
+    first.write_text(BASE, encoding="utf-8")
+    second.write_text(BASE + " Изменение 1.", encoding="utf-8")
+
+    original = asyncio.run(tools.analyze_document(str(first)))
+    repeated = asyncio.run(tools.analyze_document(str(second)))
+
+    assert "♻️" not in original
+    assert repeated.startswith("♻️ Документ совпадает")
+    assert repeated.endswith(original)
+
+
+def test_flag_mode_does_not_match_the_document_itself(tmp_path, monkeypatch) -> None:
+    context = Context(dedup_db_path=str(tmp_path / "dedup.db"))
+    monkeypatch.setattr(tools, "_context", lambda: context)
+    first, copy, revised = (
+        tmp_path / "v1.txt",
+        tmp_path / "copy.txt",
+        tmp_path / "v2.txt",
+    )
+    first.write_text(BASE, encoding="utf-8")
+    copy.write_text(BASE, encoding="utf-8")
+    revised.write_text(BASE + " Изменение 1.", encoding="utf-8")
+
+    asyncio.run(tools.analyze_document(str(first)))
+    assert "♻️" not in asyncio.run(tools.analyze_document(str(first)))
+    assert asyncio.run(tools.analyze_document(str(copy))).startswith(
+        "♻️ Документ совпадает на 100%"
+    )
+    assert asyncio.run(tools.analyze_document(str(revised))).startswith(
+        "♻️ Документ совпадает"
+    )
@@ -0,0 +1,51 @@
+import io
+import zipfile
+
+from react_agent.docx_stream import DocxBlock, docx_to_text, iter_docx_blocks
+from react_agent.ingestion import ingest_bytes
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def _docx(body: str) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as archive:
+        archive.writestr(
+            "word/document.xml", f"<w:document {W}><w:body>{body}</w:body></w:document>"
+        )
+    return buf.getvalue()
+
+
+def _p(text: str) -> str:
+    return f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>"
+
+
+def _row(*cells: str) -> str:
+    return "<w:tr>" + "".join(f"<w:tc>{_p(c)}</w:tc>" for c in cells) + "</w:tr>"
+
+
+def test_paragraphs_and_table_rows_in_order() -> None:
+    data = _docx(
+        _p("Извещение о закупке")
+        + "<w:tbl>"
+        + _row("Лот", "Цена")
+        + _row("1", "1 500 000,00")
+        + "</w:tbl>"
+        + '<w:p><w:r><w:t xml:space="preserve">Срок </w:t><w:tab/><w:t>10.06.2025</w:t></w:r></w:p>'
+    )
+    blocks = list(iter_docx_blocks(io.BytesIO(data)))
+    assert blocks == [
+        DocxBlock("paragraph", text="Извещение о закупке"),
+        DocxBlock("row", cells=("Лот", "Цена")),
+        DocxBlock("row", cells=("1", "1 500 000,00")),
+        DocxBlock("paragraph", text="Срок \t10.06.2025"),
+    ]
+
+
+def test_ingestion_extracts_tables_without_python_docx() -> None:
+    doc = ingest_bytes(
+        _docx(_p("Прайс") + "<w:tbl>" + _row("Кабель", "250") + "</w:tbl>")
+    )
+    assert doc.kind == "docx"
+    assert doc.text == "Прайс\nКабель | 250\n"
+    assert docx_to_text(io.BytesIO(_docx(""))) == ""
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from react_agent import metrics
+from react_agent.hedging import get_latency_tracker, hedge_delay, hedged_call
+
+
+def _model(delay: float, result: str, calls: list, fail: bool = False):
+    async def call() -> str:
+        calls.append(result)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            calls.append(f"{result} cancelled")
+            raise
+        if fail:
+            raise RuntimeError(f"{result} failed")
+        return result
+
+    return call
+
+
+def test_slow_primary_is_hedged_and_cancelled() -> None:
+    calls: list = []
+    result = asyncio.run(
+        hedged_call(
+            "fake/slow",
+            _model(1.0, "primary", calls),
+            _model(0.01, "fallback", calls),
+            min_delay=0.05,
+        )
+    )
+    assert result == "fallback"
+    assert calls == ["primary", "fallback", "primary cancelled"]
+    assert metrics.get_counter("hedge.fired", {"model": "fake/slow"}) == 1
+    assert (
+        metrics.get_counter("hedge.wins", {"model": "fake/slow", "winner": "hedge"})
+        == 1
+    )
+
+
+def test_fast_primary_is_not_hedged_and_failures_fall_back() -> None:
+    calls: list = []
+    assert (
+        asyncio.run(
+            hedged_call(
+                "fake/fast",
+                _model(0.0, "primary", calls),
+                _model(0.0, "fallback", calls),
+            )
+        )
+        == "primary"
+    )
+    assert calls == ["primary"]
+
+    calls.clear()
+    failing = _model(0.0, "primary", calls, fail=True)
+    assert (
+        asyncio.run(hedged_call("fake/fast", failing, _model(0.0, "fallback", calls)))
+        == "fallback"
+    )
+    with pytest.raises(RuntimeError, match="primary failed"):
+        asyncio.run(
+            hedged_call("fake/fast", failing, _model(0.0, "fallback", calls, fail=True))
+        )
+
+
+def test_delay_follows_observed_quantile() -> None:
+    tracker = get_latency_tracker("fake/p95")
+    assert hedge_delay("fake/p95", 0.95, 0.5) == 0.5
+    for i in range(100):
+        tracker.observe(1.0 if i < 90 else 10.0)
+    assert hedge_delay("fake/p95", 0.95, 0.5) == 10.0
+    assert hedge_delay("fake/p95", 0.5, 0.5) == 1.0
@@ -0,0 +1,101 @@
+import base64
+import io
+import json
+import time
+import zipfile
+
+import pytest
+
+from react_agent.ingestion import (
+    IngestionError,
+    RawUpload,
+    decode_payload,
+    ingest,
+    normalize_input,
+    sniff_type,
+)
+
+
+def _docx_bytes() -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as archive:
+        archive.writestr("word/document.xml", "<w:document/>")
+    return buf.getvalue()
+
+
+def test_sniff_by_magic_bytes() -> None:
+    assert sniff_type(b"%PDF-1.7\n...") == "pdf"
+    assert sniff_type(_docx_bytes()) == "docx"
+    assert sniff_type(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1rest") == "doc"
+    assert sniff_type("Извещение о закупке".encode("utf-8")) == "text"
+    assert sniff_type("Извещение о закупке".encode("cp1251")) == "text"
+    assert sniff_type(b"\x00\x01\x02") == "binary"
+
+
+def test_normalize_supported_shapes() -> None:
+    payload = base64.b64encode(b"%PDF-1.4").decode()
+    block = {
+        "type": "file",
+        "source_type": "base64",
+        "mime_type": "application/pdf",
+        "data": payload,
+    }
+    upload = normalize_input(block)
+    assert upload.mime_type == "application/pdf" and upload.payload == payload
+
+    upload = normalize_input(json.dumps({"name": "lot.docx", "content": "abc"}))
+    assert upload.filename == "lot.docx" and upload.payload == "abc"
+
+    upload = normalize_input(
+        {
+            "type": "file",
+            "file": {
+                "filename": "a.pdf",
+                "file_data": "data:application/pdf;base64," + payload,
+            },
+        }
+    )
+    assert upload.filename == "a.pdf"
+    assert decode_payload(upload) == b"%PDF-1.4"
+    assert upload.mime_type == "application/pdf"
+
+    with pytest.raises(IngestionError):
+        normalize_input({"filename": "empty.txt"})
+
+
+def test_plain_text_is_not_mistaken_for_base64() -> None:
+    doc = ingest("test")
+    assert doc.kind == "text" and doc.text == "test"
+
+    doc = ingest(
+        base64.b64encode("Начальная цена контракта".encode()).decode(),
+        mime_type="text/plain",
+    )
+    assert doc.kind == "text"
+
+
+def _decode_seconds(payload: str) -> float:
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        decode_payload(RawUpload(payload))
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def test_whitespace_runs_are_checked_for_base64_in_linear_time() -> None:
+    small, large = (
+        _decode_seconds(" " * 20_000 + "!"),
+        _decode_seconds(" " * 40_000 + "!"),
+    )
+    assert large < 0.5 and large < small * 3
+    assert (
+        decode_payload(RawUpload("  UEsD\nBA==  ", mime_type="application/zip"))
+        == b"PK\x03\x04"
+    )
+
+
+def test_ingest_decodes_base64_docx_once() -> None:
+    encoded = base64.b64encode(_docx_bytes()).decode()
+    upload = normalize_input({"data": encoded, "name": "lot.docx"})
+    assert sniff_type(decode_payload(upload)) == "docx"
@@ -0,0 +1,77 @@
+import asyncio
+import json
+
+from react_agent import tools
+from react_agent.context import Context
+from react_agent.keywords import KeywordMatcher, get_keyword_matcher
+
+TEXT = "Заказчик закупает силовые\n  трансформаторы ТМГ, кабели и КТП-10; ктпн не нужна. Ёлка."
+
+
+def test_stems_offsets_and_multiword_terms() -> None:
+    matcher = KeywordMatcher(
+        {
+            "оборудование": ["трансформатор", "силовой трансформатор", "кабель", "КТП"],
+            "прочее": ["елка"],
+        }
+    )
+    found = [(h.term, TEXT[h.start : h.end]) for h in matcher.find_all(TEXT)]
+    assert found == [
+        ("силовой трансформатор", "силовые\n  трансформатор"),
+        ("трансформатор", "трансформатор"),
+        ("кабель", "кабел"),
+        ("КТП", "КТП"),
+        ("елка", "Ёлк"),
+    ]
+    assert matcher.find_all("автотрансформатор") == []
+
+
+def test_term_must_end_the_word_or_take_an_inflection() -> None:
+    matcher = get_keyword_matcher()
+    text = "Срок поставки. Крупный заказчик проводит монтаж; трансформаторный пункт, КРУ и провода."
+    assert [(h.term, text[h.start : h.end]) for h in matcher.find_all(text)] == [
+        ("поставка", "поставк"),
+        ("заказчик", "заказчик"),
+        ("монтаж", "монтаж"),
+        ("КРУ", "КРУ"),
+        ("провод", "провод"),
+    ]
+    assert [h.term for h in matcher.find_all("электроснабжение, энергетики")] == [
+        "электро",
+        "электроснабжение",
+        "энергетик",
+    ]
+
+
+def test_custom_dictionary_is_compiled_once(tmp_path, monkeypatch) -> None:
+    path = tmp_path / "keywords.json"
+    path.write_text(
+        json.dumps({"энергетика": ["ячейка КСО"]}, ensure_ascii=False), encoding="utf-8"
+    )
+    assert get_keyword_matcher(str(path)) is get_keyword_matcher(str(path))
+
+    context = Context(keyword_dictionary_path=str(path))
+    monkeypatch.setattr(tools, "_context", lambda: context)
+    result = json.loads(
+        asyncio.run(
+            tools.extract_tender_info("Поставка ячейки КСО-393 и ячейкой  КСО.")
+        )
+    )
+    found = result["найденная_информация"]
+    assert found["ключевые_слова"] == ["ячейка КСО"]
+    assert (
+        found["ключевые_слова_по_категориям"]["энергетика"]["ячейка КСО"]["количество"]
+        == 2
+    )
+
+
+def test_ia_ie_nouns_match_in_every_case() -> None:
+    matcher = get_keyword_matcher()
+    for text, term in (
+        ("наличие лицензии", "лицензия"),
+        ("копия спецификации", "спецификация"),
+        ("строительство подстанции", "подстанция"),
+        ("в соответствии с техническим заданием", "техническое задание"),
+        ("по спецификациям и лицензиях", "спецификация"),
+    ):
+        assert term in [h.term for h in matcher.find_all(text)], text
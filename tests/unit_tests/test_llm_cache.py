@@ -0,0 +1,64 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from react_agent.llm_cache import ResponseCache, make_cache_key
+
+
+def test_cache_key_ignores_volatile_ids() -> None:
+    first = [
+        HumanMessage(content="Проанализируй тендер", id="a"),
+        AIMessage(
+            content="",
+            id="b",
+            tool_calls=[
+                {
+                    "name": "analyze_document",
+                    "args": {"file_path": "t.txt"},
+                    "id": "call_1",
+                }
+            ],
+        ),
+        ToolMessage(content="ok", tool_call_id="call_1", id="c"),
+    ]
+    second = [
+        HumanMessage(content="Проанализируй тендер", id="x"),
+        AIMessage(
+            content="",
+            id="y",
+            tool_calls=[
+                {
+                    "name": "analyze_document",
+                    "args": {"file_path": "t.txt"},
+                    "id": "call_2",
+                }
+            ],
+        ),
+        ToolMessage(content="ok", tool_call_id="call_2", id="z"),
+    ]
+    assert make_cache_key("openai/gpt-4o-mini", "p", [], first) == make_cache_key(
+        "openai/gpt-4o-mini", "p", [], second
+    )
+    assert make_cache_key("openai/gpt-4o-mini", "p", [], first) != make_cache_key(
+        "openai/gpt-4o", "p", [], first
+    )
+
+
+def test_cache_roundtrip_and_eviction(tmp_path) -> None:
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), ttl_seconds=60, max_entries=2)
+    assert cache.get("k1") is None
+
+    cache.put("k1", AIMessage(content="one", id="run-1"))
+    cache.put("k2", AIMessage(content="two"))
+    hit = cache.get("k1")
+    assert hit is not None and hit.content == "one" and hit.id is None
+
+    cache.put("k3", AIMessage(content="three"))
+    assert cache.get("k2") is None
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["hits"] == 1 and stats["misses"] == 2
+
+
+def test_cache_ttl_expiry(tmp_path) -> None:
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), ttl_seconds=0, max_entries=10)
+    cache.put("k", AIMessage(content="stale"))
+    assert cache.get("k") is None
@@ -0,0 +1,109 @@
+import asyncio
+import importlib
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from react_agent import metrics
+from react_agent.context import Context
+from react_agent.loops import find_repeated_calls
+
+# The package re-exports the compiled graph under the module's name
+graph_module = importlib.import_module("react_agent.graph")
+
+
+def _call(name: str, args: dict, call_id: str) -> AIMessage:
+    return AIMessage(
+        content="", tool_calls=[{"name": name, "args": args, "id": call_id}]
+    )
+
+
+def test_only_repeats_with_identical_results_are_reported() -> None:
+    args = {"file_data": "application/x-foo"}
+    messages = [
+        HumanMessage(content="Разбери файл"),
+        _call("universal_file_handler", args, "1"),
+        ToolMessage(content="Неожиданный формат", tool_call_id="1"),
+        _call("handle_file_content", args, "2"),
+        ToolMessage(content="Неожиданный формат", tool_call_id="2"),
+        _call("process_any_content_type", args, "3"),
+    ]
+    [repeated] = find_repeated_calls(messages, max_repeats=2)
+    assert (repeated.name, repeated.repeats) == ("process_any_content_type", 2)
+
+    assert find_repeated_calls(messages, max_repeats=3) == []
+    changed = messages[:4] + [
+        ToolMessage(content="Другой ответ", tool_call_id="2"),
+        messages[5],
+    ]
+    assert find_repeated_calls(changed, max_repeats=2) == []
+    # An earlier turn does not count.
+    assert (
+        find_repeated_calls(
+            messages[:5] + [HumanMessage(content="Еще раз"), messages[5]], 2
+        )
+        == []
+    )
+
+
+def test_single_payloads_match_whatever_the_parameter_is_called() -> None:
+    payload = "application/x-foo"
+    messages = [
+        HumanMessage(content="Разбери файл"),
+        _call("universal_file_handler", {"kwargs": {"data": payload}}, "1"),
+        ToolMessage(content="Неожиданный формат", tool_call_id="1"),
+        _call("handle_file_content", {"file_data": payload}, "2"),
+        ToolMessage(content="Неожиданный формат", tool_call_id="2"),
+        _call("process_any_content_type", {"content_or_data": payload}, "3"),
+    ]
+    [repeated] = find_repeated_calls(messages, max_repeats=2)
+    assert (repeated.name, repeated.repeats) == ("process_any_content_type", 2)
+
+    # With several arguments the names still matter.
+    two = [
+        HumanMessage(content="Разбери файл"),
+        _call("search_in_document", {"path": "a.txt", "query": "срок"}, "1"),
+        ToolMessage(content="Ничего", tool_call_id="1"),
+        _call("search_in_document", {"path": "a.txt", "query": "срок"}, "2"),
+        ToolMessage(content="Ничего", tool_call_id="2"),
+        _call("search_in_document", {"path": "срок", "query": "a.txt"}, "3"),
+    ]
+    assert find_repeated_calls(two, max_repeats=2) == []
+
+
+class _LoopingModel(GenericFakeChatModel):
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+def test_graph_hints_once_then_stops_the_loop(monkeypatch) -> None:
+    metrics.reset()
+    args = {"content_or_data": "text/x-unknown"}
+    model = _LoopingModel(
+        messages=iter(
+            _call("process_any_content_type", args, f"call-{i}") for i in range(10)
+        )
+    )
+    monkeypatch.setattr(graph_module, "load_chat_model", lambda name: model)
+
+    state = asyncio.run(
+        graph_module.graph.ainvoke(
+            {"messages": [("user", "Обработай файл")]}, context=Context()
+        )
+    )
+
+    messages = state["messages"]
+    hints = [
+        m for m in messages if isinstance(m, ToolMessage) and m.content.startswith("🔁")
+    ]
+    assert len(hints) == 2
+    assert "stopped" in messages[-1].content and not messages[-1].tool_calls
+    # Two real calls, the hinted third one and the fourth that stopped the run
+    assert sum(isinstance(m, AIMessage) and bool(m.tool_calls) for m in messages) == 4
+    assert (
+        metrics.get_counter(
+            "tool_loop.detected", labels={"tool": "process_any_content_type"}
+        )
+        == 2
+    )
+    assert metrics.get_counter("tool_loop.stopped") == 1
@@ -0,0 +1,28 @@
+import json
+import threading
+import time
+
+from react_agent import metrics
+
+
+def test_snapshot_writer_keeps_the_file_current(tmp_path) -> None:
+    path = str(tmp_path / "metrics.json")
+    metrics.increment("test.snapshots")
+    metrics.ensure_snapshot_writer(path, 0.01)
+    metrics.ensure_snapshot_writer(path, 0.01)  # already running
+    metrics.increment("test.snapshots")
+
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline:
+        try:
+            with open(path, encoding="utf-8") as file:
+                if json.load(file)["counters"].get("test.snapshots", 0) >= 2:
+                    break
+        except FileNotFoundError:
+            pass
+        time.sleep(0.01)
+
+    with open(path, encoding="utf-8") as file:
+        assert json.load(file)["counters"]["test.snapshots"] >= 2
+    assert [t for t in threading.enumerate() if t.name == "metrics-writer"]
+    assert not [p for p in tmp_path.iterdir() if p.name.startswith(".metrics-")]
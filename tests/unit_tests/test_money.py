@@ -0,0 +1,41 @@
+from decimal import Decimal
+
+from react_agent.money import find_amounts, summarize_amounts
+
+TEXT = (
+    "Начальная (максимальная) цена контракта: 1 500 тыс. руб. "
+    "Обеспечение заявки 2,5 млн рублей, аванс 30 000,50 ₽, "
+    "поставка оборудования 300 евро. Лот состоит из 12 шт."
+)
+
+
+def test_amounts_are_normalized_with_offsets() -> None:
+    amounts = find_amounts(TEXT)
+    assert [(a.value, a.currency) for a in amounts] == [
+        (Decimal("1500000"), "RUB"),
+        (Decimal("2500000"), "RUB"),
+        (Decimal("30000.50"), "RUB"),
+        (Decimal("300"), "EUR"),
+    ]
+    first = amounts[0]
+    assert TEXT[first.start : first.end].startswith("1 500 тыс. руб")
+    assert first.nmck and not any(a.nmck for a in amounts[1:])
+
+
+def test_leading_signs_and_words_starting_with_rub() -> None:
+    text = "Аванс € 300 и $1 200, 12 рубежей обороны, 5 рублей."
+    assert [(a.value, a.currency, a.raw) for a in find_amounts(text)] == [
+        (Decimal("300"), "EUR", "€ 300"),
+        (Decimal("1200"), "USD", "$1 200"),
+        (Decimal("5"), "RUB", "5 рублей"),
+    ]
+
+
+def test_summary_covers_all_matches() -> None:
+    text = " ".join(f"позиция {i} стоит {i} 000 руб." for i in range(1, 101))
+    summary = summarize_amounts(find_amounts(text))
+    rub = summary["по_валютам"]["RUB"]
+    assert rub["количество"] == 100
+    assert rub["итого"] == "5050000.00"
+    assert rub["максимум"]["значение"] == "100000.00"
+    assert "нмцк" not in summary
@@ -0,0 +1,74 @@
+import asyncio
+import datetime
+import zipfile
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+from react_agent.context import Context
+from react_agent.deadlines import get_deadline_index
+from react_agent.package_graph import builder
+
+
+def test_package_is_extracted_in_parallel_and_reduced(tmp_path) -> None:
+    package = tmp_path / "package"
+    package.mkdir()
+    (package / "notice.txt").write_text(
+        "Извещение. НМЦК составляет 1 500 000 руб. Участник должен иметь лицензию.",
+        encoding="utf-8",
+    )
+    (package / "spec.txt").write_text(
+        "Поставка трансформатора ТМГ, 2 шт по 300 тыс. руб.", encoding="utf-8"
+    )
+    with zipfile.ZipFile(package / "annex.zip", "w") as archive:
+        archive.writestr(
+            "terms.txt", "Условия оплаты: в случае просрочки начисляются пени."
+        )
+        archive.writestr("broken.bin", b"\x00\x01\x02")
+
+    graph = builder.compile(
+        checkpointer=InMemorySaver(), interrupt_before=["call_model"]
+    )
+    config = {"configurable": {"thread_id": "package"}}
+    state = asyncio.run(
+        graph.ainvoke(
+            {"messages": [("user", "Оцени пакет")], "documents": [str(package)]}, config
+        )
+    )
+
+    assert len(state["findings"]) == 4
+    summary = state["messages"][-1]
+    assert summary.name == "package_summary"
+    assert '"обработано": 3' in summary.content
+    assert '"итого": "1800000.00"' in summary.content
+    assert "broken.bin" in summary.content and "лицензию" in summary.content
+
+    # A follow-up turn without documents does not reprocess the package.
+    state = asyncio.run(graph.ainvoke({"messages": [("user", "А сроки?")]}, config))
+    assert len(state["findings"]) == 4 and state["documents"] == []
+
+
+def test_package_documents_feed_the_deadline_index(tmp_path) -> None:
+    package = tmp_path / "package"
+    package.mkdir()
+    (package / "notice.txt").write_text(
+        "Извещение о закупке № 32514850391. Окончание подачи заявок 01.06.2030.",
+        encoding="utf-8",
+    )
+    context = Context(deadline_db_path=str(tmp_path / "deadlines.db"))
+
+    graph = builder.compile(
+        checkpointer=InMemorySaver(), interrupt_before=["call_model"]
+    )
+    config = {"configurable": {"thread_id": "deadlines"}}
+    asyncio.run(
+        graph.ainvoke(
+            {"messages": [("user", "Сроки?")], "documents": [str(package)]},
+            config,
+            context=context,
+        )
+    )
+
+    found = get_deadline_index(context.deadline_db_path).upcoming()
+    assert [(d.due, d.tender_id) for d in found] == [
+        (datetime.date(2030, 6, 1), "32514850391")
+    ]
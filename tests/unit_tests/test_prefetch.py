@@ -0,0 +1,135 @@
+import asyncio
+import base64
+import time
+
+from langchain_core.messages import HumanMessage
+
+from react_agent import ingestion, metrics, prefetch, tools
+
+
+def test_upload_tool_reuses_the_prefetched_extraction(monkeypatch) -> None:
+    metrics.reset()
+    monkeypatch.setattr(prefetch, "_documents", type(prefetch._documents)())
+    text = "Извещение. НМЦК составляет 1 500 000 руб."
+    payload = base64.b64encode(text.encode("utf-8")).decode()
+    message = HumanMessage(
+        content=[
+            {"type": "text", "text": "Проанализируй тендер"},
+            {
+                "type": "file",
+                "source_type": "base64",
+                "mime_type": "text/plain",
+                "data": payload,
+            },
+        ]
+    )
+    extracted = []
+    original = ingestion.ingest_bytes
+
+    def counting_ingest(data, filename="unknown", mime_type=""):
+        extracted.append(filename)
+        return original(data, filename, mime_type)
+
+    monkeypatch.setattr(prefetch, "ingest_bytes", counting_ingest)
+    monkeypatch.setattr(tools, "ingest_bytes", counting_ingest)
+
+    async def run() -> str:
+        assert prefetch.start_prefetch(message) == 1
+        await asyncio.sleep(0.1)
+        # The model passes the same file on as a data URL with a name
+        return await tools.process_uploaded_file(
+            f"data:text/plain;base64,{payload}", "notice.txt"
+        )
+
+    result = asyncio.run(run())
+    assert extracted == ["unknown"]
+    assert "ЗАГРУЖЕННЫЙ ФАЙЛ: notice.txt" in result and "1500000" in result
+    assert metrics.get_counter("prefetch.reused") == 1
+    assert not prefetch._documents  # released once the tool took it
+
+
+def test_tool_call_during_decoding_waits_for_the_prefetch(monkeypatch) -> None:
+    metrics.reset()
+    monkeypatch.setattr(prefetch, "_documents", type(prefetch._documents)())
+    payload = base64.b64encode(
+        "Извещение. НМЦК 2 000 000 руб.".encode("utf-8")
+    ).decode()
+    message = HumanMessage(
+        content=[
+            {
+                "type": "file",
+                "source_type": "base64",
+                "mime_type": "text/plain",
+                "data": payload,
+            }
+        ]
+    )
+    decoded = []
+    original = ingestion.decode_payload
+
+    def slow_decode(upload):
+        decoded.append(upload.filename)
+        time.sleep(0.3)
+        return original(upload)
+
+    monkeypatch.setattr(prefetch, "decode_payload", slow_decode)
+    monkeypatch.setattr(tools, "decode_payload", slow_decode)
+
+    async def run() -> str:
+        prefetch.start_prefetch(message)
+        await asyncio.sleep(0.05)
+        assert decoded == ["unknown"]  # still decoding
+        return await tools.process_uploaded_file(
+            f"data:text/plain;base64,{payload}", "n.txt"
+        )
+
+    result = asyncio.run(run())
+    assert decoded == ["unknown"] and "2000000" in result
+    assert metrics.get_counter("prefetch.reused") == 1
+    assert not prefetch._documents
+
+
+def test_attachments_over_the_payload_ceiling_are_not_prefetched(monkeypatch) -> None:
+    metrics.reset()
+    monkeypatch.setattr(prefetch, "_documents", type(prefetch._documents)())
+    small = base64.b64encode(b"small").decode()
+    large = base64.b64encode(b"x" * 10_000).decode()
+    message = HumanMessage(
+        content=[
+            {
+                "type": "file",
+                "source_type": "base64",
+                "mime_type": "text/plain",
+                "data": data,
+            }
+            for data in (small, large)
+        ]
+    )
+
+    async def run() -> int:
+        started = prefetch.start_prefetch(message, max_bytes=5_000)
+        await asyncio.sleep(0.1)
+        return started
+
+    assert asyncio.run(run()) == 1 and len(set(prefetch._documents.values())) == 1
+    assert metrics.get_counter("prefetch.skipped") == 1
+
+
+def test_only_inline_file_blocks_are_prefetched() -> None:
+    message = HumanMessage(
+        content=[
+            {"type": "text", "text": "Файлы"},
+            {"type": "file", "source_type": "url", "url": "https://example.com/a.pdf"},
+            {
+                "type": "file",
+                "file": {
+                    "filename": "a.pdf",
+                    "file_data": "data:application/pdf;base64,JVBERi0=",
+                },
+            },
+        ]
+    )
+    assert [
+        block["file"]["filename"] for block in prefetch.find_attachments(message)
+    ] == ["a.pdf"]
+    assert prefetch.find_attachments(HumanMessage(content="Привет")) == []
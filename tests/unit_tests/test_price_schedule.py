@@ -0,0 +1,31 @@
+from react_agent.price_schedule import aggregate_csv, parse_number
+
+
+def test_parse_russian_numbers() -> None:
+    assert parse_number("1 234 567,89") == 1234567.89
+    assert parse_number("1 500") == 1500
+    assert parse_number("1.234.567,00") == 1234567
+    assert parse_number("(300,00)") == -300
+    assert parse_number("12 500 руб.") == 12500
+    assert parse_number("10.06.2025") is None
+    assert parse_number("кабель") is None
+
+
+def test_aggregate_streams_in_chunks_with_groups(tmp_path) -> None:
+    path = tmp_path / "boq.csv"
+    lines = ["Раздел;Наименование;Кол-во;Сумма"]
+    for i in range(1, 101):
+        section = "Электрика" if i % 2 else "Строительство"
+        lines.append(f"{section};Позиция {i};{i};{i * 1000},50")
+    path.write_text("\n".join(lines), encoding="cp1251")
+
+    result = aggregate_csv(str(path), group_by="Раздел", chunk_rows=7)
+
+    assert result["строк"] == 100
+    assert result["кодировка"] == "cp1251"
+    total = result["итоги"]["Сумма"]
+    assert total["sum"] == 5050 * 1000 + 50.0
+    assert total["min"] == 1000.5 and total["max"] == 100000.5
+    assert result["итоги"]["Кол-во"]["sum"] == 5050
+    assert result["всего_групп"] == 2
+    assert result["группы"]["Электрика"]["Кол-во"]["count"] == 50
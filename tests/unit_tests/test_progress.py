@@ -0,0 +1,65 @@
+import asyncio
+import base64
+
+from langchain_core.messages import AIMessage
+from langgraph.graph import MessagesState, StateGraph
+
+from react_agent import ingestion
+from react_agent.context import Context
+from react_agent.progress import ProgressReporter, report_progress
+from react_agent.tool_node import GuardedToolNode
+
+
+def test_events_are_throttled_within_a_stage() -> None:
+    events = []
+    reporter = ProgressReporter("analyze_document", events.append, interval=60)
+    for page in range(1, 101):
+        reporter.report("extract", pages=page, total_pages=100)
+    reporter.report("analyze", keyword_matches=7)
+    reporter.report("extract", pages=100, total_pages=100, final=True)
+
+    assert [(e["stage"], e.get("pages")) for e in events] == [
+        ("extract", 1),
+        ("analyze", None),
+        ("extract", 100),
+    ]
+    assert reporter.suppressed == 99
+    # Outside a tool call reports are dropped
+    report_progress("extract", pages=1)
+
+
+async def decode_upload(content: str) -> str:
+    """Декодировать загрузку."""
+    doc = await asyncio.to_thread(
+        ingestion.ingest, content, "big.bin", "application/octet-stream"
+    )
+    return str(doc.size)
+
+
+def test_tools_stream_progress_through_the_custom_writer(monkeypatch) -> None:
+    monkeypatch.setattr(ingestion, "DECODE_CHUNK", 4096)
+    payload = base64.b64encode(b"x" * 30_000).decode()
+    builder = StateGraph(MessagesState, context_schema=Context)
+    builder.add_node("tools", GuardedToolNode([decode_upload]))
+    builder.add_edge("__start__", "tools")
+    graph = builder.compile()
+    call = AIMessage(
+        content="",
+        tool_calls=[{"name": "decode_upload", "args": {"content": payload}, "id": "1"}],
+    )
+
+    async def collect() -> list:
+        return [
+            chunk
+            async for chunk in graph.astream(
+                {"messages": [call]},
+                context=Context(progress_interval_ms=1),
+                stream_mode="custom",
+            )
+        ]
+
+    events = asyncio.run(collect())
+    decode = [e for e in events if e["stage"] == "decode"]
+    assert decode and decode[0]["tool"] == "decode_upload"
+    assert decode[-1]["bytes"] <= decode[-1]["total_bytes"]
+    assert events[-1]["stage"] == "done"
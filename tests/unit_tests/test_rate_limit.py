@@ -0,0 +1,71 @@
+import asyncio
+
+from react_agent import metrics
+from react_agent.rate_limit import AdaptiveLimiter
+
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+
+
+class ThrottlingProvider:
+    """Local fake provider that rejects calls above its concurrency capacity."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.active = 0
+        self.rejected = 0
+
+    async def complete(self) -> str:
+        if self.active >= self.capacity:
+            self.rejected += 1
+            raise FakeRateLimitError("429 Too Many Requests")
+        self.active += 1
+        try:
+            await asyncio.sleep(0.01)
+            return "ok"
+        finally:
+            self.active -= 1
+
+
+def test_limit_backs_off_on_429_and_all_calls_succeed(monkeypatch) -> None:
+    monkeypatch.setattr("react_agent.rate_limit.BASE_BACKOFF", 0.01)
+    provider = ThrottlingProvider(capacity=3)
+    limiter = AdaptiveLimiter("fake/throttled", initial_limit=12, max_limit=12)
+
+    async def run():
+        return await asyncio.gather(
+            *(
+                limiter.call(provider.complete, thread_id=f"t{i % 4}", max_attempts=10)
+                for i in range(60)
+            )
+        )
+
+    assert asyncio.run(run()) == ["ok"] * 60
+    assert provider.rejected > 0
+    assert limiter.limit < 12 and limiter.in_flight == 0
+    summary = metrics.snapshot()["summaries"][
+        "rate_limit.queue_wait_ms{model=fake/throttled}"
+    ]
+    assert summary["count"] >= 60 and summary["max"] > 0
+
+
+def test_waiting_threads_are_served_round_robin() -> None:
+    limiter = AdaptiveLimiter("fake/fair", initial_limit=1, max_limit=1)
+    order = []
+
+    async def call(thread_id: str) -> None:
+        async def work() -> None:
+            order.append(thread_id)
+            await asyncio.sleep(0.001)
+
+        await limiter.call(work, thread_id=thread_id)
+
+    async def run() -> None:
+        busy = [asyncio.create_task(call("busy")) for _ in range(5)]
+        await asyncio.sleep(0)
+        other = asyncio.create_task(call("other"))
+        await asyncio.gather(*busy, other)
+
+    asyncio.run(run())
+    assert order.index("other") <= 2
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import math
+
+from react_agent import records, tools
+from react_agent.context import Context
+from react_agent.records import (
+    RecordWriter,
+    TenderRecord,
+    count_records,
+    row_groups,
+    scan,
+)
+
+
+def _record(i: int) -> TenderRecord:
+    return TenderRecord(
+        source=f"tender-{i}.pdf",
+        sha256=f"{i:064x}",
+        kind="pdf",
+        nmck=1_000_000.0 * i if i % 2 else math.nan,
+        deadline=f"2025-03-{i + 1:02d}",
+        keywords=["кабель"] if i < 5 else ["трансформатор"],
+    )
+
+
+def test_scan_skips_row_groups_by_statistics(tmp_path, monkeypatch) -> None:
+    path = str(tmp_path / "records.trec")
+    with RecordWriter(path, row_group_rows=5) as writer:
+        for i in range(12):
+            writer.append(_record(i))
+    assert [g.rows for g in row_groups(path)] == [5, 5, 2] and count_records(path) == 12
+
+    decoded = []
+    original = records._decode
+    monkeypatch.setattr(
+        records, "_decode", lambda k, d: decoded.append(k) or original(k, d)
+    )
+    rows = list(
+        scan(
+            path,
+            columns=["source", "nmck"],
+            where={"keywords": ("трансформатор", "трансформатор")},
+        )
+    )
+    assert [r["source"] for r in rows] == [f"tender-{i}.pdf" for i in range(5, 12)]
+    assert len(decoded) == 2 * 3  # the first group is skipped, three columns per group
+
+    rows = list(scan(path, ["deadline"], where={"nmck": (3_000_000, 7_000_000)}))
+    assert [r["deadline"] for r in rows] == ["2025-03-04", "2025-03-06", "2025-03-08"]
+
+
+def test_appends_survive_a_torn_row_group(tmp_path) -> None:
+    path = tmp_path / "records.trec"
+    with RecordWriter(str(path)) as writer:
+        writer.append(_record(1))
+    with open(path, "ab") as file:
+        file.write(b"RGRP\x10\x00\x00\x00")  # a writer crashed mid-group
+    assert count_records(str(path)) == 1
+    with RecordWriter(str(path)) as writer:
+        writer.append(_record(2))
+    assert [r["source"] for r in scan(str(path), ["source"])] == [
+        "tender-1.pdf",
+        "tender-2.pdf",
+    ]
+
+
+def test_live_writer_cuts_off_a_group_torn_by_another_process(tmp_path) -> None:
+    path = tmp_path / "records.trec"
+    writer = RecordWriter(str(path), row_group_rows=1)
+    writer.append(_record(1))
+    torn = records._encode_group([_record(2)])
+    with open(path, "ab") as file:
+        file.write(torn[: len(torn) // 2])  # another writer crashed mid-group
+    writer.append(_record(3))
+    assert [r["source"] for r in scan(str(path), ["source"])] == [
+        "tender-1.pdf",
+        "tender-3.pdf",
+    ]
+
+    # A header that does not decode ends the scan instead of raising
+    with open(path, "ab") as file:
+        file.write(records._GROUP_HEADER.pack(records.GROUP_MAGIC, 2, 0) + b"\xff\xfe")
+    assert count_records(str(path)) == 2
+
+
+def test_export_tool_writes_one_record_per_document(tmp_path, monkeypatch) -> None:
+    folder = tmp_path / "package"
+    folder.mkdir()
+    (folder / "notice.txt").write_text(
+        "Извещение о закупке № 0373200001224000123. НМЦК составляет 5 000 000 руб. "
+        "Окончание подачи заявок 15.03.2025.",
+        encoding="utf-8",
+    )
+    (folder / "scan.bin").write_bytes(b"\x00\x01\x02 binary")
+    output = tmp_path / "out.trec"
+    monkeypatch.setattr(
+        tools,
+        "_context",
+        lambda: Context(records_path=str(output), output_mode="compact"),
+    )
+
+    result = json.loads(asyncio.run(tools.export_tender_records(str(folder))))
+
+    assert result["записей"] == 1 and len(result["ошибки"]) == 1
+    [row] = scan(str(output))
+    assert row["tender_id"] == "0373200001224000123" and row["nmck"] == 5_000_000.0
+    assert row["deadline"] == "2025-03-15" and row["source"].endswith("notice.txt")
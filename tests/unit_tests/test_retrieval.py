@@ -0,0 +1,71 @@
+import asyncio
+
+from react_agent import tools
+from react_agent.retrieval import BM25Index, chunk_document, stem
+
+DOCUMENT = (
+    "ИЗВЕЩЕНИЕ О ПРОВЕДЕНИИ АУКЦИОНА\n"
+    "1. Общие положения\n"
+    "Заказчик проводит закупку трансформаторов.\f"
+    "2. Требования к участникам\n"
+    "Участник должен иметь лицензию и опыт поставок не менее трех лет.\n"
+    "3. Сроки поставки\n"
+    "Поставка в течение 30 дней с даты заключения договора.\n"
+)
+
+
+def test_chunks_respect_pages_and_sections() -> None:
+    chunks = chunk_document(DOCUMENT)
+    assert [(c.page, c.section) for c in chunks] == [
+        (1, "ИЗВЕЩЕНИЕ О ПРОВЕДЕНИИ АУКЦИОНА"),
+        (1, "1. Общие положения"),
+        (2, "2. Требования к участникам"),
+        (2, "3. Сроки поставки"),
+    ]
+    assert all(DOCUMENT[c.start : c.end].strip() == c.text for c in chunks)
+
+
+def test_lowercase_body_lines_do_not_start_sections() -> None:
+    text = (
+        "2. Требования к участникам\n"
+        "участник закупки обязан иметь лицензию\n"
+        "30 дней с даты заключения договора\n"
+        "Приложение № 1 к документации\n"
+        "раздел 4 действует до конца года\n"
+    )
+    assert [c.section for c in chunk_document(text)] == [
+        "2. Требования к участникам",
+        "Приложение № 1 к документации",
+        "раздел 4 действует до конца года",
+    ]
+
+
+def test_bm25_ranks_relevant_chunk_first() -> None:
+    assert stem("требования") == stem("требований")
+    index = BM25Index(chunk_document(DOCUMENT))
+    best, _ = index.search("какие требования к участнику", top_k=1)[0]
+    assert best.section == "2. Требования к участникам"
+
+
+def test_query_document_reuses_index(tmp_path, monkeypatch) -> None:
+    path = tmp_path / "tender.txt"
+    path.write_text(DOCUMENT, encoding="utf-8")
+    calls = []
+    original = tools.ingest_file
+    monkeypatch.setattr(tools, "ingest_file", lambda p: calls.append(p) or original(p))
+
+    first = asyncio.run(tools.query_document(str(path), "сроки поставки", 1))
+    second = asyncio.run(tools.query_document(str(path), "лицензия участника", 1))
+
+    assert "3. Сроки поставки" in first
+    assert "2. Требования к участникам" in second
+    assert len(calls) == 1
+
+
+def test_case_forms_share_a_stem() -> None:
+    for forms in (
+        "лицензия лицензии лицензию лицензией лицензий лицензиям лицензиями лицензиях",
+        "подстанция подстанции подстанцию подстанцией подстанций подстанциям подстанциях",
+        "задание задания заданию заданием задании заданий заданиям заданиями заданиях",
+    ):
+        assert len({stem(form) for form in forms.split()}) == 1, forms
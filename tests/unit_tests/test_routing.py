@@ -0,0 +1,41 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from react_agent.routing import route_step
+
+TABLE = '{"simple": "openai/gpt-4o-mini", "reasoning": "openai/gpt-4o"}'
+
+
+def _after_tool(name: str, content: str) -> list:
+    return [
+        HumanMessage(content="Сколько дней до подачи заявки?"),
+        AIMessage(content="", tool_calls=[{"name": name, "args": {}, "id": "1"}]),
+        ToolMessage(content=content, name=name, tool_call_id="1"),
+    ]
+
+
+def test_steps_are_routed_by_local_signals() -> None:
+    def route(messages):
+        return route_step(messages, "openai/default", TABLE, 800)
+
+    assert route([HumanMessage(content="Найди тендеры")]).model == "openai/gpt-4o"
+    simple = route(
+        _after_tool("check_tender_deadline", "⏰ До окончания приема заявок: 5 дней")
+    )
+    assert (simple.step_class, simple.model) == ("simple", "openai/gpt-4o-mini")
+    assert (
+        route(_after_tool("query_document", "Фрагмент документа")).model
+        == "openai/default"
+    )
+    assert (
+        route(_after_tool("check_tender_deadline", "Ошибка: неверная дата")).step_class
+        == "reasoning"
+    )
+    assert route(_after_tool("calculate", "1 " * 5000)).step_class == "reasoning"
+
+
+def test_routing_is_off_without_a_table() -> None:
+    decision = route_step([HumanMessage(content="Привет")], "openai/default", "", 800)
+    assert (decision.step_class, decision.model) == ("default", "openai/default")
+    with pytest.raises(ValueError):
+        route_step([], "openai/default", '{"fast": "gpt"}', 800)
@@ -0,0 +1,58 @@
+import asyncio
+import json
+import time
+
+from react_agent import tools
+from react_agent.segmentation import segment
+
+TEXT = (
+    "1. Общие положения\n"
+    "Участник должен иметь лицензию, стоимость 100 руб. в месяц. "
+    "Критерии оценки заявок: цена - 60%; опыт - 40%.\n"
+    "В случае просрочки поставщик уплачивает пени! Адрес: г. Москва.\n\n"
+    "• Требования к упаковке: по ГОСТ 123.45-2020"
+)
+
+
+def test_clauses_are_split_and_tagged() -> None:
+    clauses = segment(TEXT)
+    assert [(c.text, c.tags) for c in clauses] == [
+        (
+            "1. Общие положения\nУчастник должен иметь лицензию, стоимость 100 руб. в месяц.",
+            ("требование",),
+        ),
+        ("Критерии оценки заявок: цена - 60%;", ("критерий",)),
+        ("опыт - 40%.", ()),
+        ("В случае просрочки поставщик уплачивает пени!", ("условие",)),
+        ("Адрес: г. Москва.", ()),
+        ("• Требования к упаковке: по ГОСТ 123.45-2020", ("требование",)),
+    ]
+    assert all(TEXT[c.start : c.end] == c.text for c in clauses)
+
+
+def test_text_without_punctuation_is_cut_into_bounded_clauses() -> None:
+    text = "трансформатор ТМГ-630 требования ГОСТ " * 5000
+    clauses = segment(text, max_clause_chars=500)
+    assert max(len(c.text) for c in clauses) <= 500
+    assert "".join(c.text for c in clauses).replace(" ", "") == text.replace(" ", "")
+
+    result = json.loads(asyncio.run(tools.extract_tender_info(text)))
+    assert all(len(r) <= 1000 for r in result["найденная_информация"]["требования"])
+
+
+def _seconds(text: str) -> float:
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        segment(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def test_punctuation_runs_are_segmented_in_linear_time() -> None:
+    small, large = _seconds("." * 100_000), _seconds("." * 200_000)
+    assert large < 1.0 and large < small * 3
+    assert [c.text for c in segment("Итого" + "…" * 100 + " Далее")] == [
+        "Итого" + "…" * 100,
+        "Далее",
+    ]
@@ -0,0 +1,70 @@
+import asyncio
+import multiprocessing
+import os
+
+from react_agent import metrics, tools
+from react_agent.context import Context
+from react_agent.shared_cache import SharedCache
+
+
+def _write_entry(root: str) -> None:
+    SharedCache(root, 1 << 20).put_json(
+        "documents", "ab" + "0" * 62, {"text": "Поставка кабеля"}
+    )
+
+
+def test_entries_written_by_another_process_are_read_and_evicted_lru(tmp_path) -> None:
+    root = str(tmp_path / "cache")
+    process = multiprocessing.get_context("spawn").Process(
+        target=_write_entry, args=(root,)
+    )
+    process.start()
+    process.join()
+    cache = SharedCache(root, 1 << 20)
+    assert cache.get_json("documents", "ab" + "0" * 62) == {"text": "Поставка кабеля"}
+    assert cache.get_json("documents", "cd" + "0" * 62) is None
+
+    small = SharedCache(str(tmp_path / "small"), 3_000)
+    for i, key in enumerate(("a1", "b2", "c3")):
+        small.put("ns", key, b"x" * 1_000)
+        os.utime(small._path("ns", key), (i, i))
+    os.utime(small._path("ns", "a1"), (10, 10))  # recently read
+    small.put("ns", "d4", b"x" * 1_000)
+    with small.view("ns", "b2") as view:
+        assert view is None
+    with small.view("ns", "a1") as view:
+        assert view is not None and bytes(view) == b"x" * 1_000
+    assert small.size() <= 3_000
+
+
+def test_analysis_reuses_text_and_findings_from_the_shared_cache(
+    tmp_path, monkeypatch
+) -> None:
+    path = tmp_path / "tender.txt"
+    path.write_text(
+        "Поставка трансформатора. НМЦК составляет 5 000 000 руб.", encoding="utf-8"
+    )
+    monkeypatch.setattr(
+        tools, "_context", lambda: Context(shared_cache_dir=str(tmp_path / "cache"))
+    )
+    extracted, analyzed = [], []
+    original_ingest, original_findings = tools.ingest_bytes, tools.tender_findings
+    monkeypatch.setattr(
+        tools, "ingest_bytes", lambda *a: extracted.append(a) or original_ingest(*a)
+    )
+    monkeypatch.setattr(
+        tools, "tender_findings", lambda t: analyzed.append(t) or original_findings(t)
+    )
+    metrics.reset()
+
+    first = asyncio.run(tools.analyze_document(str(path)))
+    second = asyncio.run(tools.analyze_document(str(path)))
+
+    assert first == second and "5000000.00" in second
+    assert len(extracted) == 1 and len(analyzed) == 1
+    assert (
+        metrics.get_counter(
+            "shared_cache.hits", labels={"namespace": tools.SHARED_DOCUMENTS}
+        )
+        == 1
+    )
@@ -0,0 +1,142 @@
+import asyncio
+import base64
+
+from langchain_core.messages import AIMessage
+
+from react_agent import metrics, tool_node
+from react_agent.context import Context
+from react_agent.tool_node import GuardedToolNode
+
+
+async def echo_upload(content: str, filename: str = "unknown") -> str:
+    """Вернуть размер загруженного файла."""
+    return f"{filename}: {len(content.encode())}"
+
+
+def _run(node: GuardedToolNode, args: dict) -> list:
+    message = AIMessage(
+        content="", tool_calls=[{"name": "echo_upload", "args": args, "id": "1"}]
+    )
+    return asyncio.run(node.ainvoke({"messages": [message]}))["messages"]
+
+
+def test_oversized_payloads_are_rejected_or_spilled(tmp_path, monkeypatch) -> None:
+    metrics.reset()
+    node = GuardedToolNode([echo_upload])
+    payload = base64.b64encode(b"%PDF-1.4 " + b"x" * 4000).decode()
+    limits = '{"echo_upload": 2000}'
+
+    monkeypatch.setattr(
+        tool_node, "_current_context", lambda: Context(tool_payload_limits=limits)
+    )
+    [rejected] = _run(node, {"content": payload, "filename": "big.pdf"})
+    assert rejected.status == "error" and "слишком велики" in rejected.content
+    assert metrics.get_counter("tool.rejected", labels={"tool": "echo_upload"}) == 1
+
+    context = Context(tool_payload_limits=limits, tool_spill_dir=str(tmp_path))
+    monkeypatch.setattr(tool_node, "_current_context", lambda: context)
+    [spilled] = _run(node, {"content": payload, "filename": "big.pdf"})
+    [path] = tmp_path.iterdir()
+    assert str(path) in spilled.content and path.name.endswith("_big.pdf")
+    assert path.read_bytes().startswith(b"%PDF-1.4")
+
+    [accepted] = _run(node, {"content": "мало", "filename": "small.txt"})
+    assert accepted.content == "small.txt: 8"
+
+
+def test_memory_peak_is_exported_per_tool(monkeypatch) -> None:
+    metrics.reset()
+    monkeypatch.setattr(
+        tool_node, "_current_context", lambda: Context(tool_memory_tracking=True)
+    )
+    _run(GuardedToolNode([echo_upload]), {"content": "x" * 100_000})
+    peak = metrics.snapshot()["summaries"]["tool.memory_peak_bytes{tool=echo_upload}"]
+    assert peak["count"] == 1 and peak["max"] >= 100_000
+
+
+def test_idempotent_calls_are_memoized_per_file_version(tmp_path, monkeypatch) -> None:
+    calls = []
+
+    async def analyze_document(file_path: str) -> str:
+        """Проанализировать документ."""
+        calls.append(file_path)
+        return open(file_path, encoding="utf-8").read()
+
+    monkeypatch.setattr(tool_node, "_memo", tool_node.ToolMemo())
+    document = tmp_path / "tender.txt"
+    document.write_text("версия 1", encoding="utf-8")
+    node = GuardedToolNode([analyze_document])
+
+    def run() -> str:
+        message = AIMessage(
+            content="",
+            tool_calls=[
+                {
+                    "name": "analyze_document",
+                    "args": {"file_path": str(document)},
+                    "id": "1",
+                }
+            ],
+        )
+        return asyncio.run(node.ainvoke({"messages": [message]}))["messages"][0].content
+
+    assert run() == run() == "версия 1"
+    assert len(calls) == 1
+    document.write_text("версия 2 длиннее", encoding="utf-8")
+    assert run() == "версия 2 длиннее"
+    assert len(calls) == 2
+    assert tool_node.get_tool_memo().hit_ratio == 1 / 3
+
+
+def test_memo_key_covers_output_mode_and_keyword_dictionary(tmp_path) -> None:
+    args = {"deadline_str": "01.01.2030"}
+    verbose = tool_node.memo_key("check_tender_deadline", args, Context())
+    assert verbose == tool_node.memo_key("check_tender_deadline", args, Context())
+    assert verbose != tool_node.memo_key(
+        "check_tender_deadline", args, Context(output_mode="compact")
+    )
+
+    dictionary = tmp_path / "keywords.json"
+    dictionary.write_text('{"прочее": ["кабель"]}', encoding="utf-8")
+    context = Context(keyword_dictionary_path=str(dictionary))
+    before = tool_node.memo_key("extract_tender_info", {"text": "кабель"}, context)
+    dictionary.write_text('{"прочее": ["кабель", "провод"]}', encoding="utf-8")
+    assert before != tool_node.memo_key(
+        "extract_tender_info", {"text": "кабель"}, context
+    )
+
+
+def test_error_results_are_not_memoized(monkeypatch) -> None:
+    from react_agent import tools
+
+    attempts = []
+
+    async def analyze_document(file_path: str) -> str:
+        """Проанализировать документ."""
+        attempts.append(file_path)
+        if len(attempts) == 1:
+            return await asyncio.to_thread(
+                tools._fail, "Ошибка при анализе документа: database is locked"
+            )
+        return "анализ готов"
+
+    monkeypatch.setattr(tool_node, "_memo", tool_node.ToolMemo())
+    node = GuardedToolNode([analyze_document])
+
+    def run():
+        message = AIMessage(
+            content="",
+            tool_calls=[
+                {
+                    "name": "analyze_document",
+                    "args": {"file_path": "/missing.pdf"},
+                    "id": "1",
+                }
+            ],
+        )
+        return asyncio.run(node.ainvoke({"messages": [message]}))["messages"][0]
+
+    failed = run()
+    assert failed.status == "error" and "database is locked" in failed.content
+    assert run().content == run().content == "анализ готов"
+    assert len(attempts) == 2
@@ -0,0 +1,44 @@
+import asyncio
+import base64
+import json
+
+from react_agent import tools
+from react_agent.budget import estimate_tokens
+from react_agent.context import Context
+
+TENDER = (
+    "Извещение о закупке № 0373200001224000123. Поставка трансформатора ТМГ-630. "
+    "НМЦК составляет 5 000 000 руб. Окончание подачи заявок 15.03.2025. "
+    "Требования к участникам: опыт поставок не менее 3 лет. "
+) * 5
+
+
+def _compact(monkeypatch) -> None:
+    monkeypatch.setattr(tools, "_context", lambda: Context(output_mode="compact"))
+
+
+def test_compact_outputs_are_json_with_the_same_data(monkeypatch) -> None:
+    verbose_calc = asyncio.run(tools.calculate("2 + 3 * 4"))
+    verbose_deadline = asyncio.run(tools.check_tender_deadline("01.01.2020"))
+    _compact(monkeypatch)
+    assert json.loads(asyncio.run(tools.calculate("2 + 3 * 4"))) == {"результат": 14}
+    assert "14" in verbose_calc
+    deadline = json.loads(asyncio.run(tools.check_tender_deadline("01.01.2020")))
+    assert deadline["срок"] == "2020-01-01" and deadline["дней_осталось"] < 0
+    assert "прошел" in verbose_deadline
+    assert json.loads(asyncio.run(tools.calculate("import os"))).keys() == {"ошибка"}
+
+
+def test_compact_upload_analysis_is_much_smaller(monkeypatch) -> None:
+    data = "data:text/plain;base64," + base64.b64encode(TENDER.encode()).decode()
+    verbose = asyncio.run(tools._analyze_upload(data, "tender.txt"))
+    _compact(monkeypatch)
+    compact = asyncio.run(tools._analyze_upload(data, "tender.txt"))
+
+    parsed = json.loads(compact)
+    assert parsed["файл"] == "tender.txt" and parsed["тип"] == "text"
+    assert parsed["суммы"] == [
+        {"значение": "5000000.00", "валюта": "RUB", "нмцк": True}
+    ]
+    assert parsed["нмцк"] == "5000000.00" and parsed["даты"] == ["15.03.2025"]
+    assert estimate_tokens(compact) < estimate_tokens(verbose) / 3
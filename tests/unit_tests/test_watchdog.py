@@ -0,0 +1,40 @@
+import asyncio
+import json
+import time
+
+from react_agent import metrics
+from react_agent.watchdog import ensure_watchdog, register_sources
+
+
+async def blocking_tool() -> str:
+    time.sleep(0.3)  # synchronous work inside an async tool
+    return "done"
+
+
+def test_stall_is_attributed_to_the_blocking_tool(tmp_path) -> None:
+    log_path = tmp_path / "stalls.jsonl"
+    register_sources(blocking_tool)
+
+    async def run() -> None:
+        watchdog = ensure_watchdog(50, str(log_path))
+        assert ensure_watchdog(50, str(log_path)) is watchdog
+        await asyncio.sleep(0.05)
+        await blocking_tool()
+        await asyncio.sleep(0.1)
+        watchdog.stop()
+
+    asyncio.run(run())
+
+    record = json.loads(log_path.read_text(encoding="utf-8").splitlines()[0])
+    assert record["source"] == "blocking_tool"
+    assert record["duration_ms"] >= 200
+    assert any("in blocking_tool" in line for line in record["samples"][0]["stack"])
+    assert metrics.get_counter("event_loop.stalls", {"source": "blocking_tool"}) >= 1
+
+
+def test_watchdog_is_off_by_default() -> None:
+    assert asyncio.run(_ensure_disabled()) is None
+
+
+async def _ensure_disabled():
+    return ensure_watchdog(0)